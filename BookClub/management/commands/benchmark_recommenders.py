@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from RecommenderModule.evaluation.benchmark import RecommenderBenchmark
+import contextlib
+import json
+import sys
+
+class Command(BaseCommand):
+        """Benchmark the fit time, artifact size and load time, recommendation latencies and peak memory of the recommenders,
+            on datasets of the given sizes, and output the report as JSON (so that the reports of several versions can be compared)."""
+
+        def add_arguments(self, parser):
+            parser.add_argument('--recommenders', nargs='+', choices=RecommenderBenchmark.recommender_names, default=RecommenderBenchmark.recommender_names,
+                help="Recommenders to benchmark")
+            parser.add_argument('--dataset-sizes', type=int, nargs='+', default=None,
+                help="Numbers of ratings sampled from the dataset to benchmark the recommenders on (all ratings by default)")
+            parser.add_argument('--min-ratings-threshold', type=int, default=15, help="Minimum number of ratings of the books of the dataset")
+            parser.add_argument('--users', type=int, default=1000, help="Number of users whose recommendations are timed")
+            parser.add_argument('--clubs', type=int, default=100, help="Number of clubs whose recommendations are timed")
+            parser.add_argument('--seed', type=int, default=0, help="Seed of the sampling of the ratings and users")
+            parser.add_argument('--from-csv', action='store_true', help="Read the ratings from the dataset CSV files instead of the database")
+            parser.add_argument('--no-isolation', action='store_true', help="Benchmark all recommenders in this process instead of forking a process for each")
+            parser.add_argument('--output', type=str, default=None, help="File the JSON report is written to (standard output by default)")
+
+        def __init__(self):
+            super().__init__()
+
+        def handle(self, *args, **options):
+            # The recommenders print their progress: keep it out of the JSON report
+            with contextlib.redirect_stdout(sys.stderr):
+                benchmark = RecommenderBenchmark(min_ratings_threshold=options['min_ratings_threshold'], get_data_from_csv=options['from_csv'],
+                                                 number_of_users=options['users'], number_of_clubs=options['clubs'], seed=options['seed'],
+                                                 isolated=not options['no_isolation'])
+                report = benchmark.run_benchmarks(recommender_names=options['recommenders'], dataset_sizes=options['dataset_sizes'])
+            if options['output'] is None:
+                self.stdout.write(json.dumps(report, indent=2))
+            else:
+                with open(options['output'], "w") as file:
+                    json.dump(report, file, indent=2)
+                print(f"Benchmark report written to {options['output']}.", file=sys.stderr)
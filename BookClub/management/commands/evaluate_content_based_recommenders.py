@@ -4,9 +4,12 @@ from RecommenderModule.evaluation.evaluation_content_based import EvaluationCont
 """Command to run the evaluations for the content-based recommender."""
 class Command(BaseCommand):
 
+        def add_arguments(self, parser):
+            parser.add_argument('--workers', type=int, default=1, help="Number of processes used to evaluate the recommenders concurrently")
+
         def __init__(self):
             super().__init__()
 
         def handle(self, *args, **options):
             evaluation_content_based = EvaluationContentBased()
-            evaluation_content_based.run_evaluations()
+            evaluation_content_based.run_evaluations(number_of_workers=options['workers'])
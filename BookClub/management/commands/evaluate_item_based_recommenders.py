@@ -4,9 +4,12 @@ from RecommenderModule.evaluation.evaluation_item_based import EvaluationItemBas
 """Command to run the evaluations for the item-based recommender."""
 class Command(BaseCommand):
 
+        def add_arguments(self, parser):
+            parser.add_argument('--workers', type=int, default=1, help="Number of processes used to evaluate the recommenders concurrently")
+
         def __init__(self):
             super().__init__()
 
         def handle(self, *args, **options):
             evaluation_item_based = EvaluationItemBased()
-            evaluation_item_based.run_evaluations()
+            evaluation_item_based.run_evaluations(number_of_workers=options['workers'])
@@ -4,9 +4,12 @@ from RecommenderModule.evaluation.evaluation_popularity import EvaluationPopular
 """Command to run the evaluations for the popularity recommender."""
 class Command(BaseCommand):
 
+        def add_arguments(self, parser):
+            parser.add_argument('--workers', type=int, default=1, help="Number of processes used to evaluate the recommenders concurrently")
+
         def __init__(self):
             super().__init__()
 
         def handle(self, *args, **options):
             evaluation_popularity = EvaluationPopularity()
-            evaluation_popularity.run_evaluations()
+            evaluation_popularity.run_evaluations(number_of_workers=options['workers'])
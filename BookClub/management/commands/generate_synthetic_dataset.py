@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from BookClub.synthetic_dataset import SyntheticDatasetGenerator
+import time
+
+class Command(BaseCommand):
+        """Generate a synthetic dataset of users, books, ratings, clubs, memberships, votes and follows with power-law distributions,
+            at the given scale (e.g. --users 1000000 --ratings 10000000), to load and scale test the recommenders, the views and the search;
+            the dataset is written as BX-format CSV files (--csv) or inserted into the database in batches."""
+
+        def add_arguments(self, parser):
+            parser.add_argument('--users', type=int, default=1000, help="Number of users")
+            parser.add_argument('--books', type=int, default=2000, help="Number of books")
+            parser.add_argument('--ratings', type=int, default=20000, help="Number of ratings (reviews)")
+            parser.add_argument('--clubs', type=int, default=50, help="Number of clubs")
+            parser.add_argument('--memberships', type=int, default=1000, help="Number of club memberships (including the owners)")
+            parser.add_argument('--follows', type=int, default=5000, help="Number of follows between users")
+            parser.add_argument('--votes', type=int, default=5000, help="Number of votes on the reviews")
+            parser.add_argument('--user-activity-exponent', type=float, default=1.0, help="Exponent of the power law of the activity of the users")
+            parser.add_argument('--popularity-exponent', type=float, default=1.0, help="Exponent of the power law of the popularity of the books, clubs and users")
+            parser.add_argument('--seed', type=int, default=0, help="Seed of the random generator")
+            parser.add_argument('--csv', type=str, default=None, help="Directory the BX-format CSV files are written to (inserted into the database by default)")
+            parser.add_argument('--batch-size', type=int, default=5000, help="Number of rows inserted into the database at once")
+
+        def __init__(self):
+            super().__init__()
+
+        def handle(self, *args, **options):
+            start_time = time.perf_counter()
+            print("Generating dataset...")
+            generator = SyntheticDatasetGenerator(number_of_users=options['users'], number_of_books=options['books'], number_of_ratings=options['ratings'],
+                                                  number_of_clubs=options['clubs'], number_of_memberships=options['memberships'],
+                                                  number_of_follows=options['follows'], number_of_votes=options['votes'],
+                                                  user_activity_exponent=options['user_activity_exponent'],
+                                                  popularity_exponent=options['popularity_exponent'], seed=options['seed'])
+            print(f"Generated {len(generator.ratings)} ratings, {len(generator.membership_users)} memberships, "
+                  f"{len(generator.follow_sources)} follows and {len(generator.vote_reviews)} votes in {time.perf_counter() - start_time:.1f}s")
+            if options['csv'] is not None:
+                generator.write_csv(options['csv'])
+                print(f"Dataset written to {options['csv']} in {time.perf_counter() - start_time:.1f}s")
+            else:
+                generator.load_into_database(batch_size=options['batch_size'], print_status=True)
+                print(f"Dataset inserted into the database in {time.perf_counter() - start_time:.1f}s")
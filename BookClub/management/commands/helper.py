@@ -1,9 +1,9 @@
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 from pandas import DataFrame
 
 def get_top_n_books(n):
     ratings_file_path = "static/dataset/BX-Book-Ratings.csv"
-    rating_data = DataFrame(pd.read_csv(
+    rating_data = DataFrame(dataset_cache.read_csv(
         ratings_file_path, header=0, encoding="ISO-8859-1", sep=';'))
 
     ratings_counts = rating_data["ISBN"].value_counts()
@@ -14,7 +14,7 @@ def get_top_n_books(n):
 
 def get_top_n_books_shifted(n):
     ratings_file_path = "static/dataset/BX-Book-Ratings.csv"
-    rating_data = DataFrame(pd.read_csv(
+    rating_data = DataFrame(dataset_cache.read_csv(
         ratings_file_path, header=0, encoding="ISO-8859-1", sep=';'))
 
     ratings_counts = rating_data["ISBN"].value_counts()
@@ -24,7 +24,7 @@ def get_top_n_books_shifted(n):
     return isbns
 
 def get_top_n_users_who_have_rated_xyz_books(n, xyz):
-    rating_data = DataFrame(pd.read_csv(
+    rating_data = DataFrame(dataset_cache.read_csv(
         "static/dataset/BX-Book-Ratings.csv", header=0, encoding="ISO-8859-1", sep=';'))
     ratings_for_chosen_books = rating_data[rating_data["ISBN"].isin(xyz)]
     rating_users = ratings_for_chosen_books["User-ID"].value_counts()
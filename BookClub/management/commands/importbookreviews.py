@@ -1,9 +1,9 @@
 
 from django.core.management.base import BaseCommand
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 import time
 from pandas import DataFrame
-from BookClub.models import User, BookReview, Book
+from BookClub.models import User, BookReview, Book, BookRatingStatistics, ClubBookRatings, recommendations_invalidator
 from faker import Faker
 
 class Command(BaseCommand):
@@ -16,6 +16,10 @@ class Command(BaseCommand):
         tic = time.time()
         model_instances = self.import_bookreviews()
         BookReview.objects.bulk_create(model_instances)
+        # bulk_create does not call BookReview.save(): rebuild the rating statistics of the books and clubs
+        BookRatingStatistics.rebuild_all()
+        ClubBookRatings.rebuild_all()
+        recommendations_invalidator.invalidate_users({review.creator_id for review in model_instances})
         toc = time.time()
         total = toc-tic
         print('Done in {:.4f} seconds'.format(total))
@@ -25,7 +29,7 @@ class Command(BaseCommand):
     def import_bookreviews(self):
         file_path = ("static/dataset/BX-Book-Ratings.csv")
 
-        data = DataFrame(pd.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
+        data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
         
         books = Book.objects.all().only('ISBN')
         users = User.objects.all().only('id')
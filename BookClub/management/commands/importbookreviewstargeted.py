@@ -2,11 +2,11 @@
 from django.core.management.base import BaseCommand
 from faker import Faker
 import faker
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 import time
 from pandas import DataFrame
 from BookClub.management.commands.helper import get_top_n_books, get_top_n_users_who_have_rated_xyz_books, get_top_n_books_shifted
-from BookClub.models import User, BookReview, Book
+from BookClub.models import User, BookReview, Book, BookRatingStatistics, ClubBookRatings, recommendations_invalidator
 
 
 class Command(BaseCommand):
@@ -17,6 +17,10 @@ class Command(BaseCommand):
         tic = time.time()
         model_instances = self.import_bookreviews()
         BookReview.objects.bulk_create(model_instances)
+        # bulk_create does not call BookReview.save(): rebuild the rating statistics of the books and clubs
+        BookRatingStatistics.rebuild_all()
+        ClubBookRatings.rebuild_all()
+        recommendations_invalidator.invalidate_users({review.creator_id for review in model_instances})
         toc = time.time()
         total = toc-tic
         print('Done in {:.4f} seconds'.format(total))
@@ -26,7 +30,7 @@ class Command(BaseCommand):
     def import_bookreviews(self):
         file_path = ("static/dataset/BX-Book-Ratings.csv")
 
-        data = DataFrame(pd.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
+        data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
         book_isbns = get_top_n_books_shifted(300)
         user_ids = get_top_n_users_who_have_rated_xyz_books(1000, book_isbns)
         books = Book.objects.all().only('ISBN')
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 import random
 from BookClub.models import Book
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 from pandas import DataFrame
 import time
 
@@ -17,7 +17,7 @@ class Command(BaseCommand):
         file_path = "static/dataset/BX_Books.csv"
 
 
-        data = DataFrame(pd.read_csv(file_path, header=0, encoding="ISO-8859-1", sep=';'))
+        data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding="ISO-8859-1", sep=';'))
 
         df_records = data.to_dict('records')
         percent = options.get('books', None)
@@ -6,7 +6,7 @@ from faker import Faker
 from numpy import append
 from BookClub.management.commands.helper import get_top_n_books, get_top_n_books_shifted
 from BookClub.models import Book
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 from pandas import DataFrame
 import os
 import requests
@@ -24,7 +24,7 @@ class Command(BaseCommand):
         
         
 
-        book_data = DataFrame(pd.read_csv(file_path, header=0, encoding="ISO-8859-1", sep=';'))
+        book_data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding="ISO-8859-1", sep=';'))
         isbns = get_top_n_books_shifted(300)
         
         chosen_books = book_data[book_data['ISBN'].isin(isbns)]
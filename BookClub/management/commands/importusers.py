@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 import random
 from faker import Faker
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 from pandas import DataFrame
 import time
 
@@ -35,7 +35,7 @@ class Command(BaseCommand):
         file_path = ("static/dataset/BX-Users.csv")
         file = open(file_path, 'rb', 0)
 
-        data = DataFrame(pd.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
+        data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
 
         faker = Faker()
 
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 import random
 from faker import Faker
-import pandas as pd
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 from pandas import DataFrame
 import time
 from BookClub.management.commands.helper import get_top_n_books, get_top_n_users_who_have_rated_xyz_books, get_top_n_books_shifted
@@ -27,7 +27,7 @@ class Command(BaseCommand):
     def import_users(self):
         file_path = ("static/dataset/BX-Users.csv")
 
-        data = DataFrame(pd.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
+        data = DataFrame(dataset_cache.read_csv(file_path, header=0, encoding= "ISO-8859-1", sep=';'))
 
         isbns = get_top_n_books_shifted(300)
         rating_users = get_top_n_users_who_have_rated_xyz_books(1000, isbns)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from RecommenderModule import recommendations_provider
+import time
+
+class Command(BaseCommand):
+        """Precompute the user and club recommendations flagged as modified (after new ratings or retraining), in batches,
+            so that the recommendation views only have to read the stored recommendations."""
+
+        def add_arguments(self, parser):
+            parser.add_argument('--batch-size', type=int, default=500, help="Number of users (or clubs) whose recommendations are computed at once")
+            parser.add_argument('--max-batches', type=int, default=None, help="Stop after precomputing this number of batches")
+            parser.add_argument('--interval', type=float, default=None,
+                help="Keep running, checking for modified recommendations every [interval] seconds once all of them have been precomputed")
+
+        def __init__(self):
+            super().__init__()
+
+        def handle(self, *args, **options):
+            batch_size = options.get('batch_size')
+            max_batches = options.get('max_batches')
+            interval = options.get('interval')
+            number_of_batches = 0
+            print("Started precomputing recommendations...")
+            while max_batches is None or number_of_batches < max_batches:
+                # Users are given priority over clubs, as club recommendations are less often displayed
+                number_of_users = recommendations_provider.precompute_modified_user_recommendations(batch_size=batch_size)
+                if number_of_users > 0:
+                    number_of_batches += 1
+                    print(f"Precomputed recommendations of {number_of_users} users.")
+                    continue
+                number_of_clubs = recommendations_provider.precompute_modified_club_recommendations(batch_size=batch_size)
+                if number_of_clubs > 0:
+                    number_of_batches += 1
+                    print(f"Precomputed recommendations of {number_of_clubs} clubs.")
+                    continue
+                if interval is None:
+                    break
+                time.sleep(interval)
+            print("Done precomputing recommendations.")
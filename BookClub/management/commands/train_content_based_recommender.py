@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from RecommenderModule import recommendations_provider
 
 class Command(BaseCommand):
-        """Train and save content-based similarities dictionary for content-based recommender."""
+        """Train and save content-based neighbours model for content-based recommender."""
 
         def __init__(self):
             super().__init__()
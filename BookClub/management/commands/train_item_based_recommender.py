@@ -7,6 +7,8 @@ class Command(BaseCommand):
         def add_arguments(self, parser):
             parser.add_argument('min_ratings_threshold', type=int, nargs='?', default=15)
             parser.add_argument('min_support', type=int, nargs='?', default=5)
+            parser.add_argument('--model-function-name', type=str, default=None,
+                help="Similarity of the model: 'pearson_baseline' (default), or 'cosine', 'msd' or 'pearson' to allow incremental updates")
 
         def __init__(self):
             super().__init__()
@@ -19,6 +21,9 @@ class Command(BaseCommand):
                 parameters["min_ratings_threshold"] = min_ratings_threshold
             if min_support is not None:
                 parameters["min_support"] = min_support
+            model_function_name = options.get('model_function_name', None)
+            if model_function_name is not None:
+                parameters["model_function_name"] = model_function_name
             print("Started training item-based recommender...")
             recommendations_provider.retrain_item_based_recommender(parameters=parameters)
             print("Done training item-based recommender.")
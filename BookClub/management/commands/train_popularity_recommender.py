@@ -6,12 +6,18 @@ class Command(BaseCommand):
 
         def add_arguments(self, parser):
             parser.add_argument('min_ratings_threshold', type=int, nargs='?', default=5)
+            parser.add_argument('--from-statistics', action='store_true', help="Refresh the popularity lists from the books' rating statistics, without retraining")
 
         def __init__(self):
             super().__init__()
 
         def handle(self, *args, **options):
             min_ratings_threshold = options.get('min_ratings_threshold', None)
-            print("Started training popularity recommender...")
-            recommendations_provider.retrain_popularity_recommender(min_ratings_threshold=min_ratings_threshold)
-            print("Done training popularity recommender.")
+            if options.get('from_statistics'):
+                print("Started refreshing popularity recommender...")
+                recommendations_provider.refresh_popularity_recommender(min_ratings_threshold=min_ratings_threshold)
+                print("Done refreshing popularity recommender.")
+            else:
+                print("Started training popularity recommender...")
+                recommendations_provider.retrain_popularity_recommender(min_ratings_threshold=min_ratings_threshold)
+                print("Done training popularity recommender.")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from RecommenderModule import recommendations_provider
+from RecommenderModule.recommenders.resources.model_registry import model_registry
+import time
+
+class Command(BaseCommand):
+        """Update the item-based recommender with the ratings created, changed or deleted since it was trained (or last updated),
+            without retraining it: only the similarities of the books whose ratings changed are recomputed.
+            Only for models trained with the 'cosine', 'msd' or 'pearson' similarity (see train_item_based_recommender)."""
+
+        def add_arguments(self, parser):
+            parser.add_argument('--interval', type=float, default=None,
+                help="Keep running, updating the recommender every [interval] seconds")
+            parser.add_argument('--max-updates', type=int, default=None, help="Stop after this number of updates")
+
+        def __init__(self):
+            super().__init__()
+
+        def handle(self, *args, **options):
+            interval = options.get('interval')
+            max_updates = options.get('max_updates')
+            item_based_methods = model_registry.get("item_based").item_based_methods
+            if not item_based_methods.can_update_ratings():
+                raise CommandError(f"The '{item_based_methods.model_function_name}' item-based model can not be updated incrementally: "
+                                   "train it with --model-function-name cosine, msd or pearson.")
+            number_of_updates = 0
+            print("Started updating item-based recommender...")
+            while max_updates is None or number_of_updates < max_updates:
+                number_of_ratings_changes = recommendations_provider.update_item_based_recommender_from_database()
+                if number_of_ratings_changes > 0:
+                    number_of_updates += 1
+                    print(f"Updated item-based recommender with {number_of_ratings_changes} ratings changes.")
+                if interval is None:
+                    break
+                time.sleep(interval)
+            print("Done updating item-based recommender.")
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.12 on 2026-10-18 09:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_book_rating_statistics(apps, schema_editor):
+    """Build the rating statistics of all books from the existing reviews."""
+    BookReview = apps.get_model('BookClub', 'BookReview')
+    BookRatingStatistics = apps.get_model('BookClub', 'BookRatingStatistics')
+    rating_counts = BookReview.objects.values_list('book_id', 'book_rating').annotate(count=models.Count('id')).order_by()
+    all_statistics = {}
+    for book_id, rating, count in rating_counts:
+        statistics = all_statistics.setdefault(book_id, BookRatingStatistics(book_id=book_id))
+        statistics.ratings_count += count
+        statistics.ratings_sum += rating * count
+        setattr(statistics, f'rating_{rating}', count)
+    BookRatingStatistics.objects.bulk_create(all_statistics.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BookClub', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookRatingStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ratings_count', models.IntegerField(default=0)),
+                ('ratings_sum', models.IntegerField(default=0)),
+                ('rating_0', models.IntegerField(default=0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+                ('rating_6', models.IntegerField(default=0)),
+                ('rating_7', models.IntegerField(default=0)),
+                ('rating_8', models.IntegerField(default=0)),
+                ('rating_9', models.IntegerField(default=0)),
+                ('rating_10', models.IntegerField(default=0)),
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating_statistics', to='BookClub.book')),
+            ],
+        ),
+        migrations.RunPython(build_book_rating_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.12 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BookClub', '0002_book_rating_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abstractrecommendations',
+            name='generation',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.12 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BookClub', '0003_recommendations_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abstractrecommendations',
+            name='invalidated_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
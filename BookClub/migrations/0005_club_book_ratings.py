@@ -0,0 +1,46 @@
+# Generated by Django 3.2.12 on 2026-10-18 10:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_club_book_ratings(apps, schema_editor):
+    """Build the rating profiles of all clubs from the existing memberships and reviews."""
+    BookReview = apps.get_model('BookClub', 'BookReview')
+    ClubBookRatings = apps.get_model('BookClub', 'ClubBookRatings')
+    aggregated_ratings = (BookReview.objects.filter(creator__clubmembership__isnull=False)
+                          .values_list('creator__clubmembership__club_id', 'book_id')
+                          .annotate(ratings_count=models.Count('id'), ratings_sum=models.Sum('book_rating'),
+                                    positive_ratings_sum=models.Sum('book_rating', filter=models.Q(book_rating__gte=6)))
+                          .order_by())
+    ClubBookRatings.objects.bulk_create([
+        ClubBookRatings(club_id=club_id, book_id=book_id, ratings_count=ratings_count, ratings_sum=ratings_sum,
+                        positive_ratings_sum=positive_ratings_sum or 0)
+        for club_id, book_id, ratings_count, ratings_sum, positive_ratings_sum in aggregated_ratings
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BookClub', '0004_recommendations_invalidated_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubBookRatings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ratings_count', models.IntegerField(default=0)),
+                ('ratings_sum', models.IntegerField(default=0)),
+                ('positive_ratings_sum', models.IntegerField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='BookClub.book')),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_ratings', to='BookClub.club')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='clubbookratings',
+            constraint=models.UniqueConstraint(fields=('club', 'book'), name='unique_club_book_ratings'),
+        ),
+        migrations.RunPython(build_club_book_ratings, migrations.RunPython.noop),
+    ]
@@ -11,5 +11,8 @@ from .rated_content import *
 from .forum import *
 from .user2user import *
 from .recommendations import *
+from .recommendations_invalidation import *
 from .featured_books import *
+from .book_rating_statistics import *
+from .club_rating_profile import *
 from .review import *
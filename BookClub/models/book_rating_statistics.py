@@ -0,0 +1,98 @@
+"""Book Rating Statistics model."""
+from django.db import models, transaction
+from django.db.models import F
+import math
+
+
+class BookRatingStatistics(models.Model):
+    """Statistics of the ratings of a Book, kept up to date whenever a BookReview is saved or deleted.
+
+    Attributes:
+        book: The Book the statistics are for.
+        ratings_count: The number of ratings of the Book.
+        ratings_sum: The sum of all ratings of the Book.
+        rating_0 ... rating_10: The number of ratings of each value (histogram of the ratings).
+    """
+    RATING_FIELDS = [f'rating_{rating}' for rating in range(11)]
+
+    book = models.OneToOneField('Book', on_delete=models.CASCADE, related_name="rating_statistics")
+    ratings_count = models.IntegerField(blank=False, null=False, default=0)
+    ratings_sum = models.IntegerField(blank=False, null=False, default=0)
+    rating_0 = models.IntegerField(blank=False, null=False, default=0)
+    rating_1 = models.IntegerField(blank=False, null=False, default=0)
+    rating_2 = models.IntegerField(blank=False, null=False, default=0)
+    rating_3 = models.IntegerField(blank=False, null=False, default=0)
+    rating_4 = models.IntegerField(blank=False, null=False, default=0)
+    rating_5 = models.IntegerField(blank=False, null=False, default=0)
+    rating_6 = models.IntegerField(blank=False, null=False, default=0)
+    rating_7 = models.IntegerField(blank=False, null=False, default=0)
+    rating_8 = models.IntegerField(blank=False, null=False, default=0)
+    rating_9 = models.IntegerField(blank=False, null=False, default=0)
+    rating_10 = models.IntegerField(blank=False, null=False, default=0)
+
+    def get_histogram(self):
+        return [getattr(self, field) for field in BookRatingStatistics.RATING_FIELDS]
+
+    def get_average_rating(self):
+        if self.ratings_count == 0:
+            return None
+        return self.ratings_sum / self.ratings_count
+
+    def get_rating_at_position(self, position):
+        """Get the rating at the given position (starting from 0) in the sorted list of all ratings of the Book."""
+        ratings_seen = 0
+        for rating, count in enumerate(self.get_histogram()):
+            ratings_seen += count
+            if position < ratings_seen:
+                return rating
+        return None
+
+    def get_median_rating(self):
+        if self.ratings_count == 0:
+            return None
+        if self.ratings_count % 2 == 0:
+            lower_rating = self.get_rating_at_position((self.ratings_count // 2) - 1)
+            upper_rating = self.get_rating_at_position(self.ratings_count // 2)
+            return (lower_rating + upper_rating) / 2
+        return float(self.get_rating_at_position(self.ratings_count // 2))
+
+    def get_combination_score(self):
+        if self.ratings_count == 0:
+            return None
+        return math.sqrt(self.get_average_rating() * self.get_median_rating())
+
+    @staticmethod
+    def update_rating(book_id, rating, difference):
+        """Atomically add (difference=1) or remove (difference=-1) a rating of the Book with the given id."""
+        with transaction.atomic():
+            if difference > 0:
+                BookRatingStatistics.objects.get_or_create(book_id=book_id)
+            rating_field = f'rating_{rating}'
+            BookRatingStatistics.objects.filter(book_id=book_id).update(
+                ratings_count=F('ratings_count') + difference,
+                ratings_sum=F('ratings_sum') + difference * rating,
+                **{rating_field: F(rating_field) + difference}
+            )
+
+    @staticmethod
+    def add_rating(book_id, rating):
+        BookRatingStatistics.update_rating(book_id, rating, 1)
+
+    @staticmethod
+    def remove_rating(book_id, rating):
+        BookRatingStatistics.update_rating(book_id, rating, -1)
+
+    @staticmethod
+    def rebuild_all():
+        """Rebuild the statistics of all Books from all existing BookReviews."""
+        from BookClub.models.review import BookReview
+        rating_counts = BookReview.objects.values_list('book_id', 'book_rating').annotate(count=models.Count('id')).order_by()
+        all_statistics = {}
+        for book_id, rating, count in rating_counts:
+            statistics = all_statistics.setdefault(book_id, BookRatingStatistics(book_id=book_id))
+            statistics.ratings_count += count
+            statistics.ratings_sum += rating * count
+            setattr(statistics, f'rating_{rating}', count)
+        with transaction.atomic():
+            BookRatingStatistics.objects.all().delete()
+            BookRatingStatistics.objects.bulk_create(all_statistics.values(), batch_size=1000)
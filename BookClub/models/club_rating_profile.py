@@ -0,0 +1,112 @@
+"""Club Rating Profile model."""
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from BookClub.models.club_membership import ClubMembership
+from BookClub.models.recommendations_invalidation import recommendations_invalidator
+
+
+class ClubBookRatings(models.Model):
+    """Aggregated ratings of a Book by the members of a Club: the rows of a Club are its rating profile, a sparse vector
+    (over the Books) kept up to date whenever a BookReview of a member is saved or deleted, and whenever a User joins
+    or leaves the Club, so that the Club can be scored as a single user instead of fetching all the ratings of its members.
+    As the club recommendations always did, the ratings of all the Users having a membership of the Club (applicants included) are aggregated:
+    a change of role does not change the profile, and the recommendations of the Club are invalidated whenever any of its Users
+    (applicants included) joins, leaves or rates a Book.
+
+    Attributes:
+        club: The Club the ratings are aggregated for.
+        book: The Book rated by the members of the Club.
+        ratings_count: The number of members having rated the Book.
+        ratings_sum: The sum of the ratings of the Book by the members.
+        positive_ratings_sum: The sum of the positive ratings (at least POSITIVE_RATING) of the Book by the members.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['club', 'book'], name='unique_club_book_ratings')
+        ]
+
+    POSITIVE_RATING = 6
+    chunk_size = 500
+
+    club = models.ForeignKey('Club', on_delete=models.CASCADE, related_name="book_ratings")
+    book = models.ForeignKey('Book', on_delete=models.CASCADE)
+    ratings_count = models.IntegerField(blank=False, null=False, default=0)
+    ratings_sum = models.IntegerField(blank=False, null=False, default=0)
+    positive_ratings_sum = models.IntegerField(blank=False, null=False, default=0)
+
+    @staticmethod
+    def update_ratings(club_ids, ratings, difference):
+        """Add (difference=1) or remove (difference=-1) the given (book_id, rating) pairs to the profiles of the Clubs with
+        the given ids; the rows of the Books no member has rated anymore are deleted."""
+        club_ids = list(club_ids)
+        if len(club_ids) == 0 or len(ratings) == 0:
+            return
+        with transaction.atomic():
+            for start in range(0, len(ratings), ClubBookRatings.chunk_size):
+                chunk_ratings = ratings[start:start + ClubBookRatings.chunk_size]
+                book_ids = {book_id for book_id, rating in chunk_ratings}
+                all_book_ratings = {(book_ratings.club_id, book_ratings.book_id): book_ratings for book_ratings in
+                                    ClubBookRatings.objects.select_for_update().filter(club_id__in=club_ids, book_id__in=book_ids)}
+                for club_id in club_ids:
+                    for book_id, rating in chunk_ratings:
+                        book_ratings = all_book_ratings.setdefault((club_id, book_id), ClubBookRatings(club_id=club_id, book_id=book_id))
+                        book_ratings.ratings_count += difference
+                        book_ratings.ratings_sum += difference * rating
+                        if rating >= ClubBookRatings.POSITIVE_RATING:
+                            book_ratings.positive_ratings_sum += difference * rating
+                ClubBookRatings.objects.bulk_create([book_ratings for book_ratings in all_book_ratings.values()
+                                                     if book_ratings.pk is None and book_ratings.ratings_count > 0])
+                ClubBookRatings.objects.bulk_update([book_ratings for book_ratings in all_book_ratings.values()
+                                                     if book_ratings.pk is not None and book_ratings.ratings_count > 0],
+                                                    ['ratings_count', 'ratings_sum', 'positive_ratings_sum'])
+                ClubBookRatings.objects.filter(pk__in=[book_ratings.pk for book_ratings in all_book_ratings.values()
+                                                       if book_ratings.pk is not None and book_ratings.ratings_count <= 0]).delete()
+
+    @staticmethod
+    def update_user_rating(user_id, book_id, rating, difference):
+        """Add (difference=1) or remove (difference=-1) a rating of the User with the given id to the profiles of the User's Clubs."""
+        club_ids = ClubMembership.objects.filter(user_id=user_id).values_list('club_id', flat=True)
+        ClubBookRatings.update_ratings(club_ids, [(book_id, rating)], difference)
+
+    @staticmethod
+    def update_member_ratings(club_id, user_id, difference):
+        """Add (difference=1) or remove (difference=-1) all the ratings of the User with the given id to the profile of the Club."""
+        from BookClub.models.review import BookReview
+        ratings = list(BookReview.objects.filter(creator_id=user_id).values_list('book_id', 'book_rating'))
+        ClubBookRatings.update_ratings([club_id], ratings, difference)
+
+    @staticmethod
+    def rebuild_all():
+        """Rebuild the profiles of all Clubs from all existing ClubMemberships and BookReviews."""
+        from BookClub.models.review import BookReview
+        aggregated_ratings = (BookReview.objects.filter(creator__clubmembership__isnull=False)
+                              .values_list('creator__clubmembership__club_id', 'book_id')
+                              .annotate(ratings_count=models.Count('id'), ratings_sum=models.Sum('book_rating'),
+                                        positive_ratings_sum=models.Sum('book_rating', filter=models.Q(book_rating__gte=ClubBookRatings.POSITIVE_RATING)))
+                              .order_by())
+        with transaction.atomic():
+            ClubBookRatings.objects.all().delete()
+            ClubBookRatings.objects.bulk_create([
+                ClubBookRatings(club_id=club_id, book_id=book_id, ratings_count=ratings_count, ratings_sum=ratings_sum,
+                                positive_ratings_sum=positive_ratings_sum or 0)
+                for club_id, book_id, ratings_count, ratings_sum, positive_ratings_sum in aggregated_ratings
+            ], batch_size=1000)
+
+
+@receiver(post_save, sender=ClubMembership)
+def add_new_member_ratings(sender, instance, created, raw, **kwargs):
+    """Add the ratings of a new member (or of a membership loaded from a fixture) to the profile of the Club,
+    and invalidate the recommendations of the Club."""
+    if created or raw:
+        ClubBookRatings.update_member_ratings(instance.club_id, instance.user_id, 1)
+        recommendations_invalidator.invalidate_club(instance.club_id)
+
+
+@receiver(post_delete, sender=ClubMembership)
+def remove_former_member_ratings(sender, instance, **kwargs):
+    """Remove the ratings of a former member from the profile of the Club (also called when the membership is deleted in bulk
+    or along with its User/Club), and invalidate the recommendations of the Club."""
+    ClubBookRatings.update_member_ratings(instance.club_id, instance.user_id, -1)
+    recommendations_invalidator.invalidate_club(instance.club_id)
@@ -9,9 +9,14 @@ class AbstractRecommendations(models.Model):
     Attributes:
         recommendations: A JSON object representing a list of the AI generated recommendations.
         modified: A boolean to flag whether the recommendations have been updated.
+        generation: The generation of the trained models the recommendations have been computed from
+            (the recommendations are stale once the models have been retrained, and their generation incremented).
+        invalidated_on: The time the recommendations have last been flagged as modified, after ratings changed.
     """
     recommendations = models.JSONField(null=False, blank=False, default=list)
     modified = models.BooleanField(null=False,blank=False, default=True)
+    generation = models.IntegerField(null=False, blank=False, default=0, db_index=True)
+    invalidated_on = models.DateTimeField(null=True, blank=True)
     
 
 class UserRecommendations(AbstractRecommendations):
@@ -0,0 +1,77 @@
+"""Recommendations invalidation service."""
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from BookClub.models.club_membership import ClubMembership
+from BookClub.models.recommendations import ClubRecommendations, UserRecommendations
+
+
+class RecommendationsInvalidator:
+    """Flag the stored recommendations of users, and of the clubs they are members of, as modified whenever their ratings change,
+    so that they are precomputed again.
+
+    Each invalidation is a set-based UPDATE of the recommendations of all the given users (and of all their clubs), which flags
+    them as modified and stamps them with the invalidation time (even if they are already flagged, e.g. still waiting to be
+    precomputed).
+    Repeated invalidations of the same user within the coalescing window (once the first one has been committed) are skipped:
+    the precompute worker does not pick recommendations invalidated less than a coalescing window ago, so the ratings changed
+    during the window are taken into account when the recommendations are precomputed.
+    """
+    chunk_size = 500
+
+    def __init__(self):
+        self.last_invalidations = {}
+        self.lock = threading.Lock()
+
+    def get_coalescing_window(self):
+        return settings.RECOMMENDATIONS_INVALIDATION_WINDOW
+
+    def invalidate_user(self, user_id):
+        self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids):
+        """Flag the recommendations of the given users, and of the clubs they are members of, as modified
+        (applicants included, as their ratings are part of the rating profiles of the clubs)."""
+        now = time.monotonic()
+        coalescing_window = self.get_coalescing_window()
+        with self.lock:
+            user_ids = [user_id for user_id in set(user_ids)
+                        if user_id not in self.last_invalidations or now - self.last_invalidations[user_id] >= coalescing_window]
+        if len(user_ids) == 0:
+            return
+        invalidated_on = timezone.now()
+        for start in range(0, len(user_ids), self.chunk_size):
+            chunk_user_ids = user_ids[start:start + self.chunk_size]
+            # Stamp the recommendations already flagged as modified too: the next invalidations of these users are skipped
+            # for a coalescing window, so the recommendations must not be precomputed before it is over
+            UserRecommendations.objects.filter(user__in=chunk_user_ids).update(modified=True, invalidated_on=invalidated_on)
+            clubs = ClubMembership.objects.filter(user__in=chunk_user_ids).values('club')
+            ClubRecommendations.objects.filter(club__in=clubs).update(modified=True, invalidated_on=invalidated_on)
+        # Only coalesce with invalidations which have actually been written
+        transaction.on_commit(lambda: self.record_invalidations(user_ids, now))
+
+    def invalidate_club(self, club_id):
+        """Flag the recommendations of the given club as modified (e.g. when its members change); they are not coalesced."""
+        ClubRecommendations.objects.filter(club_id=club_id, modified=False).update(modified=True, invalidated_on=timezone.now())
+
+    def record_invalidations(self, user_ids, invalidation_time):
+        with self.lock:
+            for user_id in user_ids:
+                self.last_invalidations[user_id] = max(invalidation_time, self.last_invalidations.get(user_id, invalidation_time))
+            # Forget the invalidations older than the coalescing window, so that the dictionary does not keep growing
+            if len(self.last_invalidations) > 10 * self.chunk_size:
+                now = time.monotonic()
+                coalescing_window = self.get_coalescing_window()
+                self.last_invalidations = {user_id: last_invalidation for user_id, last_invalidation in self.last_invalidations.items()
+                                           if now - last_invalidation < coalescing_window}
+
+    def clear(self):
+        """Forget the previous invalidations, so that the next ones are not coalesced with them."""
+        with self.lock:
+            self.last_invalidations = {}
+
+
+recommendations_invalidator = RecommendationsInvalidator()
@@ -1,9 +1,12 @@
 """Review model."""
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
 from BookClub.models.rated_content import *
-from BookClub.models.recommendations import ClubRecommendations, UserRecommendations
-from BookClub.models import ClubMembership
+from BookClub.models.recommendations_invalidation import recommendations_invalidator
+from BookClub.models.book_rating_statistics import BookRatingStatistics
+from BookClub.models.club_rating_profile import ClubBookRatings
 class BookReview(TextPost):
     """Allow the User to Review a Book.
 
@@ -39,17 +42,37 @@ class BookReview(TextPost):
         return self.__str__()
 
     def save(self, **kwargs):
-        super().save(**kwargs)
-        if UserRecommendations.objects.filter(user=self.creator).exists():
-            recommendation = UserRecommendations.objects.get(user=self.creator)
-            recommendation.modified = True
-            recommendation.save()
-        clubs = self.creator.clubmembership_set.exclude(
-            membership=ClubMembership.UserRoles.APPLICANT).values_list('club__pk')
-        clubRecs = ClubRecommendations.objects.filter(club__pk__in=clubs)
-        for club in clubRecs:
-            club.modified = True
-            club.save()
+        with transaction.atomic():
+            # Lock the row, so that concurrent edits of the review do not both remove the same previous rating
+            previous_rating = None
+            if self.pk is not None:
+                previous_rating = BookReview.objects.select_for_update().filter(pk=self.pk).values_list('book_id', 'book_rating').first()
+            super().save(**kwargs)
+            if previous_rating != (self.book_id, self.book_rating):
+                if previous_rating is not None:
+                    BookRatingStatistics.remove_rating(*previous_rating)
+                    ClubBookRatings.update_user_rating(self.creator_id, *previous_rating, -1)
+                BookRatingStatistics.add_rating(self.book_id, self.book_rating)
+                ClubBookRatings.update_user_rating(self.creator_id, self.book_id, self.book_rating, 1)
+            recommendations_invalidator.invalidate_user(self.creator_id)
+
+
+@receiver(post_save, sender=BookReview)
+def add_loaded_review_rating(sender, instance, raw, **kwargs):
+    """Add the rating of a BookReview loaded from a fixture (saved without calling save()) to the rating statistics of its Book
+    and to the profiles of its creator's Clubs."""
+    if raw:
+        BookRatingStatistics.add_rating(instance.book_id, instance.book_rating)
+        ClubBookRatings.update_user_rating(instance.creator_id, instance.book_id, instance.book_rating, 1)
+
+
+@receiver(post_delete, sender=BookReview)
+def remove_deleted_review_rating(sender, instance, **kwargs):
+    """Remove the rating of a deleted BookReview from the rating statistics of its Book and from the profiles of its creator's
+    Clubs, and invalidate the recommendations of its creator (also called when the review is deleted in bulk or along with its User/Book)."""
+    BookRatingStatistics.remove_rating(instance.book_id, instance.book_rating)
+    ClubBookRatings.update_user_rating(instance.creator_id, instance.book_id, instance.book_rating, -1)
+    recommendations_invalidator.invalidate_user(instance.creator_id)
 
 
 class BookReviewComment(TextComment):
@@ -0,0 +1,329 @@
+"""Synthetic dataset generator, for load and scale testing."""
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from BookClub.models import (Book, BookRatingStatistics, BookReview, Club, ClubBookRatings, ClubMembership, Forum, User,
+                             UserToUserRelationship, Vote)
+
+
+class SyntheticDatasetGenerator:
+    """Generate users, books, ratings, clubs, memberships, votes and follows at a configurable scale, with power-law
+    distributions: a few users rate (and vote, and follow) a lot while most users rate a few books, a few books and
+    clubs get most of the ratings and members, and a few users get most of the followers, as in the real datasets.
+
+    The whole dataset is generated as integer arrays (indices of the users, books, clubs and reviews, starting from 0),
+    so that millions of rows fit in memory; it is then written as BX-format CSV files (write_csv) or inserted into the
+    database in batches (load_into_database), without going through the save() of each object.
+
+    Attributes:
+        number_of_users, number_of_books, number_of_ratings, number_of_clubs, number_of_memberships,
+        number_of_follows, number_of_votes: The (maximum) number of rows of each kind. Ratings, memberships, follows
+            and votes are unique per pair, so fewer rows are generated if the pairs run out.
+        user_activity_exponent: The exponent of the power law of the number of ratings, memberships, votes and
+            follows of the users (0 for a uniform distribution).
+        popularity_exponent: The exponent of the power law of the popularity of the books, clubs, reviews and
+            followed users.
+        seed: The seed of the random generator, so that the same parameters always generate the same dataset.
+    """
+    password = 'pbkdf2_sha256$260000$qw2y9qdBlYmFUZVdkUqlOO$nuzhHvRnVDDOAo70OL14IEqk+bASVNTLjWS1N+c40VU='
+    number_of_categories = 200
+    words = ["Shadow", "River", "Silent", "Garden", "Winter", "Stone", "Secret", "Night", "Golden", "House", "Lost",
+             "Summer", "Empire", "Ocean", "Glass", "Fire", "Forest", "Letters", "Island", "Crown", "Storm", "Light"]
+    first_names = ["Anna", "James", "Maria", "John", "Sofia", "David", "Emma", "Peter", "Laura", "Michael", "Julia", "Paul"]
+    last_names = ["Smith", "Jones", "Brown", "Taylor", "Wilson", "Evans", "Thomas", "Roberts", "Walker", "Wright", "Green"]
+    publishers = ["Penguin", "Vintage", "HarperCollins", "Bantam", "Random House", "Pan", "Orbit", "Faber and Faber"]
+    countries = ["usa", "canada", "united kingdom", "germany", "spain", "australia", "france", "italy"]
+
+    def __init__(self, number_of_users=1000, number_of_books=2000, number_of_ratings=20000, number_of_clubs=50,
+                 number_of_memberships=1000, number_of_follows=5000, number_of_votes=5000,
+                 user_activity_exponent=1.0, popularity_exponent=1.0, seed=0):
+        self.number_of_users = number_of_users
+        self.number_of_books = number_of_books
+        self.number_of_ratings = number_of_ratings
+        self.number_of_clubs = number_of_clubs
+        self.number_of_memberships = number_of_memberships
+        self.number_of_follows = number_of_follows
+        self.number_of_votes = number_of_votes
+        self.user_activity_exponent = user_activity_exponent
+        self.popularity_exponent = popularity_exponent
+        self.seed = seed
+        self.random = np.random.default_rng(seed)
+        self.generate()
+
+    def get_power_law_weights(self, size, exponent):
+        """Get the (normalised) weights of a power law over size items, the ranks being randomly assigned to the items."""
+        if size == 0:
+            return np.zeros(0)
+        weights = 1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent
+        weights = weights[self.random.permutation(size)]
+        return weights / weights.sum()
+
+    def sample_unique_pairs(self, number_of_pairs, left_weights, right_weights, distinct=False, max_rounds=20):
+        """Sample (up to) number_of_pairs unique (left, right) pairs, each side following its weights, as two arrays
+        sorted by left then right index; if distinct is True, the left and right indices of a pair are different."""
+        number_of_rights = len(right_weights)
+        max_pairs = len(left_weights) * number_of_rights - (min(len(left_weights), number_of_rights) if distinct else 0)
+        number_of_pairs = min(number_of_pairs, max_pairs)
+        keys = np.zeros(0, dtype=np.int64)
+        for round_number in range(max_rounds):
+            missing_pairs = number_of_pairs - len(keys)
+            if missing_pairs <= 0:
+                break
+            sample_size = int(missing_pairs * 1.2) + 16
+            lefts = self.random.choice(len(left_weights), size=sample_size, p=left_weights)
+            rights = self.random.choice(number_of_rights, size=sample_size, p=right_weights)
+            if distinct:
+                lefts, rights = lefts[lefts != rights], rights[lefts != rights]
+            # Sort and drop the duplicates (np.unique is several times slower on tens of millions of keys)
+            keys = np.sort(np.concatenate((keys, lefts.astype(np.int64) * number_of_rights + rights)), kind='stable')
+            keys = keys[np.append(True, keys[1:] != keys[:-1])[:len(keys)]]
+        if len(keys) > number_of_pairs:
+            keys = np.sort(self.random.choice(keys, size=number_of_pairs, replace=False))
+        return keys // number_of_rights, keys % number_of_rights
+
+    def generate(self):
+        """Generate all the rows of the dataset."""
+        user_activity = self.get_power_law_weights(self.number_of_users, self.user_activity_exponent)
+        book_popularity = self.get_power_law_weights(self.number_of_books, self.popularity_exponent)
+
+        # Books: a quality (the mean of their ratings), (1 to 4) categories and a publication year
+        self.book_qualities = np.clip(self.random.normal(7.0, 1.5, size=self.number_of_books), 1, 10)
+        category_popularity = self.get_power_law_weights(self.number_of_categories, self.popularity_exponent)
+        self.book_categories = self.random.choice(self.number_of_categories, size=(self.number_of_books, 4), p=category_popularity)
+        self.book_categories_counts = self.random.integers(1, 5, size=self.number_of_books)
+        self.book_years = self.random.integers(1950, 2022, size=self.number_of_books)
+
+        # Ratings (one BookReview per user and book), around the quality of the book
+        self.rating_users, self.rating_books = self.sample_unique_pairs(self.number_of_ratings, user_activity, book_popularity)
+        ratings = self.book_qualities[self.rating_books] + self.random.normal(0, 1.5, size=len(self.rating_books))
+        self.ratings = np.clip(np.rint(ratings), 1, 10).astype(np.int8)
+
+        # Clubs: each one has an owner, the other members (a tenth of them being moderators and a tenth applicants)
+        # join the popular clubs first
+        self.club_owners = self.random.choice(self.number_of_users, size=self.number_of_clubs, p=user_activity) if self.number_of_users > 0 else np.zeros(0, dtype=np.int64)
+        self.club_private = self.random.random(self.number_of_clubs) < 0.2
+        club_popularity = self.get_power_law_weights(self.number_of_clubs, self.popularity_exponent)
+        # The users who join the most clubs are not the users who rate the most books
+        member_activity = self.get_power_law_weights(self.number_of_users, self.user_activity_exponent)
+        member_clubs, member_users = self.sample_unique_pairs(max(self.number_of_memberships - self.number_of_clubs, 0), club_popularity, member_activity)
+        not_owners = self.club_owners[member_clubs] != member_users
+        member_clubs, member_users = member_clubs[not_owners], member_users[not_owners]
+        roles = self.random.choice([ClubMembership.UserRoles.MEMBER, ClubMembership.UserRoles.MODERATOR, ClubMembership.UserRoles.APPLICANT],
+                                   size=len(member_clubs), p=[0.8, 0.1, 0.1])
+        self.membership_clubs = np.concatenate((np.arange(self.number_of_clubs), member_clubs))
+        self.membership_users = np.concatenate((self.club_owners, member_users))
+        self.membership_roles = np.concatenate((np.full(self.number_of_clubs, int(ClubMembership.UserRoles.OWNER)), roles))
+
+        # Follows: the active users follow the popular users
+        followed_popularity = self.get_power_law_weights(self.number_of_users, self.popularity_exponent)
+        self.follow_sources, self.follow_targets = self.sample_unique_pairs(self.number_of_follows, user_activity, followed_popularity, distinct=True)
+
+        # Votes on the reviews (4 upvotes for each downvote): the reviews of the popular books get most of them
+        review_popularity = book_popularity[self.rating_books]
+        review_popularity = review_popularity / review_popularity.sum() if len(review_popularity) > 0 else review_popularity
+        self.vote_users, self.vote_reviews = self.sample_unique_pairs(self.number_of_votes, user_activity, review_popularity)
+        self.vote_types = self.random.random(len(self.vote_reviews)) < 0.8
+        self.review_ratings = np.bincount(self.vote_reviews, weights=np.where(self.vote_types, 1, -1), minlength=len(self.ratings)).astype(np.int64)
+
+        # Users: an age (only written in the CSV files)
+        self.user_ages = self.random.integers(16, 80, size=self.number_of_users)
+
+    def get_isbn(self, book_id):
+        return f"S{book_id:09d}"
+
+    def get_username(self, user_id):
+        return f"synthetic_{user_id}"
+
+    def get_book_title(self, book):
+        return f"{self.words[book % len(self.words)]} {self.words[(book // len(self.words)) % len(self.words)]} {book}"
+
+    def get_book_author(self, book):
+        return f"{self.first_names[book % len(self.first_names)]} {self.last_names[(book // 7) % len(self.last_names)]}"
+
+    def write_csv_rows(self, file_path, number_of_rows, get_rows, chunk_size, bx_format=True):
+        """Write the rows of a CSV file in chunks of (up to) {chunk_size} rows, get_rows(start, end) returning the DataFrame of
+        the rows [start, end); in BX format (';' separated, all values quoted) or in the format of the book depository file."""
+        options = {"sep": ";", "quoting": csv.QUOTE_ALL} if bx_format else {}
+        with open(file_path, "w", encoding="ISO-8859-1" if bx_format else "utf-8", newline="") as file:
+            for start in range(0, max(number_of_rows, 1), chunk_size):
+                get_rows(start, min(start + chunk_size, number_of_rows)).to_csv(file, header=(start == 0), index=False, **options)
+
+    def write_csv(self, directory, chunk_size=1000000):
+        """Write the dataset as BX-format CSV files (BX-Users.csv, BX_Books.csv and BX-Book-Ratings.csv, users being
+        numbered from 1), along with the book depository file of the content-based recommender and CSV files of the clubs,
+        memberships, follows and votes, in the same format; all files are written in chunks of {chunk_size} rows."""
+        os.makedirs(directory, exist_ok=True)
+        self.write_csv_rows(os.path.join(directory, "BX-Users.csv"), self.number_of_users, lambda start, end: pd.DataFrame({
+            "User-ID": np.arange(start, end) + 1,
+            "Location": [f"city {user % 1000}, region {user % 50}, {self.countries[user % len(self.countries)]}" for user in range(start, end)],
+            "Age": self.user_ages[start:end]
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "BX_Books.csv"), self.number_of_books, lambda start, end: pd.DataFrame({
+            "ISBN": [self.get_isbn(book + 1) for book in range(start, end)],
+            "Book-Title": [self.get_book_title(book) for book in range(start, end)],
+            "Book-Author": [self.get_book_author(book) for book in range(start, end)],
+            "Year-Of-Publication": self.book_years[start:end],
+            "Publisher": [self.publishers[book % len(self.publishers)] for book in range(start, end)],
+            "Image-URL-S": "", "Image-URL-M": "", "Image-URL-L": ""
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "BX-Book-Ratings.csv"), len(self.ratings), lambda start, end: pd.DataFrame({
+            "User-ID": self.rating_users[start:end] + 1,
+            "ISBN": [self.get_isbn(book + 1) for book in self.rating_books[start:end]],
+            "Book-Rating": self.ratings[start:end]
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "filtered_book_depository_dataset.csv"), self.number_of_books, lambda start, end: pd.DataFrame({
+            "isbn10": [self.get_isbn(book + 1) for book in range(start, end)],
+            "categories": [str(sorted(set(categories[:count])))
+                           for categories, count in zip(self.book_categories[start:end].tolist(), self.book_categories_counts[start:end].tolist())],
+            "publication-date": [f"{year}-01-01 00:00:00" for year in self.book_years[start:end]],
+            "title": [self.get_book_title(book) for book in range(start, end)]
+        }), chunk_size, bx_format=False)
+        self.write_csv_rows(os.path.join(directory, "Clubs.csv"), self.number_of_clubs, lambda start, end: pd.DataFrame({
+            "Club-ID": np.arange(start, end) + 1,
+            "Name": [f"Synthetic Club {club + 1}" for club in range(start, end)],
+            "Is-Private": self.club_private[start:end].astype(int)
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "Club-Memberships.csv"), len(self.membership_users), lambda start, end: pd.DataFrame({
+            "User-ID": self.membership_users[start:end] + 1, "Club-ID": self.membership_clubs[start:end] + 1, "Membership": self.membership_roles[start:end]
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "Follows.csv"), len(self.follow_sources), lambda start, end: pd.DataFrame({
+            "User-ID": self.follow_sources[start:end] + 1, "Followed-User-ID": self.follow_targets[start:end] + 1
+        }), chunk_size)
+        self.write_csv_rows(os.path.join(directory, "Review-Votes.csv"), len(self.vote_reviews), lambda start, end: pd.DataFrame({
+            "User-ID": self.vote_users[start:end] + 1,
+            "Review-User-ID": self.rating_users[self.vote_reviews[start:end]] + 1,
+            "ISBN": [self.get_isbn(book + 1) for book in self.rating_books[self.vote_reviews[start:end]]],
+            "Vote-Type": self.vote_types[start:end].astype(int)
+        }), chunk_size)
+
+    def get_next_id(self, model):
+        """Get the first free primary key of the model (the rows are inserted with explicit primary keys)."""
+        return (model.objects.aggregate(max_id=models.Max('pk'))['max_id'] or 0) + 1
+
+    def insert_rows(self, model, columns, number_of_rows, batch_size):
+        """Insert rows of the model with raw batched INSERT statements (bulk_create builds and prepares a model instance per
+        row, which is too slow for millions of rows). columns maps the (attribute) names of fields to a function giving their
+        values for the rows [start, end), or to a constant; the other fields take their default value (or the current date
+        and time), and the primary key is generated by the database if it is not given."""
+        now = timezone.now()
+        names, constants, functions = [], [], []
+        for field in model._meta.concrete_fields:
+            if field.attname in columns:
+                value = columns[field.attname]
+            elif field.primary_key:
+                continue
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                value = now if isinstance(field, models.DateTimeField) else now.date()
+            else:
+                value = field.get_default()
+            names.append(connection.ops.quote_name(field.column))
+            if callable(value):
+                constants.append(None)
+                functions.append((len(names) - 1, value))
+            else:
+                constants.append(field.get_db_prep_save(value, connection))
+        sql = f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({', '.join(names)}) VALUES ({', '.join(['%s'] * len(names))})"
+        with connection.cursor() as cursor:
+            for start in range(0, number_of_rows, batch_size):
+                end = min(start + batch_size, number_of_rows)
+                values = [[constant] * (end - start) for constant in constants]
+                for index, function in functions:
+                    values[index] = function(start, end)
+                cursor.executemany(sql, list(zip(*values)))
+
+    def load_into_database(self, batch_size=5000, print_status=False):
+        """Insert the dataset into the database, in batches of batch_size rows, after the existing rows (with explicit primary
+        keys, so that the rows can refer to each other without reading them back). The rating statistics of the books and
+        the rating profiles of the clubs are rebuilt afterwards, as the rows are not inserted through their save().
+        Returns the dictionary of the first primary key of the users, books, reviews, clubs and votes inserted."""
+        first_ids = {name: self.get_next_id(model) for name, model in
+                     [("user", User), ("book", Book), ("review", BookReview), ("club", Club), ("vote", Vote)]}
+        user_ids = np.arange(self.number_of_users) + first_ids["user"]
+        book_ids = np.arange(self.number_of_books) + first_ids["book"]
+        club_ids = np.arange(self.number_of_clubs) + first_ids["club"]
+        review_ids = np.arange(len(self.ratings)) + first_ids["review"]
+        vote_ids = np.arange(len(self.vote_reviews)) + first_ids["vote"]
+
+        def print_progress(message):
+            if print_status:
+                print(message)
+
+        with transaction.atomic():
+            print_progress(f"Inserting {self.number_of_users} users...")
+            self.insert_rows(User, {
+                "id": lambda start, end: user_ids[start:end].tolist(),
+                "username": lambda start, end: [self.get_username(user_id) for user_id in user_ids[start:end].tolist()],
+                "email": lambda start, end: [f"{self.get_username(user_id)}@example.org" for user_id in user_ids[start:end].tolist()],
+                "public_bio": "Synthetic user",
+                "password": self.password
+            }, self.number_of_users, batch_size)
+            print_progress(f"Inserting {self.number_of_books} books...")
+            self.insert_rows(Book, {
+                "id": lambda start, end: book_ids[start:end].tolist(),
+                "ISBN": lambda start, end: [self.get_isbn(book_id) for book_id in book_ids[start:end].tolist()],
+                "title": lambda start, end: [self.get_book_title(book) for book in range(start, end)],
+                "author": lambda start, end: [self.get_book_author(book) for book in range(start, end)],
+                "publicationYear": lambda start, end: [f"{year}-01-01" for year in self.book_years[start:end].tolist()],
+                "publisher": lambda start, end: [self.publishers[book % len(self.publishers)] for book in range(start, end)]
+            }, self.number_of_books, batch_size)
+            print_progress(f"Inserting {len(self.ratings)} reviews...")
+            self.insert_rows(BookReview, {
+                "id": lambda start, end: review_ids[start:end].tolist(),
+                "creator_id": lambda start, end: user_ids[self.rating_users[start:end]].tolist(),
+                "book_id": lambda start, end: book_ids[self.rating_books[start:end]].tolist(),
+                "book_rating": lambda start, end: self.ratings[start:end].tolist(),
+                "rating": lambda start, end: self.review_ratings[start:end].tolist(),
+                "title": "Review", "slug": "review", "content": "Synthetic review"
+            }, len(self.ratings), batch_size)
+            print_progress(f"Inserting {self.number_of_clubs} clubs (with their forums) and {len(self.membership_users)} memberships...")
+            self.insert_rows(Club, {
+                "id": lambda start, end: club_ids[start:end].tolist(),
+                "name": lambda start, end: [f"Synthetic Club {club_id}" for club_id in club_ids[start:end].tolist()],
+                "club_url_name": lambda start, end: [f"synthetic_club_{club_id}" for club_id in club_ids[start:end].tolist()],
+                "description": "Synthetic club",
+                "is_private": lambda start, end: self.club_private[start:end].tolist()
+            }, self.number_of_clubs, batch_size)
+            self.insert_rows(Forum, {
+                "title": lambda start, end: [f"synthetic_club_{club_id} forum" for club_id in club_ids[start:end].tolist()],
+                "slug": lambda start, end: [f"synthetic_club_{club_id}-forum" for club_id in club_ids[start:end].tolist()],
+                "associated_with_id": lambda start, end: club_ids[start:end].tolist()
+            }, self.number_of_clubs, batch_size)
+            self.insert_rows(ClubMembership, {
+                "user_id": lambda start, end: user_ids[self.membership_users[start:end]].tolist(),
+                "club_id": lambda start, end: club_ids[self.membership_clubs[start:end]].tolist(),
+                "membership": lambda start, end: self.membership_roles[start:end].tolist()
+            }, len(self.membership_users), batch_size)
+            print_progress(f"Inserting {len(self.follow_sources)} follows and {len(self.vote_reviews)} votes...")
+            self.insert_rows(UserToUserRelationship, {
+                "source_user_id": lambda start, end: user_ids[self.follow_sources[start:end]].tolist(),
+                "target_user_id": lambda start, end: user_ids[self.follow_targets[start:end]].tolist(),
+                "relationship_type": UserToUserRelationship.UToURelationshipTypes.FOLLOWING
+            }, len(self.follow_sources), batch_size)
+            self.insert_rows(Vote, {
+                "id": lambda start, end: vote_ids[start:end].tolist(),
+                "creator_id": lambda start, end: user_ids[self.vote_users[start:end]].tolist(),
+                "type": lambda start, end: self.vote_types[start:end].tolist(),
+                "content_type_id": ContentType.objects.get_for_model(BookReview).pk,
+                "object_id": lambda start, end: review_ids[self.vote_reviews[start:end]].tolist()
+            }, len(self.vote_reviews), batch_size)
+            self.insert_rows(BookReview.votes.through, {
+                "bookreview_id": lambda start, end: review_ids[self.vote_reviews[start:end]].tolist(),
+                "vote_id": lambda start, end: vote_ids[start:end].tolist()
+            }, len(self.vote_reviews), batch_size)
+
+            # Move the sequences of the primary keys after the inserted rows (not needed with SQLite)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [User, Book, BookReview, Club, Vote]):
+                    cursor.execute(sql)
+
+            print_progress("Rebuilding the rating statistics of the books and the rating profiles of the clubs...")
+            BookRatingStatistics.rebuild_all()
+            ClubBookRatings.rebuild_all()
+        return first_ids
@@ -0,0 +1,64 @@
+"""Unit testing for the Recommender Benchmark"""
+from django.test import TestCase, tag
+from RecommenderModule.evaluation.benchmark import RecommenderBenchmark
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
+import tempfile
+import json
+
+
+@tag('recommenders', 'evaluation')
+class RecommenderBenchmarkTestCase(TestCase):
+    """Recommender Benchmark Tests, on a small generated dataset"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_clubs.json',
+        'BookClub/tests/fixtures/default_club_members.json'
+    ]
+
+    def setUp(self):
+        self.dataset = get_ratings_dataset(get_generated_ratings())
+        self.benchmark = RecommenderBenchmark(dataset=self.dataset, min_ratings_threshold=1, number_of_users=10, number_of_clubs=2,
+                                              isolated=False, print_status=False)
+
+    def test_build_trainset_samples_ratings(self):
+        self.assertEqual(self.benchmark.build_trainset().n_ratings, len(self.dataset.raw_ratings))
+        trainset = self.benchmark.build_trainset(100)
+        self.assertEqual(trainset.n_ratings, 100)
+        self.assertEqual(self.benchmark.build_trainset(100).ur, trainset.ur)
+
+    def test_benchmark_recommender_measures(self):
+        result = self.benchmark.benchmark_recommender(self.benchmark.build_trainset(), "item_based")
+        self.assertEqual(result["recommender"], "item_based")
+        self.assertEqual(result["number_of_users"], 30)
+        self.assertEqual(result["number_of_books"], 40)
+        self.assertTrue(result["fit_time_seconds"] > 0)
+        self.assertTrue(result["artifact_size_bytes"] > 40 * 40 * 4)
+        self.assertTrue(result["artifact_load_time_seconds"] > 0)
+        self.assertEqual(result["user_latency_ms"]["count"], 10)
+        self.assertTrue(result["user_latency_ms"]["p50"] <= result["user_latency_ms"]["p95"] <= result["user_latency_ms"]["p99"])
+        self.assertEqual(result["club_latency_ms"]["count"], 2)
+        self.assertTrue(result["peak_rss_mb"] > 0)
+
+    def test_load_artifact_loads_saved_model(self):
+        recommender = self.benchmark.create_recommender("popularity", self.benchmark.build_trainset())
+        with tempfile.TemporaryDirectory() as directory:
+            self.benchmark.save_artifact("popularity", recommender, directory)
+            popular_books_methods = self.benchmark.load_artifact("popularity", directory)
+        self.assertEqual(popular_books_methods.sorted_average_ratings, recommender.popular_books_methods.sorted_average_ratings)
+
+    def test_create_recommender_is_fitted_on_trainset(self):
+        trainset = self.benchmark.build_trainset(100)
+        recommender = self.benchmark.create_recommender("popularity", trainset)
+        self.assertIs(recommender.trainset, trainset)
+        user_id = trainset.to_raw_uid(0)
+        read_books = {trainset.to_raw_iid(item_inner_id) for item_inner_id, rating in trainset.ur[0]}
+        self.assertFalse(read_books & set(recommender.get_user_recommendations(user_id)))
+        self.assertEqual(self.benchmark.create_recommender("item_based", trainset).item_based_methods.trainset, trainset)
+
+    def test_run_benchmarks_report_is_json_serialisable(self):
+        report = self.benchmark.run_benchmarks(recommender_names=["item_based", "popularity"], dataset_sizes=[200, None])
+        self.assertEqual([(result["dataset_size"], result["recommender"]) for result in report["results"]],
+                         [(200, "item_based"), (200, "popularity"), (None, "item_based"), (None, "popularity")])
+        self.assertEqual(report["parameters"]["dataset_sizes"], [200, None])
+        self.assertFalse(report["parameters"]["isolated"])
+        self.assertEqual(json.loads(json.dumps(report)), report)
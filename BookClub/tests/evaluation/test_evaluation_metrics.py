@@ -5,6 +5,7 @@ from RecommenderModule.evaluation.resources.evaluation_data_provider import Eval
 from RecommenderModule.evaluation.resources.evaluation_metrics import EvaluationMetrics
 from collections import Counter
 from RecommenderModule.recommenders.popular_books_recommender import PopularBooksRecommender
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
 
 
 @tag('recommenders', 'evaluation')
@@ -111,3 +112,68 @@ class EvaluationMetricsTestCase(TestCase):
         book_coverage_1 = self.evaluation_metrics.get_book_coverage(test_recommender)
         book_coverage_2 = len(test_recommender.popular_books_methods.filtered_books_list) / self.trainset.n_items
         self.assertEqual(book_coverage_1, book_coverage_2)
+
+
+@tag('recommenders', 'evaluation')
+class EvaluationMetricsSinglePassTestCase(TestCase):
+    """Evaluation Metrics Tests, comparing the single-pass metrics with the metrics computed one by one, on a small generated dataset"""
+    def setUp(self):
+        ratings = get_generated_ratings(is_rated=lambda user_id, book_id: (user_id + 2 * book_id) % 7 < user_id % 5 + 1)
+        evaluation_data_provider = EvaluationDataProvider(get_ratings_dataset(ratings))
+        self.trainset, self.testset = evaluation_data_provider.get_loocv_datasets()
+        self.evaluation_metrics = EvaluationMetrics(self.trainset, self.testset)
+        self.recommendations = {}
+        for user_index, (user_id, book_id, rating) in enumerate(self.testset):
+            user_recommendations = [str((user_index + i) % 45) for i in range(user_index % 11)]
+            if user_index % 3 == 0:
+                user_recommendations.insert(user_index % 4, book_id)
+            self.recommendations[user_id] = user_recommendations
+
+    def test_compute_list_books_sorted_by_most_read_same_as_counter(self):
+        all_book_occurrences = []
+        for user_inner_id, item_inner_id, rating in self.trainset.all_ratings():
+            all_book_occurrences.append(self.trainset.to_raw_iid(item_inner_id))
+        sorted_books = sorted(Counter(all_book_occurrences).items(), key=lambda item: item[1], reverse=True)
+        self.assertEqual(self.evaluation_metrics.popularity_list, [pair[0] for pair in sorted_books])
+        for rank, book_isbn in enumerate(self.evaluation_metrics.popularity_list, start=1):
+            self.assertEqual(self.evaluation_metrics.popularity_ranks[book_isbn], rank)
+
+    def test_get_all_metrics(self):
+        hits = 0
+        reciprocal_hits = 0
+        good_recommendation_users = set()
+        for user_id, book_id, rating in self.testset:
+            if book_id in self.recommendations[user_id]:
+                hits += 1
+                reciprocal_hits += 1 / (self.recommendations[user_id].index(book_id) + 1)
+                good_recommendation_users.add(user_id)
+        popularity_list = self.evaluation_metrics.popularity_list
+        popularity_ranks = [popularity_list.index(isbn) + 1 if isbn in popularity_list else len(popularity_list) + 1
+                            for user_recommendations in self.recommendations.values() for isbn in user_recommendations]
+        metrics = self.evaluation_metrics.get_all_metrics(self.recommendations)
+        self.assertTrue(hits > 0)
+        self.assertEqual(metrics["hit_rate"], hits / len(self.testset))
+        self.assertAlmostEqual(metrics["average_reciprocal_hit_rate"], reciprocal_hits / len(self.testset))
+        self.assertEqual(metrics["precision"], hits / len(popularity_ranks))
+        self.assertEqual(metrics["novelty"], sum(popularity_ranks) / len(popularity_ranks))
+        self.assertEqual(metrics["user_coverage"], len(good_recommendation_users) / len(self.recommendations))
+        eligible_users = [user_id for user_id, user_recommendations in self.recommendations.items() if user_recommendations != []]
+        self.assertEqual(metrics["recommendation_eligible_users_rate"], len(eligible_users) / self.trainset.n_users)
+        self.assertEqual(self.evaluation_metrics.get_f1_score(self.recommendations), metrics["f1_score"])
+
+    def test_getters_same_as_all_metrics(self):
+        metrics = self.evaluation_metrics.get_all_metrics(self.recommendations)
+        self.assertEqual(self.evaluation_metrics.get_hit_rate(self.recommendations), metrics["hit_rate"])
+        self.assertEqual(self.evaluation_metrics.get_average_reciprocal_hit_rate(self.recommendations), metrics["average_reciprocal_hit_rate"])
+        self.assertEqual(self.evaluation_metrics.get_precision(self.recommendations), metrics["precision"])
+        self.assertEqual(self.evaluation_metrics.get_novelty(self.recommendations), metrics["novelty"])
+        self.assertEqual(self.evaluation_metrics.get_recommendation_eligible_users_rate(self.recommendations), metrics["recommendation_eligible_users_rate"])
+        self.assertEqual(self.evaluation_metrics.get_user_coverage(self.recommendations), metrics["user_coverage"])
+
+    def test_get_all_metrics_without_recommended_books(self):
+        recommendations = {user_id: [] for user_id, book_id, rating in self.testset}
+        metrics = self.evaluation_metrics.get_all_metrics(recommendations)
+        self.assertEqual(metrics["hit_rate"], 0)
+        self.assertEqual(metrics["precision"], 0)
+        self.assertEqual(metrics["f1_score"], 0)
+        self.assertEqual(metrics["novelty"], 0)
@@ -1,6 +1,9 @@
 """Unit testing for Evaluator"""
 from django.test import TestCase, tag
 from RecommenderModule.evaluation.evaluator import Evaluator
+from RecommenderModule.evaluation.resources.evaluation_data_provider import EvaluationDataProvider
+from RecommenderModule.recommenders.item_based_recommender import ItemBasedRecommender
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
 
 
 @tag('recommenders', 'evaluation')
@@ -42,3 +45,33 @@ class EvaluatorTestCase(TestCase):
             {'parameter 1': 2, 'parameter 2': 4, 'parameter 3': 5, 'parameter 4': 3},
             {'parameter 1': 2, 'parameter 2': 4, 'parameter 3': 6, 'parameter 4': 3}
         ])
+
+
+@tag('recommenders', 'evaluation')
+class ParallelEvaluatorTestCase(TestCase):
+    """Evaluator Tests using several worker processes, on a small generated dataset"""
+    def setUp(self):
+        self.trainset, self.testset = EvaluationDataProvider(get_ratings_dataset(get_generated_ratings())).get_loocv_datasets()
+        self.parameters_dict = {
+            'min_support': [1, 2],
+            'model_function_name': ['msd']
+        }
+
+    def get_evaluator(self, number_of_workers):
+        return Evaluator(print_status=False, number_of_workers=number_of_workers, trainset=self.trainset, testset=self.testset)
+
+    def test_get_recommendations_with_sharded_users_same_as_single_process(self):
+        recommender = ItemBasedRecommender()
+        recommendations1 = self.get_evaluator(1).get_recommendations(recommender, {'min_support': 1}, shard_users=True)
+        recommendations2 = self.get_evaluator(3).get_recommendations(recommender, {'min_support': 1}, shard_users=True)
+        self.assertEqual(recommendations1, recommendations2)
+        self.assertEqual(len(recommendations2), self.trainset.n_users)
+
+    def test_evaluate_all_combinations_concurrently_same_as_single_process(self):
+        results1 = self.get_evaluator(1).evaluate_all_combinations(ItemBasedRecommender(), self.parameters_dict)
+        results2 = self.get_evaluator(2).evaluate_all_combinations(ItemBasedRecommender(), self.parameters_dict)
+        self.assertEqual(len(results2), 2)
+        for (combination1, evaluations1, wall_time1), (combination2, evaluations2, wall_time2) in zip(results1, results2):
+            self.assertEqual(combination1, combination2)
+            self.assertEqual(evaluations1, evaluations2)
+            self.assertTrue(wall_time2 > 0)
@@ -1,6 +1,9 @@
 """Helpers for project"""
 from django.urls import reverse
 from django.utils.http import urlencode
+from surprise import Dataset, Reader
+import pandas as pd
+import math
 
 
 def reverse_with_query(url_name, kwargs=None, query_kwargs=None):
@@ -20,6 +23,65 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def get_generated_ratings(number_of_users=30, number_of_books=40, is_rated=lambda user_id, book_id: (user_id + book_id) % 3 != 0,
+                          user_id_prefix=""):
+    """Generate the ratings of a small dataset for the recommender tests, as a dictionary {(user_id, book_id): rating}:
+        each user rates the books for which is_rated(user_id, book_id) is True with (user_id * book_id) % 10 + 1"""
+    return {
+        (f"{user_id_prefix}{user_id}", str(book_id)): (user_id * book_id) % 10 + 1
+        for user_id in range(number_of_users) for book_id in range(number_of_books) if is_rated(user_id, book_id)
+    }
+
+
+def get_ratings_dataset(ratings, shuffling_seed=None):
+    """Build the surprise Dataset of the ratings {(user_id, book_id): rating}, in their order or shuffled with the given seed"""
+    ratings_df = pd.DataFrame.from_records(
+        [[user_id, book_id, rating] for (user_id, book_id), rating in ratings.items()],
+        columns=["User-ID", "ISBN", "Book-Rating"]
+    )
+    if shuffling_seed is not None:
+        ratings_df = ratings_df.sample(frac=1, random_state=shuffling_seed)
+    reader = Reader(line_format='user item rating', sep=';', skip_lines=0, rating_scale=(0, 10))
+    return Dataset.load_from_df(ratings_df, reader)
+
+
+def compute_categories_similarity(categories1, categories2):
+    """Calculate the similarity value (between 0 and 1) between the categories of 2 books, pair by pair
+        (reference for the vectorized content-based similarity engine)"""
+    common_categories = [category for category in categories1 if category in categories2]
+    if len(common_categories) == 0:
+        return 0
+    return len(common_categories) / math.sqrt(len(categories1) * len(categories2))
+
+
+def compute_publication_year_similarity(publication_year_1, publication_year_2):
+    """Calculate the similarity value (between 0 and 1) between the publication years of 2 books, pair by pair
+        (reference for the vectorized content-based similarity engine)"""
+    return math.exp(-abs(publication_year_1 - publication_year_2) / 10.0)
+
+
+def get_content_similarity_between_books(book_content_dict_1, book_content_dict_2, using_publication_year=True):
+    """Get the overall similarity value (between 0 and 1) between the contents of 2 books, pair by pair
+        (reference for the vectorized content-based similarity engine)"""
+    categories_similarity = compute_categories_similarity(book_content_dict_1["categories"], book_content_dict_2["categories"])
+    if using_publication_year:
+        return categories_similarity * compute_publication_year_similarity(book_content_dict_1["publication_year"], book_content_dict_2["publication_year"])
+    return categories_similarity
+
+
+def get_similarities_dictionary(similarity_engine):
+    """Get the similarities dictionary (ISBN -> {ISBN -> similarity}) of all pairs of books with a non-zero similarity,
+        from the blocks of the similarities matrix computed by a content-based similarity engine"""
+    similarities_dictionary = {book_isbn: {} for book_isbn in similarity_engine.book_isbns}
+    for start, block in similarity_engine.iterate_similarities_blocks():
+        for block_row in range(block.shape[0]):
+            row_start, row_end = block.indptr[block_row], block.indptr[block_row + 1]
+            book_similarities = similarities_dictionary[similarity_engine.book_isbns[start + block_row]]
+            for column, similarity in zip(block.indices[row_start:row_end], block.data[row_start:row_end]):
+                book_similarities[similarity_engine.book_isbns[column]] = float(similarity)
+    return similarities_dictionary
+
+
 class LogInTester:
     """Test Login"""
     def _is_logged_in(self):
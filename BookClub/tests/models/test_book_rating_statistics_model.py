@@ -0,0 +1,112 @@
+"""Unit testing of the Book Rating Statistics Model"""
+from django.test import TestCase, tag
+import math
+
+from BookClub.models import Book, BookReview, BookRatingStatistics, User
+from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
+
+
+@tag('models', 'book_rating_statistics')
+class BookRatingStatisticsModelTestCase(TestCase):
+    """Book Rating Statistics Model, Updates and Methods Testing"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_books.json',
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_book_reviews.json',
+    ]
+
+    def setUp(self):
+        self.book = Book.objects.get(pk=3)
+        self.users = list(User.objects.all())
+
+    def create_review(self, user, book, rating):
+        return BookReview.objects.create(creator=user, book=book, book_rating=rating, title="Review", content="Lorem Ipsum")
+
+    def get_statistics(self, book):
+        return BookRatingStatistics.objects.get(book=book)
+
+    def assert_statistics_match_reviews(self, book):
+        ratings = sorted(BookReview.objects.filter(book=book).values_list('book_rating', flat=True))
+        statistics = self.get_statistics(book)
+        self.assertEqual(statistics.ratings_count, len(ratings))
+        self.assertEqual(statistics.ratings_sum, sum(ratings))
+        self.assertEqual(statistics.get_histogram(), [ratings.count(rating) for rating in range(11)])
+
+    def get_reviewed_books(self):
+        return Book.objects.filter(bookreview__isnull=False).distinct()
+
+    def test_fixtures_are_aggregated(self):
+        for book in self.get_reviewed_books():
+            self.assert_statistics_match_reviews(book)
+
+    def test_deleting_fixture_reviews_removes_ratings(self):
+        books = list(self.get_reviewed_books())
+        BookReview.objects.all().delete()
+        for book in books:
+            self.assertEqual(self.get_statistics(book).get_histogram(), [0] * 11)
+
+    def test_rebuild_all_matches_reviews(self):
+        BookRatingStatistics.objects.all().delete()
+        BookRatingStatistics.rebuild_all()
+        for book in self.get_reviewed_books():
+            self.assert_statistics_match_reviews(book)
+
+    def test_saving_new_review_adds_rating(self):
+        self.create_review(self.users[0], self.book, 7)
+        self.create_review(self.users[1], self.book, 4)
+        self.assert_statistics_match_reviews(self.book)
+
+    def test_updating_review_moves_rating(self):
+        review = self.create_review(self.users[0], self.book, 7)
+        review.book_rating = 2
+        review.save()
+        self.assert_statistics_match_reviews(self.book)
+        self.assertEqual(self.get_statistics(self.book).rating_7, 0)
+
+    def test_saving_review_without_rating_change_keeps_statistics(self):
+        review = self.create_review(self.users[0], self.book, 7)
+        review.title = "New title"
+        review.save()
+        self.assert_statistics_match_reviews(self.book)
+
+    def test_deleting_review_removes_rating(self):
+        review = self.create_review(self.users[0], self.book, 7)
+        self.create_review(self.users[1], self.book, 4)
+        review.delete()
+        self.assert_statistics_match_reviews(self.book)
+
+    def test_deleting_user_removes_ratings(self):
+        self.create_review(self.users[0], self.book, 7)
+        self.create_review(self.users[1], self.book, 4)
+        self.users[0].delete()
+        self.assert_statistics_match_reviews(self.book)
+
+    def test_average_median_and_combination_score(self):
+        for user, rating in zip(self.users, [2, 9, 5, 5]):
+            self.create_review(user, self.book, rating)
+        ratings = sorted(BookReview.objects.filter(book=self.book).values_list('book_rating', flat=True))
+        statistics = self.get_statistics(self.book)
+        average = sum(ratings) / len(ratings)
+        if len(ratings) % 2 == 0:
+            median = (ratings[len(ratings) // 2 - 1] + ratings[len(ratings) // 2]) / 2
+        else:
+            median = ratings[len(ratings) // 2]
+        self.assertEqual(statistics.get_average_rating(), average)
+        self.assertEqual(statistics.get_median_rating(), median)
+        self.assertEqual(statistics.get_combination_score(), math.sqrt(average * median))
+
+    def test_statistics_without_ratings(self):
+        statistics = BookRatingStatistics(book=self.book)
+        self.assertEqual(statistics.get_average_rating(), None)
+        self.assertEqual(statistics.get_median_rating(), None)
+        self.assertEqual(statistics.get_combination_score(), None)
+
+    def test_popularity_lists_from_statistics_same_as_from_trained_ratings(self):
+        for user, rating in zip(self.users, [2, 9, 5, 5]):
+            self.create_review(user, self.book, rating)
+        parameters = {'min_ratings_threshold': 1, 'ranking_method': 'combination'}
+        trained_methods = PopularBooksMethods(parameters=parameters, retraining=True, print_status=False)
+        statistics_methods = PopularBooksMethods(parameters=parameters, from_rating_statistics=True, print_status=False)
+        self.assertEqual(sorted(statistics_methods.sorted_average_ratings), sorted(trained_methods.sorted_average_ratings))
+        self.assertEqual(sorted(statistics_methods.sorted_median_ratings), sorted(trained_methods.sorted_median_ratings))
+        self.assertEqual(sorted(statistics_methods.sorted_combination_scores), sorted(trained_methods.sorted_combination_scores))
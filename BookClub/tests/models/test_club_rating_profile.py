@@ -0,0 +1,119 @@
+"""Unit testing of the Club Rating Profile Model"""
+from django.test import TestCase, tag
+
+from BookClub.models import Book, BookReview, Club, ClubBookRatings, ClubMembership, ClubRecommendations, User
+from BookClub.models.recommendations_invalidation import recommendations_invalidator
+
+
+@tag('models', 'club_rating_profile')
+class ClubRatingProfileModelTestCase(TestCase):
+    """Club Rating Profile Model and Incremental Updates Testing"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_books.json',
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_book_reviews.json',
+        'BookClub/tests/fixtures/default_clubs.json',
+        'BookClub/tests/fixtures/default_club_members.json'
+    ]
+
+    def setUp(self):
+        recommendations_invalidator.clear()
+        self.club = Club.objects.get(pk=1)
+        self.other_club = Club.objects.get(pk=3)
+        self.member = User.objects.get(pk=1)
+        self.non_member = User.objects.get(pk=6)
+
+    def tearDown(self):
+        recommendations_invalidator.clear()
+
+    def create_review(self, user, book, rating):
+        return BookReview.objects.create(creator=user, book=book, book_rating=rating, title="Review", content="Lorem Ipsum")
+
+    def get_profile(self, club):
+        return {book_id: (ratings_count, ratings_sum, positive_ratings_sum) for book_id, ratings_count, ratings_sum, positive_ratings_sum in
+                ClubBookRatings.objects.filter(club=club).values_list('book_id', 'ratings_count', 'ratings_sum', 'positive_ratings_sum')}
+
+    def get_expected_profile(self, club):
+        expected_profile = {}
+        for book_id, rating in BookReview.objects.filter(creator__clubmembership__club=club).values_list('book_id', 'book_rating'):
+            ratings_count, ratings_sum, positive_ratings_sum = expected_profile.get(book_id, (0, 0, 0))
+            expected_profile[book_id] = (ratings_count + 1, ratings_sum + rating,
+                                         positive_ratings_sum + (rating if rating >= ClubBookRatings.POSITIVE_RATING else 0))
+        return expected_profile
+
+    def assert_profiles_match_reviews(self):
+        for club in Club.objects.all():
+            self.assertEqual(self.get_profile(club), self.get_expected_profile(club))
+
+    def test_fixtures_are_aggregated(self):
+        self.assertEqual(self.get_profile(self.club)[1], (2, 2, 0))
+        self.assert_profiles_match_reviews()
+
+    def test_rebuild_all_matches_reviews(self):
+        ClubBookRatings.objects.all().delete()
+        ClubBookRatings.rebuild_all()
+        self.assert_profiles_match_reviews()
+
+    def test_saving_new_review_of_member_adds_rating(self):
+        self.create_review(self.member, Book.objects.get(pk=3), 8)
+        self.assertEqual(self.get_profile(self.club)[3], (1, 8, 8))
+        self.assert_profiles_match_reviews()
+
+    def test_changing_rating_updates_profile(self):
+        review = BookReview.objects.get(pk=1)
+        review.book_rating = 9
+        review.save()
+        self.assertEqual(self.get_profile(self.club)[1], (2, 10, 9))
+        self.assert_profiles_match_reviews()
+
+    def test_deleting_reviews_removes_ratings(self):
+        BookReview.objects.filter(book_id=1).delete()
+        self.assertFalse(1 in self.get_profile(self.club))
+        self.assert_profiles_match_reviews()
+
+    def test_review_of_non_member_does_not_change_profiles(self):
+        self.create_review(self.non_member, Book.objects.get(pk=3), 8)
+        self.assertEqual(ClubBookRatings.objects.filter(book_id=3).count(), 0)
+
+    def test_joining_club_adds_member_ratings(self):
+        self.create_review(self.non_member, Book.objects.get(pk=1), 7)
+        self.club.add_member(self.non_member)
+        self.assertEqual(self.get_profile(self.club)[1], (3, 9, 7))
+        self.assert_profiles_match_reviews()
+
+    def test_leaving_club_removes_member_ratings(self):
+        ClubMembership.objects.get(user=self.member, club=self.club).delete()
+        self.assertEqual(self.get_profile(self.club)[1], (1, 1, 0))
+        self.assert_profiles_match_reviews()
+
+    def test_deleting_user_removes_member_ratings(self):
+        User.objects.get(pk=7).delete()
+        self.assert_profiles_match_reviews()
+
+    def test_membership_changes_invalidate_club_recommendations(self):
+        club_recommendations = ClubRecommendations.objects.create(club=self.club, modified=False)
+        self.club.add_member(self.non_member)
+        club_recommendations.refresh_from_db()
+        self.assertTrue(club_recommendations.modified)
+
+    def test_applicants_invalidate_club_recommendations(self):
+        club_recommendations = ClubRecommendations.objects.create(club=self.other_club, modified=False)
+        self.create_review(self.non_member, Book.objects.get(pk=3), 8)
+        self.other_club.add_user(self.non_member, ClubMembership.UserRoles.APPLICANT)
+        self.assertEqual(self.get_profile(self.other_club)[3], (1, 8, 8))
+        club_recommendations.refresh_from_db()
+        self.assertTrue(club_recommendations.modified)
+        ClubRecommendations.objects.filter(pk=club_recommendations.pk).update(modified=False)
+        ClubMembership.objects.get(user=self.non_member, club=self.other_club).delete()
+        club_recommendations.refresh_from_db()
+        self.assertTrue(club_recommendations.modified)
+
+    def test_changing_role_keeps_profile(self):
+        self.other_club.add_user(self.non_member, ClubMembership.UserRoles.APPLICANT)
+        self.create_review(self.non_member, Book.objects.get(pk=3), 8)
+        profile = self.get_profile(self.other_club)
+        membership = ClubMembership.objects.get(user=self.non_member, club=self.other_club)
+        membership.membership = ClubMembership.UserRoles.MEMBER
+        membership.save()
+        self.assertEqual(self.get_profile(self.other_club), profile)
+        self.assert_profiles_match_reviews()
@@ -0,0 +1,91 @@
+"""Unit testing of the Recommendations Invalidation service"""
+from django.test import TestCase, tag, override_settings
+
+from BookClub.models import Book, BookReview, Club, ClubMembership, ClubRecommendations, User, UserRecommendations
+from BookClub.models.recommendations_invalidation import recommendations_invalidator
+
+
+@tag('models', 'recommendations')
+class RecommendationsInvalidationTestCase(TestCase):
+    """Recommendations Invalidation on Review changes and Coalescing Testing"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_books.json',
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_book_reviews.json',
+        'BookClub/tests/fixtures/default_clubs.json',
+        'BookClub/tests/fixtures/default_club_members.json'
+    ]
+
+    def setUp(self):
+        recommendations_invalidator.clear()
+        self.user = User.objects.get(pk=1)
+        self.other_user = User.objects.get(pk=3)
+        self.review = BookReview.objects.get(pk=1)
+        self.user_recommendations = UserRecommendations.objects.create(user=self.user, modified=False)
+        self.other_user_recommendations = UserRecommendations.objects.create(user=self.other_user, modified=False)
+        self.club_recommendations = ClubRecommendations.objects.create(club=Club.objects.get(pk=1), modified=False)
+        self.other_club_recommendations = ClubRecommendations.objects.create(club=Club.objects.get(pk=3), modified=False)
+
+    def tearDown(self):
+        recommendations_invalidator.clear()
+
+    def assertModified(self, recommendations, modified):
+        recommendations.refresh_from_db()
+        self.assertEqual(recommendations.modified, modified)
+
+    def test_saving_review_invalidates_creator_and_club_recommendations(self):
+        self.review.book_rating = 5
+        self.review.save()
+        self.assertModified(self.user_recommendations, True)
+        self.assertModified(self.club_recommendations, True)
+        self.assertIsNotNone(self.user_recommendations.invalidated_on)
+        self.assertModified(self.other_user_recommendations, False)
+        self.assertModified(self.other_club_recommendations, False)
+
+    def test_creating_review_invalidates_recommendations(self):
+        BookReview.objects.create(creator=self.user, book=Book.objects.get(pk=3), book_rating=7, title="Review", content="Lorem Ipsum")
+        self.assertModified(self.user_recommendations, True)
+        self.assertModified(self.club_recommendations, True)
+
+    def test_deleting_review_invalidates_recommendations(self):
+        self.review.delete()
+        self.assertModified(self.user_recommendations, True)
+        self.assertModified(self.club_recommendations, True)
+
+    def test_applicant_invalidates_club_recommendations(self):
+        applicant = User.objects.get(pk=6)
+        ClubMembership.objects.create(user=applicant, club=Club.objects.get(pk=3), membership=ClubMembership.UserRoles.APPLICANT)
+        self.assertModified(self.other_club_recommendations, True)
+        ClubRecommendations.objects.filter(pk=self.other_club_recommendations.pk).update(modified=False)
+        recommendations_invalidator.invalidate_user(applicant.pk)
+        self.assertModified(self.other_club_recommendations, True)
+
+    def test_invalidation_stamps_modified_recommendations(self):
+        UserRecommendations.objects.filter(pk=self.user_recommendations.pk).update(modified=True, invalidated_on=None)
+        recommendations_invalidator.invalidate_users([self.user.pk, self.other_user.pk])
+        self.assertModified(self.user_recommendations, True)
+        self.assertIsNotNone(self.user_recommendations.invalidated_on)
+        self.assertModified(self.other_user_recommendations, True)
+
+    def test_invalidations_within_window_are_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recommendations_invalidator.invalidate_user(self.user.pk)
+        UserRecommendations.objects.filter(pk=self.user_recommendations.pk).update(modified=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            recommendations_invalidator.invalidate_user(self.user.pk)
+        self.assertModified(self.user_recommendations, False)
+
+    @override_settings(RECOMMENDATIONS_INVALIDATION_WINDOW=0)
+    def test_invalidations_after_window_are_not_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recommendations_invalidator.invalidate_user(self.user.pk)
+        UserRecommendations.objects.filter(pk=self.user_recommendations.pk).update(modified=False)
+        recommendations_invalidator.invalidate_user(self.user.pk)
+        self.assertModified(self.user_recommendations, True)
+
+    def test_uncommitted_invalidations_are_not_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            recommendations_invalidator.invalidate_user(self.user.pk)
+        UserRecommendations.objects.filter(pk=self.user_recommendations.pk).update(modified=False)
+        recommendations_invalidator.invalidate_user(self.user.pk)
+        self.assertModified(self.user_recommendations, True)
@@ -0,0 +1,101 @@
+"""Unit testing for the Synthetic Dataset Generator"""
+from BookClub.synthetic_dataset import SyntheticDatasetGenerator
+from BookClub.models import (Book, BookRatingStatistics, BookReview, Club, ClubBookRatings, ClubMembership, Forum, User,
+                             UserToUserRelationship, Vote)
+from django.test import tag, TestCase
+import pandas as pd
+import numpy as np
+import tempfile
+import os
+
+
+@tag('synthetic_dataset')
+class SyntheticDatasetGeneratorTestCase(TestCase):
+    """Synthetic Dataset Generator Tests, at a small scale"""
+    fixtures = ['BookClub/tests/fixtures/default_users.json']
+
+    def setUp(self):
+        self.generator = SyntheticDatasetGenerator(number_of_users=200, number_of_books=300, number_of_ratings=3000, number_of_clubs=10,
+                                                   number_of_memberships=150, number_of_follows=500, number_of_votes=800)
+
+    def test_pairs_are_unique(self):
+        for lefts, rights in [(self.generator.rating_users, self.generator.rating_books),
+                              (self.generator.membership_users, self.generator.membership_clubs),
+                              (self.generator.follow_sources, self.generator.follow_targets),
+                              (self.generator.vote_users, self.generator.vote_reviews)]:
+            self.assertEqual(len(set(zip(lefts.tolist(), rights.tolist()))), len(lefts))
+        self.assertFalse(np.any(self.generator.follow_sources == self.generator.follow_targets))
+
+    def test_number_of_rows_generated(self):
+        self.assertEqual(len(self.generator.ratings), 3000)
+        self.assertEqual(len(self.generator.follow_sources), 500)
+        self.assertEqual(len(self.generator.vote_reviews), 800)
+        self.assertTrue(len(self.generator.membership_users) <= 150)
+        self.assertEqual(np.sum(self.generator.membership_roles == ClubMembership.UserRoles.OWNER), 10)
+        self.assertTrue(np.all((self.generator.ratings >= 1) & (self.generator.ratings <= 10)))
+
+    def test_number_of_pairs_capped_when_pairs_run_out(self):
+        generator = SyntheticDatasetGenerator(number_of_users=5, number_of_books=4, number_of_ratings=100, number_of_clubs=1,
+                                              number_of_memberships=100, number_of_follows=100, number_of_votes=0)
+        self.assertEqual(len(generator.ratings), 20)
+        self.assertEqual(len(generator.follow_sources), 20)
+        self.assertEqual(len(generator.membership_users), 5)
+
+    def test_ratings_follow_power_law(self):
+        ratings_per_user = np.sort(np.bincount(self.generator.rating_users, minlength=200))[::-1]
+        ratings_per_book = np.sort(np.bincount(self.generator.rating_books, minlength=300))[::-1]
+        self.assertTrue(ratings_per_user[0] > 10 * np.median(ratings_per_user))
+        self.assertTrue(ratings_per_book[0] > 10 * np.median(ratings_per_book))
+
+    def test_same_seed_generates_same_dataset(self):
+        generator = SyntheticDatasetGenerator(number_of_users=200, number_of_books=300, number_of_ratings=3000, number_of_clubs=10,
+                                              number_of_memberships=150, number_of_follows=500, number_of_votes=800)
+        self.assertTrue(np.array_equal(generator.rating_users, self.generator.rating_users))
+        self.assertTrue(np.array_equal(generator.ratings, self.generator.ratings))
+
+    def test_write_csv_in_bx_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.generator.write_csv(directory, chunk_size=1000)
+            ratings_df = pd.read_csv(os.path.join(directory, "BX-Book-Ratings.csv"), sep=';', encoding="ISO-8859-1")
+            books_df = pd.read_csv(os.path.join(directory, "BX_Books.csv"), sep=';', encoding="ISO-8859-1")
+            users_df = pd.read_csv(os.path.join(directory, "BX-Users.csv"), sep=';', encoding="ISO-8859-1")
+            content_df = pd.read_csv(os.path.join(directory, "filtered_book_depository_dataset.csv"))
+        self.assertEqual(list(ratings_df.columns), ["User-ID", "ISBN", "Book-Rating"])
+        self.assertEqual(len(ratings_df), 3000)
+        self.assertEqual(len(books_df), 300)
+        self.assertEqual(len(users_df), 200)
+        self.assertTrue(set(ratings_df["ISBN"]).issubset(books_df["ISBN"]))
+        self.assertEqual(list(content_df["isbn10"]), list(books_df["ISBN"]))
+
+    def test_write_csv_same_files_whatever_the_chunk_size(self):
+        random_state = self.generator.random.bit_generator.state
+        with tempfile.TemporaryDirectory() as directory1, tempfile.TemporaryDirectory() as directory2:
+            self.generator.write_csv(directory1, chunk_size=7)
+            self.generator.write_csv(directory2)
+            self.assertEqual(sorted(os.listdir(directory1)), sorted(os.listdir(directory2)))
+            for file_name in os.listdir(directory1):
+                with open(os.path.join(directory1, file_name), "rb") as file1, open(os.path.join(directory2, file_name), "rb") as file2:
+                    self.assertEqual(file1.read(), file2.read(), file_name)
+        self.assertEqual(self.generator.random.bit_generator.state, random_state)
+
+    def test_load_into_database(self):
+        users_count = User.objects.count()
+        first_ids = self.generator.load_into_database(batch_size=700)
+        self.assertEqual(User.objects.count(), users_count + 200)
+        self.assertEqual(Book.objects.count(), 300)
+        self.assertEqual(BookReview.objects.count(), 3000)
+        self.assertEqual(Club.objects.count(), 10)
+        self.assertEqual(Forum.objects.filter(associated_with__isnull=False).count(), 10)
+        self.assertEqual(ClubMembership.objects.count(), len(self.generator.membership_users))
+        self.assertEqual(UserToUserRelationship.objects.count(), 500)
+        self.assertEqual(Vote.objects.count(), 800)
+        self.assertEqual(first_ids["user"], User.objects.filter(username__startswith="synthetic_").order_by('pk').first().pk)
+        for club in Club.objects.all():
+            self.assertEqual(club.get_club_owner().pk, first_ids["user"] + self.generator.club_owners[club.pk - first_ids["club"]])
+        review = BookReview.objects.order_by('-rating').first()
+        self.assertEqual(review.rating, sum(1 if vote.type else -1 for vote in review.votes.all()))
+        statistics = BookRatingStatistics.objects.get(book=review.book)
+        self.assertEqual(statistics.ratings_count, BookReview.objects.filter(book=review.book).count())
+        self.assertTrue(ClubBookRatings.objects.exists())
+        self.assertEqual(User.objects.create_user(username="after_synthetic", email="after@example.org", public_bio="Bio").pk,
+                         first_ids["user"] + 200)
@@ -0,0 +1,59 @@
+"""Unit testing of Content Based MinHash Index"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.content_based_minhash_index import ContentBasedMinHashIndex
+from scipy import sparse
+import numpy as np
+
+
+@tag('recommenders')
+class ContentBasedMinHashIndexTestCase(TestCase):
+    """Content Based MinHash Index Testing"""
+
+    def setUp(self):
+        # Books 0 and 1 have the same categories, book 2 shares most of them, book 3 none, and book 4 has no categories
+        self.categories_matrix = self.get_categories_matrix([[0, 1, 2, 3], [0, 1, 2, 3], [0, 1, 2, 4], [5, 6], []], 7)
+
+    def get_categories_matrix(self, books_categories, number_of_categories):
+        rows = [book for book, categories in enumerate(books_categories) for category in categories]
+        columns = [category for categories in books_categories for category in categories]
+        return sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(books_categories), number_of_categories))
+
+    def test_books_with_same_categories_have_same_signatures(self):
+        minhash_index = ContentBasedMinHashIndex(self.categories_matrix)
+        self.assertEqual(minhash_index.signatures.shape, (5, 32))
+        self.assertTrue(np.array_equal(minhash_index.signatures[0], minhash_index.signatures[1]))
+        self.assertFalse(np.array_equal(minhash_index.signatures[0], minhash_index.signatures[3]))
+
+    def test_candidates_matrix_is_symmetric_without_same_book(self):
+        candidates_matrix = ContentBasedMinHashIndex(self.categories_matrix).get_candidates_matrix()
+        self.assertEqual(candidates_matrix.shape, (5, 5))
+        self.assertEqual((candidates_matrix != candidates_matrix.T).nnz, 0)
+        self.assertEqual(candidates_matrix.diagonal().sum(), 0)
+
+    def test_candidates_contain_books_with_same_categories(self):
+        candidates_matrix = ContentBasedMinHashIndex(self.categories_matrix, number_of_bands=4, rows_per_band=4).get_candidates_matrix()
+        self.assertTrue(candidates_matrix[0, 1])
+
+    def test_books_without_common_or_any_categories_are_not_candidates(self):
+        candidates_matrix = ContentBasedMinHashIndex(self.categories_matrix).get_candidates_matrix()
+        self.assertFalse(candidates_matrix[0, 3])
+        self.assertEqual(candidates_matrix[4].nnz, 0)
+        self.assertEqual(candidates_matrix[:, 4].nnz, 0)
+
+    def test_similar_books_are_found_with_many_bands(self):
+        random_generator = np.random.default_rng(1)
+        books_categories = []
+        for book in range(100):
+            categories = random_generator.choice(200, size=6, replace=False)
+            books_categories.append(list(categories))
+            books_categories.append(list(categories[:5]) + [200 + book])
+        candidates_matrix = ContentBasedMinHashIndex(self.get_categories_matrix(books_categories, 300), number_of_bands=32, rows_per_band=2).get_candidates_matrix()
+        found_pairs = sum(bool(candidates_matrix[2 * book, 2 * book + 1]) for book in range(100))
+        self.assertTrue(found_pairs >= 95)
+        self.assertTrue(candidates_matrix.nnz < 200 * 199 / 4)
+
+    def test_bucket_neighbours_are_limited(self):
+        categories_matrix = self.get_categories_matrix([[0, 1]] * 10, 2)
+        candidates_matrix = ContentBasedMinHashIndex(categories_matrix, max_bucket_neighbours=2).get_candidates_matrix()
+        self.assertTrue(candidates_matrix[0].nnz <= 2)
+        self.assertTrue(candidates_matrix[5].nnz <= 4)
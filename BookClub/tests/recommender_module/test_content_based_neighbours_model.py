@@ -0,0 +1,58 @@
+"""Unit testing of Content Based Neighbours Model"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.content_based_neighbours_model import ContentBasedNeighboursModel
+from RecommenderModule.recommenders.resources.content_based_similarity_engine import ContentBasedSimilarityEngine
+from BookClub.tests.helpers import get_similarities_dictionary
+import tempfile
+import os
+
+
+@tag('recommenders')
+class ContentBasedNeighboursModelTestCase(TestCase):
+    """Content Based Neighbours Model Testing"""
+
+    def setUp(self):
+        book_content_list = [
+            {"book_isbn": "014029192X", "categories": ["214", "228", "235"], "publication_year": 2000},
+            {"book_isbn": "033030058X", "categories": ["235", "3386", "840"], "publication_year": 1995},
+            {"book_isbn": "1559585595", "categories": ["235", "228"], "publication_year": 1970},
+            {"book_isbn": "0195153448", "categories": ["1"], "publication_year": 2002},
+            {"book_isbn": "0002005018", "categories": ["1", "2"], "publication_year": 2002}
+        ]
+        self.similarity_engine = ContentBasedSimilarityEngine(book_content_list)
+        self.similarities_dictionary = get_similarities_dictionary(self.similarity_engine)
+
+    def test_from_similarity_engine_keeps_all_non_zero_neighbours(self):
+        neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(self.similarity_engine, number_of_neighbours=10)
+        self.assertEqual(neighbours_model.get_number_of_books(), 5)
+        for book_isbn, book_similarities in self.similarities_dictionary.items():
+            indices, scores = neighbours_model.get_neighbours(neighbours_model.get_book_index(book_isbn))
+            self.assertEqual(len(indices), len(book_similarities))
+            for index, score in zip(indices, scores):
+                self.assertAlmostEqual(float(score), book_similarities[neighbours_model.book_isbns[index]], places=6)
+
+    def test_from_similarity_engine_keeps_top_k_sorted_neighbours(self):
+        neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(self.similarity_engine, number_of_neighbours=1)
+        indices, scores = neighbours_model.get_neighbours(neighbours_model.get_book_index("014029192X"))
+        self.assertEqual(len(indices), 1)
+        book_similarities = self.similarities_dictionary["014029192X"]
+        most_similar_book = max(book_similarities, key=book_similarities.get)
+        self.assertEqual(neighbours_model.book_isbns[indices[0]], most_similar_book)
+        neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(self.similarity_engine, number_of_neighbours=10)
+        indices, scores = neighbours_model.get_neighbours(neighbours_model.get_book_index("014029192X"))
+        self.assertEqual(list(scores), sorted(scores, reverse=True))
+
+    def test_get_book_index_wrong_isbn(self):
+        neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(self.similarity_engine)
+        self.assertEqual(neighbours_model.get_book_index("X"), None)
+
+    def test_save_and_load(self):
+        neighbours_model1 = ContentBasedNeighboursModel.from_similarity_engine(self.similarity_engine)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "neighbours_model.npz")
+            neighbours_model1.save(path)
+            neighbours_model2 = ContentBasedNeighboursModel.load(path)
+        self.assertEqual(list(neighbours_model1.book_isbns), list(neighbours_model2.book_isbns))
+        self.assertEqual(list(neighbours_model1.indices), list(neighbours_model2.indices))
+        self.assertEqual(list(neighbours_model1.scores), list(neighbours_model2.scores))
+        self.assertEqual(list(neighbours_model1.offsets), list(neighbours_model2.offsets))
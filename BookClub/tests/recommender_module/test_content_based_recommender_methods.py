@@ -2,7 +2,6 @@
 from django.test import TestCase, tag
 from RecommenderModule.recommenders.resources.content_based_recommender_methods import ContentBasedRecommenderMethods
 from BookClub.models import User, Club
-import math
 
 
 @tag('recommenders')
@@ -38,82 +37,6 @@ class ContentBasedRecommenderMethodsTestCase(TestCase):
         self.user = User.objects.get(pk=1)
         self.club = Club.objects.get(pk=1)
 
-    def test_compute_categories_similarity(self):
-        categories1 = [1, 2, 3]
-        categories2 = [2, 3, 4, 5]
-        similarity = self.content_based_methods.compute_categories_similarity(categories1, categories2)
-        self.assertEqual(similarity, 2 / math.sqrt(3 * 4))
-
-    def test_compute_categories_similarity_empty_categories_list(self):
-        categories1 = [1, 2, 3]
-        categories2 = []
-        similarity1 = self.content_based_methods.compute_categories_similarity(categories1, categories2)
-        self.assertEqual(similarity1, 0)
-        similarity2 = self.content_based_methods.compute_categories_similarity(categories2, categories1)
-        self.assertEqual(similarity2, 0)
-
-    def test_compute_categories_similarity_100_percent_similarity(self):
-        categories1 = [1, 2, 3]
-        categories2 = [2, 1, 3]
-        similarity = self.content_based_methods.compute_categories_similarity(categories1, categories2)
-        self.assertEqual(similarity, 1)
-
-    def test_compute_publication_year_similarity_first_smaller(self):
-        publication_year_1 = 1990
-        publication_year_2 = 2010
-        similarity = self.content_based_methods.compute_publication_year_similarity(publication_year_1,
-                                                                                    publication_year_2)
-        self.assertEqual(similarity, math.exp(-2))
-
-    def test_compute_publication_year_similarity_second_smaller(self):
-        publication_year_1 = 2010
-        publication_year_2 = 1990
-        similarity = self.content_based_methods.compute_publication_year_similarity(publication_year_1,
-                                                                                    publication_year_2)
-        self.assertEqual(similarity, math.exp(-2))
-
-    def test_compute_publication_year_similarity_100_percent_similarity(self):
-        publication_year_1 = 2010
-        publication_year_2 = 2010
-        similarity = self.content_based_methods.compute_publication_year_similarity(publication_year_1,
-                                                                                    publication_year_2)
-        self.assertEqual(similarity, 1)
-
-    def test_get_content_similarity_between_books_using_publication_year(self):
-        book_content_dict_1 = {
-            "book_isbn": "014029192X",
-            "categories": [1, 2, 3],
-            "publication_year": 2000
-        }
-        book_content_dict_2 = {
-            "book_isbn": "033030058X",
-            "categories": [3, 2, 4, 5],
-            "publication_year": 1987
-        }
-        similarity1 = self.content_based_methods.get_content_similarity_between_books(book_content_dict_1,
-                                                                                      book_content_dict_2)
-        categories_similarity = self.content_based_methods.compute_categories_similarity([1, 2, 3], [3, 2, 4, 5])
-        publication_year_similarity = self.content_based_methods.compute_publication_year_similarity(2000, 1987)
-        similarity2 = categories_similarity * publication_year_similarity
-        self.assertEqual(similarity1, similarity2)
-
-    def test_get_content_similarity_between_books_not_using_publication_year(self):
-        book_content_dict_1 = {
-            "book_isbn": "014029192X",
-            "categories": [1, 2, 3],
-            "publication_year": 2000
-        }
-        book_content_dict_2 = {
-            "book_isbn": "033030058X",
-            "categories": [3, 2, 4, 5],
-            "publication_year": 1987
-        }
-        self.content_based_methods.using_publication_year = False
-        similarity1 = self.content_based_methods.get_content_similarity_between_books(book_content_dict_1,
-                                                                                      book_content_dict_2)
-        similarity2 = self.content_based_methods.compute_categories_similarity([1, 2, 3], [3, 2, 4, 5])
-        self.assertEqual(similarity1, similarity2)
-
     def test_get_positive_ratings_from_all_ratings(self):
         all_ratings = [
             ("014029192X", 7),
@@ -191,3 +114,11 @@ class ContentBasedRecommenderMethodsTestCase(TestCase):
         self.set_up_content_based_methods_from_csv()
         recommendations = self.content_based_methods.get_recommendations_positive_ratings_only_from_club_url_name("-")
         self.assertEqual(recommendations, [])
+
+    def test_get_recommendations_positive_ratings_only_from_user_ids(self):
+        user_ids = [user.username for user in User.objects.all()] + ["X"]
+        recommendations = self.content_based_methods.get_recommendations_positive_ratings_only_from_user_ids(user_ids, batch_size=2)
+        self.assertEqual(list(recommendations.keys()), user_ids)
+        for user_id in user_ids:
+            self.assertEqual(recommendations[user_id], self.content_based_methods.get_recommendations_positive_ratings_only_from_user_id(user_id))
+        self.assertEqual(recommendations["X"], [])
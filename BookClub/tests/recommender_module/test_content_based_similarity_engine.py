@@ -0,0 +1,135 @@
+"""Unit testing of Content Based Similarity Engine"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.content_based_similarity_engine import ContentBasedSimilarityEngine
+from BookClub.tests.helpers import (compute_categories_similarity, compute_publication_year_similarity, get_content_similarity_between_books,
+                                   get_similarities_dictionary)
+import math
+
+
+@tag('recommenders')
+class ContentBasedSimilarityEngineTestCase(TestCase):
+    """Content Based Similarity Engine Testing"""
+
+    def setUp(self):
+        self.book_content_list = [
+            {"book_isbn": "014029192X", "categories": ["214", "228", "235"], "publication_year": 2000},
+            {"book_isbn": "033030058X", "categories": ["235", "3386", "840"], "publication_year": 1995},
+            {"book_isbn": "1559585595", "categories": ["235", "228"], "publication_year": 1970},
+            {"book_isbn": "0195153448", "categories": ["1"], "publication_year": 2002},
+            {"book_isbn": "0002005018", "categories": ["1", "2"], "publication_year": 2002}
+        ]
+
+    def test_compute_categories_similarity(self):
+        categories1 = [1, 2, 3]
+        categories2 = [2, 3, 4, 5]
+        similarity = compute_categories_similarity(categories1, categories2)
+        self.assertEqual(similarity, 2 / math.sqrt(3 * 4))
+
+    def test_compute_categories_similarity_empty_categories_list(self):
+        categories1 = [1, 2, 3]
+        categories2 = []
+        similarity1 = compute_categories_similarity(categories1, categories2)
+        self.assertEqual(similarity1, 0)
+        similarity2 = compute_categories_similarity(categories2, categories1)
+        self.assertEqual(similarity2, 0)
+
+    def test_compute_categories_similarity_100_percent_similarity(self):
+        categories1 = [1, 2, 3]
+        categories2 = [2, 1, 3]
+        similarity = compute_categories_similarity(categories1, categories2)
+        self.assertEqual(similarity, 1)
+
+    def test_compute_publication_year_similarity_first_smaller(self):
+        publication_year_1 = 1990
+        publication_year_2 = 2010
+        similarity = compute_publication_year_similarity(publication_year_1, publication_year_2)
+        self.assertEqual(similarity, math.exp(-2))
+
+    def test_compute_publication_year_similarity_second_smaller(self):
+        publication_year_1 = 2010
+        publication_year_2 = 1990
+        similarity = compute_publication_year_similarity(publication_year_1, publication_year_2)
+        self.assertEqual(similarity, math.exp(-2))
+
+    def test_compute_publication_year_similarity_100_percent_similarity(self):
+        publication_year_1 = 2010
+        publication_year_2 = 2010
+        similarity = compute_publication_year_similarity(publication_year_1, publication_year_2)
+        self.assertEqual(similarity, 1)
+
+    def test_get_content_similarity_between_books_using_publication_year(self):
+        book_content_dict_1 = {
+            "book_isbn": "014029192X",
+            "categories": [1, 2, 3],
+            "publication_year": 2000
+        }
+        book_content_dict_2 = {
+            "book_isbn": "033030058X",
+            "categories": [3, 2, 4, 5],
+            "publication_year": 1987
+        }
+        similarity1 = get_content_similarity_between_books(book_content_dict_1, book_content_dict_2)
+        categories_similarity = compute_categories_similarity([1, 2, 3], [3, 2, 4, 5])
+        publication_year_similarity = compute_publication_year_similarity(2000, 1987)
+        similarity2 = categories_similarity * publication_year_similarity
+        self.assertEqual(similarity1, similarity2)
+
+    def test_get_content_similarity_between_books_not_using_publication_year(self):
+        book_content_dict_1 = {
+            "book_isbn": "014029192X",
+            "categories": [1, 2, 3],
+            "publication_year": 2000
+        }
+        book_content_dict_2 = {
+            "book_isbn": "033030058X",
+            "categories": [3, 2, 4, 5],
+            "publication_year": 1987
+        }
+        similarity1 = get_content_similarity_between_books(book_content_dict_1, book_content_dict_2, using_publication_year=False)
+        similarity2 = compute_categories_similarity([1, 2, 3], [3, 2, 4, 5])
+        self.assertEqual(similarity1, similarity2)
+
+    def assert_same_similarities_as_pairwise_computation(self, using_publication_year, block_size):
+        engine = ContentBasedSimilarityEngine(self.book_content_list, using_publication_year=using_publication_year, block_size=block_size)
+        similarities_dictionary = get_similarities_dictionary(engine)
+        for book_content_dict_1 in self.book_content_list:
+            for book_content_dict_2 in self.book_content_list:
+                if book_content_dict_1["book_isbn"] == book_content_dict_2["book_isbn"]:
+                    continue
+                expected_similarity = get_content_similarity_between_books(book_content_dict_1, book_content_dict_2, using_publication_year)
+                similarity = similarities_dictionary[book_content_dict_1["book_isbn"]].get(book_content_dict_2["book_isbn"], 0)
+                self.assertAlmostEqual(similarity, expected_similarity)
+
+    def test_similarities_blocks_using_publication_year(self):
+        self.assert_same_similarities_as_pairwise_computation(using_publication_year=True, block_size=1024)
+
+    def test_similarities_blocks_not_using_publication_year(self):
+        self.assert_same_similarities_as_pairwise_computation(using_publication_year=False, block_size=1024)
+
+    def test_similarities_blocks_with_several_blocks(self):
+        self.assert_same_similarities_as_pairwise_computation(using_publication_year=True, block_size=2)
+
+    def test_similarities_blocks_do_not_contain_same_book(self):
+        engine = ContentBasedSimilarityEngine(self.book_content_list)
+        similarities_dictionary = get_similarities_dictionary(engine)
+        for book_isbn, book_similarities in similarities_dictionary.items():
+            self.assertFalse(book_isbn in book_similarities)
+
+    def test_similarities_blocks_do_not_contain_zero_similarities(self):
+        engine = ContentBasedSimilarityEngine(self.book_content_list)
+        similarities_dictionary = get_similarities_dictionary(engine)
+        self.assertEqual(len(similarities_dictionary), 5)
+        self.assertFalse("0195153448" in similarities_dictionary["014029192X"])
+        self.assertEqual(list(similarities_dictionary["0195153448"].keys()), ["0002005018"])
+
+    def test_similarities_blocks_with_minhash_candidates_have_exact_similarities(self):
+        engine = ContentBasedSimilarityEngine(self.book_content_list, block_size=2)
+        engine.use_minhash_candidates(number_of_bands=32, rows_per_band=1)
+        similarities_dictionary = get_similarities_dictionary(engine)
+        books_content = {book_content_dict["book_isbn"]: book_content_dict for book_content_dict in self.book_content_list}
+        self.assertTrue(len(similarities_dictionary) > 0)
+        for book_isbn, book_similarities in similarities_dictionary.items():
+            self.assertFalse(book_isbn in book_similarities)
+            for other_book_isbn, similarity in book_similarities.items():
+                expected_similarity = get_content_similarity_between_books(books_content[book_isbn], books_content[other_book_isbn])
+                self.assertAlmostEqual(similarity, expected_similarity)
@@ -0,0 +1,86 @@
+"""Unit testing of the dataset cache"""
+from django.test import TestCase, tag
+import pandas as pd
+import tempfile
+import os
+from RecommenderModule.recommenders.resources.dataset_cache import DatasetCache
+
+
+@tag('recommenders')
+class DatasetCacheTestCase(TestCase):
+    """Dataset cache testing, with temporary csv files and cache directory"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataset_cache = DatasetCache(cache_directory=os.path.join(self.directory.name, "cache"))
+        self.csv_file_path = os.path.join(self.directory.name, "BX-Book-Ratings.csv")
+        self.write_csv('"User-ID";"ISBN";"Book-Rating";"Year"\n1;"0195153448";5;2002\n2;"0002005018";0;"Gallimard"\n3;"Ã\xa9t\xe9";;\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_csv(self, content):
+        with open(self.csv_file_path, "w", encoding="ISO-8859-1") as file:
+            file.write(content)
+
+    def get_cache_files(self):
+        return sorted(os.listdir(self.dataset_cache.cache_directory))
+
+    def read_csv(self, **read_csv_options):
+        return self.dataset_cache.read_csv(self.csv_file_path, header=0, encoding="ISO-8859-1", sep=';', **read_csv_options)
+
+    def test_read_csv_creates_cache_file(self):
+        self.read_csv()
+        cache_files = self.get_cache_files()
+        self.assertEqual(len(cache_files), 1)
+        self.assertTrue(cache_files[0].startswith("BX-Book-Ratings.csv."))
+        self.assertTrue(cache_files[0].endswith(".npz"))
+
+    def test_cached_dataframe_same_as_parsed_dataframe(self):
+        parsed_dataframe = self.read_csv()
+        cached_dataframe = self.read_csv()
+        pd.testing.assert_frame_equal(cached_dataframe, parsed_dataframe)
+        self.assertEqual([type(value) for value in cached_dataframe["ISBN"]], [str, str, str])
+        self.assertEqual(list(cached_dataframe["Year"])[:2], list(parsed_dataframe["Year"])[:2])
+
+    def test_cached_dataframe_with_mixed_column_types(self):
+        parsed_dataframe = pd.DataFrame({"Year": [2002, "Gallimard", float("nan"), 1.5]})
+        cache_file_path = os.path.join(self.dataset_cache.cache_directory, "mixed.npz")
+        self.dataset_cache.save_dataframe(parsed_dataframe, cache_file_path)
+        cached_dataframe = self.dataset_cache.load_dataframe(cache_file_path)
+        pd.testing.assert_frame_equal(cached_dataframe, parsed_dataframe)
+        self.assertEqual([type(value) for value in cached_dataframe["Year"]], [int, str, float, float])
+
+    def test_changed_csv_file_replaces_cache_file(self):
+        self.read_csv()
+        cache_files = self.get_cache_files()
+        self.write_csv('"User-ID";"ISBN";"Book-Rating";"Year"\n4;"0195153448";7;2002\n')
+        dataframe = self.read_csv()
+        self.assertEqual(list(dataframe["User-ID"]), [4])
+        self.assertEqual(len(self.get_cache_files()), 1)
+        self.assertNotEqual(self.get_cache_files(), cache_files)
+
+    def test_different_options_have_different_cache_files(self):
+        self.read_csv()
+        dataframe = self.read_csv(usecols=["ISBN"])
+        self.assertEqual(list(dataframe.columns), ["ISBN"])
+        self.assertEqual(len(self.get_cache_files()), 2)
+
+    def test_unwritable_cache_directory_still_reads_csv(self):
+        with open(self.dataset_cache.cache_directory, "w") as file: # A file where the cache directory should be
+            file.write("")
+        with self.assertLogs("RecommenderModule.recommenders.resources.dataset_cache", level="WARNING") as logs:
+            dataframe = self.read_csv()
+        self.assertEqual(len(dataframe), 3)
+        self.assertIn("Could not cache", logs.output[0])
+
+    def test_corrupted_cache_file_is_replaced(self):
+        parsed_dataframe = self.read_csv()
+        cache_file_path = os.path.join(self.dataset_cache.cache_directory, self.get_cache_files()[0])
+        with open(cache_file_path, "wb") as file:
+            file.write(b"PK\x03\x04 truncated")
+        with self.assertLogs("RecommenderModule.recommenders.resources.dataset_cache", level="WARNING") as logs:
+            dataframe = self.read_csv()
+        pd.testing.assert_frame_equal(dataframe, parsed_dataframe)
+        self.assertIn("Could not read the cache file", logs.output[0])
+        pd.testing.assert_frame_equal(self.read_csv(), parsed_dataframe)
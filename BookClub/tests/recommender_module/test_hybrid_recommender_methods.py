@@ -0,0 +1,85 @@
+"""Unit testing of Hybrid Recommender Methods"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.hybrid_recommender_methods import HybridRecommenderMethods
+from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import \
+    ItemBasedCollaborativeFilteringMethods
+from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
+from RecommenderModule.recommenders.resources.content_based_neighbours_model import ContentBasedNeighboursModel
+from RecommenderModule.recommenders.resources.content_based_similarity_engine import ContentBasedSimilarityEngine
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
+from types import SimpleNamespace
+import numpy as np
+
+
+@tag('recommenders')
+class HybridRecommenderMethodsTestCase(TestCase):
+    """Hybrid Recommender Methods Tests, on a small generated trainset"""
+    def setUp(self):
+        self.trainset = get_ratings_dataset(get_generated_ratings()).build_full_trainset()
+        self.item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, parameters={"model_function_name": "cosine"}, print_status=False)
+        self.popular_books_methods = PopularBooksMethods(trainset=self.trainset, parameters={"min_ratings_threshold": 1}, print_status=False)
+        book_content_list = [{"book_isbn": str(book_id), "categories": [str(book_id % 4), str(book_id % 7)], "publication_year": 1990 + book_id % 5}
+                             for book_id in range(40)]
+        neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(ContentBasedSimilarityEngine(book_content_list), number_of_neighbours=10)
+        self.content_based_methods = SimpleNamespace(neighbours_model=neighbours_model)
+        self.user_ids = [self.trainset.to_raw_uid(user_inner_id) for user_inner_id in self.trainset.all_users()]
+
+    def get_hybrid_methods(self, parameters={}, item_based=True, content_based=True, popularity=True):
+        return HybridRecommenderMethods(item_based_methods=self.item_based_methods if item_based else None,
+                                        content_based_methods=self.content_based_methods if content_based else None,
+                                        popular_books_methods=self.popular_books_methods if popularity else None,
+                                        parameters=parameters, library=self.item_based_methods.library)
+
+    def test_books_of_all_models_are_indexed_once_popular_books_first(self):
+        hybrid_methods = self.get_hybrid_methods()
+        self.assertEqual(hybrid_methods.get_number_of_books(), 40)
+        self.assertEqual(len(set(hybrid_methods.book_isbns)), 40)
+        self.assertEqual(hybrid_methods.book_isbns[:5], [isbn for isbn, score in self.popular_books_methods.sorted_average_ratings[:5]])
+
+    def test_user_without_ratings_gets_most_popular_books(self):
+        hybrid_methods = self.get_hybrid_methods()
+        self.assertEqual(hybrid_methods.get_recommendations_from_user_id("X"), self.popular_books_methods.get_recommendations())
+
+    def test_fallback_on_popular_books_excludes_read_books(self):
+        hybrid_methods = self.get_hybrid_methods(parameters={"min_personalised_recommendations": 41})
+        for user_id in self.user_ids[:5]:
+            read_books = [book_isbn for book_isbn, rating in self.item_based_methods.library.get_all_ratings_by_user(user_id)]
+            self.assertEqual(hybrid_methods.get_recommendations_from_user_id(user_id), self.popular_books_methods.get_recommendations(read_books=read_books))
+
+    def get_item_based_scores(self, user_id):
+        """Score the books from the positive ratings of the user with the item-based model, as a reference for the shared score vector"""
+        positive_ratings = self.item_based_methods.get_inner_ratings_from_raw_ratings(self.item_based_methods.library.get_all_ratings_by_user(user_id), min_rating=6)
+        scores = sum(self.item_based_methods.similarities_matrix[item_id] * (rating / 10.0) for item_id, rating in positive_ratings)
+        return {self.trainset.to_raw_iid(item_id): score for item_id, score in enumerate(scores)}
+
+    def test_item_based_scores_only_rank_as_item_based_recommendations(self):
+        hybrid_methods = self.get_hybrid_methods(content_based=False, popularity=False)
+        for user_id in self.user_ids:
+            item_based_recommendations = self.item_based_methods.get_recommendations_positive_ratings_only_from_user_id(user_id)
+            if len(item_based_recommendations) >= 3:
+                # Books with (almost) the same score may be ranked in a different order
+                scores = self.get_item_based_scores(user_id)
+                recommendations = hybrid_methods.get_recommendations_from_user_id(user_id)
+                self.assertEqual(len(recommendations), len(item_based_recommendations))
+                np.testing.assert_allclose([scores[book_isbn] for book_isbn in recommendations], [scores[book_isbn] for book_isbn in item_based_recommendations])
+
+    def test_recommendations_exclude_read_books(self):
+        hybrid_methods = self.get_hybrid_methods()
+        for user_id in self.user_ids:
+            read_books = {book_isbn for book_isbn, rating in self.item_based_methods.library.get_all_ratings_by_user(user_id)}
+            recommendations = hybrid_methods.get_recommendations_from_user_id(user_id)
+            self.assertTrue(0 < len(recommendations) <= 10)
+            self.assertEqual(len(read_books.intersection(recommendations)), 0)
+
+    def test_weights_change_the_ranking(self):
+        item_based_recommendations = self.get_hybrid_methods(parameters={"content_based_weight": 0}).get_recommendations_from_user_ids(self.user_ids)
+        content_based_recommendations = self.get_hybrid_methods(parameters={"item_based_weight": 0}).get_recommendations_from_user_ids(self.user_ids)
+        self.assertNotEqual(item_based_recommendations, content_based_recommendations)
+
+    def test_get_recommendations_from_user_ids_same_as_one_user_at_a_time(self):
+        hybrid_methods = self.get_hybrid_methods()
+        user_ids = self.user_ids + ["X"]
+        recommendations = hybrid_methods.get_recommendations_from_user_ids(user_ids, batch_size=7)
+        self.assertEqual(list(recommendations.keys()), user_ids)
+        for user_id in user_ids:
+            self.assertEqual(recommendations[user_id], hybrid_methods.get_recommendations_from_user_id(user_id))
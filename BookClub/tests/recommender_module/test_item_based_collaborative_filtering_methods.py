@@ -4,7 +4,10 @@ from RecommenderModule.recommenders.resources.item_based_collaborative_filtering
     ItemBasedCollaborativeFilteringMethods
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
 from RecommenderModule.recommenders.resources.library import Library
-from BookClub.models import Club, User, ClubMembership
+from BookClub.models import Book, BookReview, Club, User, ClubMembership
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
+import numpy as np
+import tempfile
 
 
 @tag('recommenders')
@@ -95,3 +98,173 @@ class ItemBasedRecommenderMethodsTestCase(TestCase):
         recommendations2 = self.item_based_methods.get_recommendations_from_inner_ratings(ratings=positive_ratings,
                                                                                           all_books_rated=all_ratings)
         self.assertEqual(recommendations1, recommendations2)
+
+
+@tag('recommenders')
+class ItemBasedRecommenderMethodsTopNTestCase(TestCase):
+    """Item Based Recommender Methods top-N scoring Tests, on a small generated trainset"""
+    def setUp(self):
+        self.trainset = get_ratings_dataset(get_generated_ratings()).build_full_trainset()
+        self.item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, print_status=False)
+
+    def get_expected_recommendations(self, ratings, all_books_rated):
+        """Score every item one by one, as a reference for the vectorized scoring"""
+        candidates = {}
+        for item_id, rating in ratings:
+            for inner_id, score in enumerate(self.item_based_methods.similarities_matrix[item_id]):
+                candidates[inner_id] = candidates.get(inner_id, 0) + score * (rating / 10.0)
+        all_books_rated_inner_ids = [item_id for item_id, rating in all_books_rated]
+        recommendations = []
+        for item_id, rating_sum in sorted(candidates.items(), key=lambda item: item[1], reverse=True):
+            if item_id not in all_books_rated_inner_ids and not np.isnan(rating_sum) and rating_sum != 0:
+                recommendations.append(self.trainset.to_raw_iid(item_id))
+        return recommendations[:10]
+
+    def test_get_recommendations_from_inner_ratings_same_as_item_by_item_scoring(self):
+        for user_inner_id in self.trainset.all_users():
+            all_ratings = self.trainset.ur[user_inner_id]
+            positive_ratings = [(item_id, rating) for (item_id, rating) in all_ratings if rating >= 6]
+            recommendations = self.item_based_methods.get_recommendations_from_inner_ratings(positive_ratings, all_books_rated=all_ratings)
+            self.assertEqual(recommendations, self.get_expected_recommendations(positive_ratings, all_ratings))
+
+    def test_get_recommendations_positive_ratings_only_from_user_ids_same_as_one_user_at_a_time(self):
+        user_ids = [self.trainset.to_raw_uid(user_inner_id) for user_inner_id in self.trainset.all_users()] + ["X"]
+        recommendations = self.item_based_methods.get_recommendations_positive_ratings_only_from_user_ids(user_ids, batch_size=7)
+        self.assertEqual(list(recommendations.keys()), user_ids)
+        for user_id in user_ids:
+            self.assertEqual(recommendations[user_id], self.item_based_methods.get_recommendations_positive_ratings_only_from_user_id(user_id))
+        self.assertEqual(recommendations["X"], [])
+
+    def create_club_from_trainset_users(self, club_url_name, user_inner_ids):
+        """Create the club, its members and their reviews (as rated in the trainset) in Django"""
+        club = Club.objects.create(name=club_url_name, club_url_name=club_url_name, description="Test club", is_private=False)
+        for user_inner_id in user_inner_ids:
+            username = self.trainset.to_raw_uid(user_inner_id)
+            user, created = User.objects.get_or_create(username=username, defaults={"email": f"{username}@kcl.ac.uk"})
+            if created:
+                for item_id, rating in self.trainset.ur[user_inner_id]:
+                    book, created = Book.objects.get_or_create(ISBN=self.trainset.to_raw_iid(item_id), defaults={
+                        "title": "Title", "author": "Author", "publicationYear": "2000-01-01", "publisher": "Publisher"})
+                    BookReview.objects.create(creator=user, book=book, book_rating=int(rating), title="Review", content="Lorem Ipsum")
+            club.add_member(user)
+        return club
+
+    def test_get_ratings_changes_from_django_database(self):
+        item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, parameters={'model_function_name': 'cosine', 'min_support': 1}, print_status=False)
+        self.assertTrue(item_based_methods.can_update_ratings())
+        self.assertFalse(self.item_based_methods.can_update_ratings())
+        self.create_club_from_trainset_users("club", [0, 1])
+        review = BookReview.objects.filter(creator__username=self.trainset.to_raw_uid(0)).first()
+        review.book_rating = 0 # The trainset ratings are between 1 and 10
+        review.save()
+        ratings_changes = item_based_methods.get_ratings_changes_from_django_database()
+        self.assertTrue((review.creator.username, review.book.ISBN, review.book_rating) in ratings_changes)
+        changed_users = {user_id for user_id, book_isbn, rating in ratings_changes if rating is not None}
+        self.assertEqual(changed_users, {self.trainset.to_raw_uid(0)})
+        deleted_users = {user_id for user_id, book_isbn, rating in ratings_changes if rating is None}
+        self.assertEqual(deleted_users, {self.trainset.to_raw_uid(user_inner_id) for user_inner_id in self.trainset.all_users()} - {self.trainset.to_raw_uid(0), self.trainset.to_raw_uid(1)})
+
+    def test_get_recommendations_from_club_rating_profile_same_as_members_ratings(self):
+        members_inner_ids = [[0, 1, 2], [3], [4, 5, 3]]
+        clubs = [self.create_club_from_trainset_users(f"club_{index}", user_inner_ids) for index, user_inner_ids in enumerate(members_inner_ids)]
+        self.item_based_methods.library = Library()
+        for club, user_inner_ids in zip(clubs, members_inner_ids):
+            all_ratings = [item_rating for user_inner_id in user_inner_ids for item_rating in self.trainset.ur[user_inner_id]]
+            positive_ratings = [(item_id, rating) for (item_id, rating) in all_ratings if rating >= 6]
+            recommendations = self.item_based_methods.get_recommendations_positive_ratings_only_from_club_url_name(club.club_url_name)
+            self.assertEqual(recommendations, self.get_expected_recommendations(positive_ratings, all_ratings))
+        club_url_names = [club.club_url_name for club in clubs] + ["-"]
+        recommendations = self.item_based_methods.get_recommendations_positive_ratings_only_from_club_url_names(club_url_names, batch_size=2)
+        for club_url_name in club_url_names:
+            self.assertEqual(recommendations[club_url_name], self.item_based_methods.get_recommendations_positive_ratings_only_from_club_url_name(club_url_name))
+        self.assertEqual(recommendations["-"], [])
+
+    def test_get_recommendations_from_inner_ratings_batch_without_positive_ratings(self):
+        recommendations = self.item_based_methods.get_recommendations_from_inner_ratings_batch([[], [(0, 2)], [(0, 10)]])
+        self.assertEqual(recommendations[0], [])
+        self.assertEqual(recommendations[1], [])
+        self.assertEqual(recommendations[2], self.item_based_methods.get_recommendations_from_inner_ratings([(0, 10)]))
+
+    def test_get_recommendations_from_inner_ratings_empty_ratings(self):
+        recommendations = self.item_based_methods.get_recommendations_from_inner_ratings([])
+        self.assertEqual(recommendations, [])
+
+    def test_get_recommendations_from_inner_ratings_ignores_nan_scores(self):
+        self.item_based_methods.similarities_matrix = self.item_based_methods.similarities_matrix.copy()
+        self.item_based_methods.similarities_matrix[0, 1] = np.nan
+        recommendations = self.item_based_methods.get_recommendations_from_inner_ratings([(0, 10)])
+        self.assertFalse(self.trainset.to_raw_iid(1) in recommendations)
+        self.assertFalse(self.trainset.to_raw_iid(0) in recommendations)
+
+    def test_save_and_import_model_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.item_based_methods.path_to_model = directory
+            self.item_based_methods.save_model()
+            imported_item_based_methods = ItemBasedCollaborativeFilteringMethods.__new__(ItemBasedCollaborativeFilteringMethods)
+            imported_item_based_methods.path_to_model = directory
+            imported_item_based_methods.import_model()
+            self.assertTrue(isinstance(imported_item_based_methods.similarities_matrix, np.memmap))
+            self.assertEqual(imported_item_based_methods.similarities_matrix.dtype, np.float32)
+            self.assertEqual(imported_item_based_methods.trainset.n_items, self.trainset.n_items)
+            ratings = [(0, 10), (3, 7)]
+            recommendations1 = self.item_based_methods.get_recommendations_from_inner_ratings(ratings)
+            recommendations2 = imported_item_based_methods.get_recommendations_from_inner_ratings(ratings)
+            self.assertEqual(len(recommendations1), len(recommendations2))
+            del imported_item_based_methods
+
+    def test_update_ratings_same_as_retraining(self):
+        parameters = {'model_function_name': 'cosine', 'min_support': 1}
+        item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, parameters=parameters, print_status=False)
+        ratings_changes = [("0", "1", 10), ("1", "2", None), ("5", "40", 9), ("6", "40", 7)]
+        item_based_methods = item_based_methods.get_updated_methods(ratings_changes)
+        ratings = {(self.trainset.to_raw_uid(user_inner_id), self.trainset.to_raw_iid(item_inner_id)): rating
+                   for (user_inner_id, item_inner_id, rating) in self.trainset.all_ratings()}
+        ratings.pop(("1", "2"), None)
+        ratings.update({("0", "1"): 10, ("5", "40"): 9, ("6", "40"): 7})
+        updated_trainset = get_ratings_dataset(ratings).build_full_trainset()
+        retrained_item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=updated_trainset, parameters=parameters, print_status=False)
+        self.assertEqual(item_based_methods.trainset.n_items, 41)
+        for raw_item_id in ["0", "1", "2", "40"]:
+            for other_raw_item_id in ["0", "1", "2", "3", "40"]:
+                self.assertAlmostEqual(
+                    item_based_methods.similarities_matrix[item_based_methods.trainset.to_inner_iid(raw_item_id), item_based_methods.trainset.to_inner_iid(other_raw_item_id)],
+                    retrained_item_based_methods.similarities_matrix[updated_trainset.to_inner_iid(raw_item_id), updated_trainset.to_inner_iid(other_raw_item_id)]
+                )
+
+    def test_update_ratings_of_imported_model(self):
+        parameters = {'model_function_name': 'msd', 'min_support': 1}
+        item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, parameters=parameters, print_status=False)
+        with tempfile.TemporaryDirectory() as directory:
+            item_based_methods.path_to_model = directory
+            item_based_methods.save_model()
+            imported_item_based_methods = ItemBasedCollaborativeFilteringMethods.__new__(ItemBasedCollaborativeFilteringMethods)
+            imported_item_based_methods.path_to_model = directory
+            imported_item_based_methods.import_model()
+            self.assertEqual(imported_item_based_methods.model_function_name, 'msd')
+            imported_item_based_methods = imported_item_based_methods.get_updated_methods([("0", "1", 10), ("5", "40", 9)])
+            item_based_methods = item_based_methods.get_updated_methods([("0", "1", 10), ("5", "40", 9)])
+            np.testing.assert_allclose(imported_item_based_methods.similarities_matrix, item_based_methods.similarities_matrix, rtol=1e-6)
+            imported_item_based_methods.save_model()
+            reimported_item_based_methods = ItemBasedCollaborativeFilteringMethods.__new__(ItemBasedCollaborativeFilteringMethods)
+            reimported_item_based_methods.path_to_model = directory
+            reimported_item_based_methods.import_model()
+            self.assertEqual(reimported_item_based_methods.trainset.to_inner_iid("40"), 40)
+            reimported_item_based_methods = reimported_item_based_methods.get_updated_methods([("6", "40", 7)])
+            item_based_methods = item_based_methods.get_updated_methods([("6", "40", 7)])
+            np.testing.assert_allclose(reimported_item_based_methods.similarities_matrix, item_based_methods.similarities_matrix, rtol=1e-6)
+            del imported_item_based_methods, reimported_item_based_methods
+
+    def test_update_ratings_leaves_model_unchanged(self):
+        parameters = {'model_function_name': 'cosine', 'min_support': 1}
+        item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=self.trainset, parameters=parameters, print_status=False)
+        trainset = item_based_methods.trainset
+        similarities_matrix = np.array(item_based_methods.similarities_matrix)
+        updated_item_based_methods = item_based_methods.get_updated_methods([("0", "1", 10), ("5", "40", 9)])
+        self.assertIs(item_based_methods.trainset, trainset)
+        np.testing.assert_array_equal(item_based_methods.similarities_matrix, similarities_matrix)
+        self.assertEqual(updated_item_based_methods.trainset.n_items, 41)
+        self.assertEqual(updated_item_based_methods.similarities_matrix.shape, (41, 41))
+
+    def test_update_ratings_not_possible_for_pearson_baseline(self):
+        with self.assertRaises(ValueError):
+            self.item_based_methods.get_updated_methods([("0", "1", 10)])
@@ -0,0 +1,56 @@
+"""Unit testing of Item Id Mapping"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.item_id_mapping import ItemIdMapping, get_top_n_indices
+from surprise import Dataset, Reader
+import pandas as pd
+import numpy as np
+import tempfile
+
+
+@tag('recommenders')
+class ItemIdMappingTestCase(TestCase):
+    """Item Id Mapping Tests"""
+
+    def setUp(self):
+        ratings_df = pd.DataFrame.from_records([
+            ["1", "0195153448", 5],
+            ["1", "0002005018", 7],
+            ["2", "0060973129", 3],
+            ["2", "0195153448", 9]
+        ], columns=["User-ID", "ISBN", "Book-Rating"])
+        reader = Reader(line_format='user item rating', sep=';', skip_lines=0, rating_scale=(0, 10))
+        self.trainset = Dataset.load_from_df(ratings_df, reader).build_full_trainset()
+        self.item_id_mapping = ItemIdMapping.from_trainset(self.trainset)
+
+    def assert_same_mapping_as_trainset(self, item_id_mapping):
+        self.assertEqual(item_id_mapping.n_items, self.trainset.n_items)
+        self.assertEqual(list(item_id_mapping.all_items()), list(self.trainset.all_items()))
+        for inner_item_id in self.trainset.all_items():
+            raw_item_id = self.trainset.to_raw_iid(inner_item_id)
+            self.assertEqual(item_id_mapping.to_raw_iid(inner_item_id), raw_item_id)
+            self.assertEqual(item_id_mapping.to_inner_iid(raw_item_id), inner_item_id)
+
+    def test_from_trainset(self):
+        self.assert_same_mapping_as_trainset(self.item_id_mapping)
+
+    def test_to_inner_iid_wrong_raw_id(self):
+        with self.assertRaises(ValueError):
+            self.item_id_mapping.to_inner_iid("X")
+        with self.assertRaises(ValueError):
+            self.item_id_mapping.to_inner_iid("9999999999")
+        with self.assertRaises(ValueError):
+            self.item_id_mapping.to_inner_iid(1)
+
+    def test_save_and_load_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.item_id_mapping.save(directory)
+            item_id_mapping = ItemIdMapping.load(directory, mmap_mode='r')
+            self.assertTrue(isinstance(item_id_mapping.raw_item_ids, np.memmap))
+            self.assert_same_mapping_as_trainset(item_id_mapping)
+            del item_id_mapping
+
+    def test_get_top_n_indices(self):
+        scores = np.array([0.5, 0.9, 0.1, 0.9, 0.7, 0.3])
+        recommendable = np.array([True, True, True, True, False, True])
+        self.assertEqual(get_top_n_indices(scores, recommendable, n=3), [1, 3, 0])
+        self.assertEqual(get_top_n_indices(scores, recommendable, n=10), [1, 3, 0, 5, 2])
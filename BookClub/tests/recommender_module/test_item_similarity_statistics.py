@@ -0,0 +1,112 @@
+"""Unit testing of Item Similarity Statistics"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.item_similarity_statistics import ItemSimilarityStatistics
+from RecommenderModule.recommenders.resources.rating_arrays import RatingArrays
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
+from surprise import KNNBasic
+import numpy as np
+
+
+@tag('recommenders')
+class ItemSimilarityStatisticsTestCase(TestCase):
+    """Item Similarity Statistics Tests, comparing the similarities with the ones computed by surprise's KNNBasic"""
+
+    def setUp(self):
+        self.ratings = get_generated_ratings(number_of_users=25, number_of_books=30,
+                                             is_rated=lambda user_id, book_id: (user_id + 2 * book_id) % 3 != 0)
+
+    def build_trainset(self, ratings):
+        return get_ratings_dataset(ratings).build_full_trainset()
+
+    def get_knn_similarities(self, trainset, similarity_name, min_support):
+        model = KNNBasic(sim_options={'name': similarity_name, 'min_support': min_support, 'user_based': False}, verbose=False)
+        model.fit(trainset)
+        return model.compute_similarities()
+
+    def assert_same_similarities(self, statistics, similarities_matrix, trainset, similarity_name, min_support):
+        """Compare the similarities of all pairs of books of the trainset, using their raw ids"""
+        expected_similarities_matrix = self.get_knn_similarities(trainset, similarity_name, min_support)
+        inner_ids = [statistics.item_inner_ids[trainset.to_raw_iid(inner_item_id)] for inner_item_id in trainset.all_items()]
+        similarities_matrix = np.asarray(similarities_matrix)[np.ix_(inner_ids, inner_ids)]
+        np.testing.assert_allclose(similarities_matrix, expected_similarities_matrix, atol=1e-9)
+
+    def test_compute_similarities_matrix_same_as_knn(self):
+        trainset = self.build_trainset(self.ratings)
+        for similarity_name in ItemSimilarityStatistics.supported_similarity_names:
+            for min_support in [1, 5]:
+                statistics = ItemSimilarityStatistics.from_trainset(trainset, similarity_name=similarity_name, min_support=min_support)
+                self.assert_same_similarities(statistics, statistics.compute_similarities_matrix(block_size=7), trainset, similarity_name, min_support)
+
+    def test_update_similarities_matrix_same_as_knn_after_changes(self):
+        trainset = self.build_trainset(self.ratings)
+        ratings_changes = [("0", "1", 10), ("1", "2", None), ("3", "4", 1), ("3", "30", 8), ("26", "30", 6), ("26", "5", 9), ("4", "99", None)]
+        updated_ratings = dict(self.ratings)
+        for user_id, book_id, rating in ratings_changes:
+            if rating is None:
+                updated_ratings.pop((user_id, book_id), None)
+            else:
+                updated_ratings[(user_id, book_id)] = rating
+        updated_trainset = self.build_trainset(updated_ratings)
+        for similarity_name in ItemSimilarityStatistics.supported_similarity_names:
+            statistics = ItemSimilarityStatistics.from_trainset(trainset, similarity_name=similarity_name, min_support=2)
+            similarities_matrix = statistics.compute_similarities_matrix()
+            changed_items = statistics.update_ratings(ratings_changes)
+            self.assertEqual(statistics.get_number_of_items(), 31)
+            self.assertEqual(
+                sorted(statistics.raw_item_ids[inner_item_id] for inner_item_id in changed_items),
+                ["1", "2", "30", "4", "5"]
+            )
+            similarities_matrix = np.pad(similarities_matrix, (0, 1))
+            statistics.update_similarities_matrix(similarities_matrix, changed_items)
+            self.assert_same_similarities(statistics, similarities_matrix, updated_trainset, similarity_name, 2)
+
+    def test_update_ratings_without_changes(self):
+        trainset = self.build_trainset(self.ratings)
+        statistics = ItemSimilarityStatistics.from_trainset(trainset)
+        changed_items = statistics.update_ratings([("0", "1", self.ratings[("0", "1")]), ("0", "0", None)])
+        self.assertEqual(len(changed_items), 0)
+
+    def test_from_ratings_same_as_from_trainset(self):
+        trainset = self.build_trainset(self.ratings)
+        statistics = ItemSimilarityStatistics.from_trainset(trainset, similarity_name='pearson')
+        raw_item_ids, user_ratings = statistics.get_ratings()
+        statistics_from_ratings = ItemSimilarityStatistics.from_ratings(raw_item_ids, user_ratings, similarity_name='pearson')
+        np.testing.assert_array_equal(statistics_from_ratings.compute_similarities_matrix(), statistics.compute_similarities_matrix())
+
+    def build_rating_arrays(self, ratings):
+        raw_user_ids = sorted({user_id for user_id, book_id in ratings.keys()})
+        raw_item_ids = sorted({book_id for user_id, book_id in ratings.keys()})
+        return RatingArrays(np.array([raw_user_ids.index(user_id) for user_id, book_id in ratings.keys()], dtype=np.int32),
+                            np.array([raw_item_ids.index(book_id) for user_id, book_id in ratings.keys()], dtype=np.int32),
+                            np.array(list(ratings.values()), dtype=np.int8), raw_user_ids, raw_item_ids)
+
+    def test_get_ratings_changes(self):
+        statistics = ItemSimilarityStatistics.from_trainset(self.build_trainset(self.ratings))
+        updated_ratings = dict(self.ratings)
+        updated_ratings[("0", "1")] = 10
+        del updated_ratings[("1", "2")]
+        updated_ratings[("26", "5")] = 9
+        updated_ratings[("26", "31")] = 9 # New book with a single rating
+        for user_id in range(10):
+            updated_ratings[(str(user_id), "30")] = 7 # New book with 10 ratings
+        ratings_changes = statistics.get_ratings_changes(self.build_rating_arrays(updated_ratings), min_ratings_threshold=5)
+        self.assertEqual(sorted(ratings_changes), sorted([("0", "1", 10), ("1", "2", None), ("26", "5", 9)] + [(str(user_id), "30", 7) for user_id in range(10)]))
+        statistics.update_ratings(ratings_changes)
+        self.assertEqual(statistics.get_ratings_changes(self.build_rating_arrays(updated_ratings), min_ratings_threshold=5), [])
+
+    def test_get_ratings_changes_of_deleted_user(self):
+        statistics = ItemSimilarityStatistics.from_trainset(self.build_trainset(self.ratings))
+        updated_ratings = {(user_id, book_id): rating for (user_id, book_id), rating in self.ratings.items() if user_id != "3"}
+        ratings_changes = statistics.get_ratings_changes(self.build_rating_arrays(updated_ratings))
+        self.assertEqual(sorted(ratings_changes), sorted((user_id, book_id, None) for (user_id, book_id) in self.ratings.keys() if user_id == "3"))
+
+    def test_statistics_are_float32(self):
+        statistics = ItemSimilarityStatistics.from_trainset(self.build_trainset(self.ratings))
+        for matrix in [statistics.frequencies, statistics.products, statistics.squares, statistics.sums]:
+            self.assertEqual(matrix.dtype, np.float32)
+        statistics.update_ratings([("0", "99", 5)])
+        self.assertEqual(statistics.products.dtype, np.float32)
+
+    def test_unsupported_similarity(self):
+        with self.assertRaises(ValueError):
+            ItemSimilarityStatistics(similarity_name='pearson_baseline')
@@ -55,6 +55,14 @@ class LibraryTestCase(TestCase):
         ratings = self.library_django.get_all_ratings_by_user("X")
         self.assertEqual(ratings, [])
 
+    def test_get_all_ratings_by_users_django(self):
+        user_ids = [user.username for user in User.objects.all()] + ["X"]
+        all_ratings = self.library_django.get_all_ratings_by_users(user_ids, chunk_size=2)
+        self.assertEqual(list(all_ratings.keys()), user_ids)
+        for user_id in user_ids:
+            self.assertEqual(sorted(all_ratings[user_id]), sorted(self.library_django.get_all_ratings_by_user(user_id)))
+        self.assertEqual(all_ratings["X"], [])
+
     def test_get_all_ratings_by_user_trainset(self):
         self.set_up_library_trainset()
         ratings = self.library_trainset.get_all_ratings_by_user(self.user_trainset)
@@ -106,6 +114,16 @@ class LibraryTestCase(TestCase):
         counter = Counter(ratings)
         self.assertEqual(counter.get((self.book_isbn, 1)), 2)
 
+    def test_get_all_ratings_by_club_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            club_ratings = self.library_django.get_all_ratings_by_club(self.club.club_url_name)
+        self.assertEqual(len(club_ratings), 3)
+
+    def test_get_all_ratings_by_user_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            ratings = self.library_django.get_all_ratings_by_user(self.user_id)
+        self.assertEqual(ratings, [("0195153448", 1)])
+
     def test_get_list_of_books_rated_by_club(self):
         club_books = self.library_django.get_list_of_books_rated_by_club(self.club.club_url_name)
         self.assertEqual(len(club_books), 3)
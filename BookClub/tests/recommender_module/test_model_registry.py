@@ -0,0 +1,141 @@
+"""Unit testing of the Model Registry"""
+from django.test import TestCase, tag
+from RecommenderModule.recommenders.resources.model_registry import ModelRegistry
+import tempfile
+import time
+import os
+
+
+@tag('recommenders')
+class ModelRegistryTestCase(TestCase):
+    """Model Registry Tests"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_file_path = os.path.join(self.directory.name, "model.sav")
+        with open(self.model_file_path, "w") as file:
+            file.write("model")
+        self.number_of_loads = 0
+        self.generation_file_path = os.path.join(self.directory.name, "generation.txt")
+        self.model_registry = ModelRegistry(check_interval=0)
+        self.model_registry.register("recommender", self.load_recommender, [self.model_file_path], generation_file_path=self.generation_file_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load_recommender(self):
+        self.number_of_loads += 1
+        return {"load": self.number_of_loads}
+
+    def fail_to_load_recommender(self):
+        raise OSError("Model files are being written")
+
+    def update_model_file(self):
+        stat = os.stat(self.model_file_path)
+        os.utime(self.model_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def wait_for_reload(self, name):
+        for i in range(100):
+            if name not in self.model_registry.reloading:
+                return
+            time.sleep(0.05)
+
+    def test_get_loads_recommender_once(self):
+        recommender1 = self.model_registry.get("recommender")
+        recommender2 = self.model_registry.get("recommender")
+        self.assertIs(recommender1, recommender2)
+        self.assertEqual(self.number_of_loads, 1)
+
+    def test_get_does_not_reload_recommender_when_only_model_file_changes(self):
+        recommender1 = self.model_registry.get("recommender")
+        self.update_model_file()
+        self.assertIs(recommender1, self.model_registry.get("recommender"))
+        self.wait_for_reload("recommender")
+        self.assertIs(recommender1, self.model_registry.get("recommender"))
+        self.assertEqual(self.number_of_loads, 1)
+
+    def test_get_reloads_recommender_when_model_generation_changes(self):
+        recommender1 = self.model_registry.get("recommender")
+        self.update_model_file()
+        self.model_registry.bump_model_generation("recommender")
+        recommender2 = self.model_registry.get("recommender")
+        self.assertIs(recommender1, recommender2) # The previous instance is still served while reloading
+        self.wait_for_reload("recommender")
+        recommender3 = self.model_registry.get("recommender")
+        self.assertEqual(recommender3, {"load": 2})
+        self.assertEqual(self.number_of_loads, 2)
+        self.assertEqual(self.model_registry.get_generation("recommender"), 1)
+
+    def test_failed_reload_is_logged_and_keeps_previous_recommender(self):
+        recommender1 = self.model_registry.get("recommender")
+        self.model_registry.loaders["recommender"] = self.fail_to_load_recommender
+        self.model_registry.bump_model_generation("recommender")
+        with self.assertLogs("RecommenderModule.recommenders.resources.model_registry", level="ERROR") as logs:
+            self.model_registry.get("recommender")
+            self.wait_for_reload("recommender")
+        self.assertIn("Reloading recommender 'recommender' failed", logs.output[0])
+        self.model_registry.loaders["recommender"] = self.load_recommender
+        self.assertIs(self.model_registry.get("recommender"), recommender1)
+        self.wait_for_reload("recommender")
+
+    def test_get_does_not_check_model_files_before_check_interval(self):
+        self.model_registry.check_interval = 3600
+        recommender1 = self.model_registry.get("recommender")
+        self.model_registry.bump_model_generation("recommender")
+        recommender2 = self.model_registry.get("recommender")
+        self.wait_for_reload("recommender")
+        self.assertIs(recommender1, self.model_registry.get("recommender"))
+        self.assertEqual(self.number_of_loads, 1)
+
+    def test_get_does_not_reload_when_model_file_is_missing(self):
+        recommender1 = self.model_registry.get("recommender")
+        os.remove(self.model_file_path)
+        self.model_registry.bump_model_generation("recommender")
+        self.assertIs(recommender1, self.model_registry.get("recommender"))
+        self.wait_for_reload("recommender")
+        self.assertEqual(self.number_of_loads, 1)
+
+    def test_set_replaces_recommender(self):
+        self.model_registry.get("recommender")
+        self.model_registry.bump_model_generation("recommender")
+        self.model_registry.set("recommender", {"load": "retrained"})
+        self.assertEqual(self.model_registry.get("recommender"), {"load": "retrained"})
+        self.wait_for_reload("recommender")
+        self.assertEqual(self.number_of_loads, 1)
+
+    def test_clear_forgets_recommenders(self):
+        self.model_registry.get("recommender")
+        self.model_registry.clear()
+        self.assertEqual(self.model_registry.get("recommender"), {"load": 2})
+
+    def test_get_model_version(self):
+        self.assertEqual(self.model_registry.get_model_version("recommender"), 0)
+        self.update_model_file()
+        self.assertEqual(self.model_registry.get_model_version("recommender"), 0)
+        self.model_registry.bump_model_generation("recommender")
+        self.assertEqual(self.model_registry.get_model_version("recommender"), 1)
+        os.remove(self.model_file_path)
+        self.assertEqual(self.model_registry.get_model_version("recommender"), None)
+
+    def test_get_model_generation_without_generation_file(self):
+        self.assertEqual(self.model_registry.get_model_generation("recommender"), 0)
+        self.model_registry.get("recommender")
+        self.assertEqual(self.model_registry.get_generation("recommender"), 0)
+
+    def test_bump_model_generation_greater_than_all_generations(self):
+        other_generation_file_path = os.path.join(self.directory.name, "other_generation.txt")
+        self.model_registry.register("other", self.load_recommender, [self.model_file_path], generation_file_path=other_generation_file_path)
+        self.assertEqual(self.model_registry.bump_model_generation("other"), 1)
+        self.assertEqual(self.model_registry.bump_model_generation("other"), 2)
+        self.assertEqual(self.model_registry.bump_model_generation("recommender"), 3)
+        self.assertEqual(self.model_registry.get_model_generation("recommender"), 3)
+        self.assertEqual(self.model_registry.get_model_generation("other"), 2)
+
+    def test_get_generation_of_loaded_recommender(self):
+        self.model_registry.bump_model_generation("recommender")
+        self.model_registry.get("recommender")
+        self.assertEqual(self.model_registry.get_generation("recommender"), 1)
+        self.model_registry.bump_model_generation("recommender")
+        self.assertEqual(self.model_registry.get_generation("recommender"), 1) # Not reloaded yet
+        self.model_registry.set("recommender", {"load": "retrained"})
+        self.assertEqual(self.model_registry.get_generation("recommender"), 2)
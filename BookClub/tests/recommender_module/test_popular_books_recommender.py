@@ -4,7 +4,7 @@ from RecommenderModule.recommenders.popular_books_recommender import PopularBook
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
 from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
 from RecommenderModule.recommenders.resources.library import Library
-from BookClub.models import Club
+from BookClub.models import Club, User
 
 
 @tag('recommenders')
@@ -49,6 +49,14 @@ class PopularBooksRecommenderTestCase(TestCase):
         recommendations = self.popular_books_recommender.get_user_recommendations("X")
         self.assertEqual(len(recommendations), 10)
 
+    def test_get_user_recommendations_batch(self):
+        self.set_up_django_based_recommender()
+        user_ids = [user.username for user in User.objects.all()] + ["X"]
+        recommendations = self.popular_books_recommender.get_user_recommendations_batch(user_ids)
+        self.assertEqual(list(recommendations.keys()), user_ids)
+        for user_id in user_ids:
+            self.assertEqual(recommendations[user_id], self.popular_books_recommender.get_user_recommendations(user_id))
+
     def test_get_club_recommendations(self):
         self.set_up_django_based_recommender()
         recommendations1 = self.popular_books_recommender.get_club_recommendations(self.club_url_name)
@@ -3,6 +3,8 @@ import numpy as np
 from django.test import TestCase, tag
 from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
+from surprise import Dataset, Reader
+import pandas as pd
 import math
 
 
@@ -150,3 +152,44 @@ class PopularBooksRecommenderMethodsTestCase(TestCase):
                                                          parameters={'ranking_method': 'x'})
         with self.assertRaises(ValueError):
             recommendations = self.popular_books_methods.get_recommendations()
+
+
+@tag('recommenders')
+class PopularBooksRecommenderMethodsStatisticsTestCase(TestCase):
+    """Popular Books Recommender Methods Tests, on a small generated trainset"""
+    def setUp(self):
+        ratings_df = pd.DataFrame.from_records([
+            [str(user_id), str(book_id), (user_id * book_id + user_id) % 11]
+            for user_id in range(30) for book_id in range(40) if (user_id + 2 * book_id) % 7 < book_id % 6 + 1
+        ], columns=["User-ID", "ISBN", "Book-Rating"])
+        reader = Reader(line_format='user item rating', sep=';', skip_lines=0, rating_scale=(0, 10))
+        self.trainset = Dataset.load_from_df(ratings_df, reader).build_full_trainset()
+        self.popular_books_methods = PopularBooksMethods(print_status=False, trainset=self.trainset,
+                                                         parameters={'ranking_method': 'combination', 'min_ratings_threshold': 5})
+
+    def test_load_filtered_books_list(self):
+        for inner_item_id in self.trainset.all_items():
+            isbn = self.trainset.to_raw_iid(inner_item_id)
+            number_of_ratings = len(self.trainset.ir[inner_item_id])
+            self.assertEqual(isbn in self.popular_books_methods.filtered_books_list, number_of_ratings >= 5)
+
+    def test_compute_books_ratings_statistics(self):
+        for index, isbn in enumerate(self.popular_books_methods.filtered_books_list):
+            self.assertEqual(self.popular_books_methods.ratings_counts[index], len(self.trainset.ir[self.trainset.to_inner_iid(isbn)]))
+            self.assertEqual(self.popular_books_methods.books_average_ratings[index], self.popular_books_methods.get_average_rating(isbn))
+            self.assertEqual(self.popular_books_methods.books_median_ratings[index], self.popular_books_methods.get_median_rating(isbn))
+
+    def test_sorted_popularity_lists(self):
+        filtered_books_list = self.popular_books_methods.filtered_books_list
+        average_ratings = {isbn: self.popular_books_methods.get_average_rating(isbn) for isbn in filtered_books_list}
+        median_ratings = {isbn: self.popular_books_methods.get_median_rating(isbn) for isbn in filtered_books_list}
+        combination_scores = {isbn: math.sqrt(average_ratings[isbn] * median_ratings[isbn]) for isbn in filtered_books_list}
+        self.assertEqual(self.popular_books_methods.sorted_average_ratings, sorted(average_ratings.items(), key=lambda item: item[1], reverse=True))
+        self.assertEqual(self.popular_books_methods.sorted_median_ratings, sorted(median_ratings.items(), key=lambda item: item[1], reverse=True))
+        self.assertEqual(self.popular_books_methods.sorted_combination_scores, sorted(combination_scores.items(), key=lambda item: item[1], reverse=True))
+
+    def test_get_recommendations_from_popularity_list_excludes_read_books(self):
+        popularity_list = self.popular_books_methods.sorted_average_ratings
+        read_books = (isbn for isbn, score in popularity_list[:3])
+        recommendations = self.popular_books_methods.get_recommendations_from_popularity_list(popularity_list, read_books=read_books)
+        self.assertEqual(recommendations, [isbn for isbn, score in popularity_list[3:] if score > 0][:10])
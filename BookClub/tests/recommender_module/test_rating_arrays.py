@@ -0,0 +1,74 @@
+"""Unit testing of the rating arrays"""
+from django.test import TestCase, tag
+from surprise import Dataset, Reader
+import numpy as np
+from BookClub.models import Book, BookReview, User
+from RecommenderModule.recommenders.resources.rating_arrays import RatingArrays
+from RecommenderModule.recommenders.resources.data_provider import DataProvider
+
+
+@tag('recommenders')
+class RatingArraysTestCase(TestCase):
+    """Rating arrays testing"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_books.json',
+        'BookClub/tests/fixtures/default_book_reviews.json'
+    ]
+
+    def setUp(self):
+        users = list(User.objects.all())
+        books = list(Book.objects.all())
+        for user_index, user in enumerate(users):
+            for book_index, book in enumerate(books):
+                if (user_index + book_index) % 3 != 0 and not BookReview.objects.filter(creator=user, book=book).exists():
+                    BookReview.objects.create(creator=user, book=book, book_rating=(user_index * book_index) % 11, title="Review", content="Lorem Ipsum")
+        self.ratings_list = list(BookReview.objects.values_list('creator__username', 'book__ISBN', 'book_rating'))
+
+    def build_surprise_trainset(self, ratings_df):
+        reader = Reader(line_format='user item rating', sep=';', skip_lines=0, rating_scale=(0,10))
+        return Dataset.load_from_df(ratings_df, reader).build_full_trainset()
+
+    def assertSameTrainsets(self, trainset, expected_trainset):
+        self.assertEqual(trainset.n_users, expected_trainset.n_users)
+        self.assertEqual(trainset.n_items, expected_trainset.n_items)
+        self.assertEqual(trainset.n_ratings, expected_trainset.n_ratings)
+        self.assertEqual(trainset._raw2inner_id_users, expected_trainset._raw2inner_id_users)
+        self.assertEqual(trainset._raw2inner_id_items, expected_trainset._raw2inner_id_items)
+        self.assertEqual(dict(trainset.ur), dict(expected_trainset.ur))
+        self.assertEqual(dict(trainset.ir), dict(expected_trainset.ir))
+
+    def test_from_django_database(self):
+        rating_arrays = RatingArrays.from_django_database(chunk_size=4)
+        self.assertEqual(rating_arrays.get_number_of_ratings(), len(self.ratings_list))
+        self.assertEqual(rating_arrays.user_indices.dtype, np.int32)
+        self.assertEqual(rating_arrays.ratings.dtype, np.int8)
+        ratings_from_arrays = [(rating_arrays.raw_user_ids[user_index], rating_arrays.raw_item_ids[item_index], rating)
+                               for user_index, item_index, rating in zip(rating_arrays.user_indices, rating_arrays.item_indices, rating_arrays.ratings)]
+        self.assertEqual(ratings_from_arrays, self.ratings_list)
+        for raw_user_id, index in rating_arrays.user_inner_ids.items():
+            self.assertEqual(rating_arrays.raw_user_ids[index], raw_user_id)
+
+    def test_to_dataframe(self):
+        ratings_df = RatingArrays.from_django_database().to_dataframe()
+        self.assertEqual(list(ratings_df.columns), ["User-ID", "ISBN", "Book-Rating"])
+        self.assertEqual([tuple(row) for row in ratings_df.itertuples(index=False)], self.ratings_list)
+
+    def test_build_trainset_same_as_surprise_trainset(self):
+        rating_arrays = RatingArrays.from_django_database()
+        self.assertSameTrainsets(rating_arrays.build_trainset(), self.build_surprise_trainset(rating_arrays.to_dataframe()))
+
+    def test_filter_items(self):
+        rating_arrays = RatingArrays.from_django_database()
+        filtered_rating_arrays = rating_arrays.filter_items(4)
+        self.assertTrue(np.all(filtered_rating_arrays.get_item_ratings_counts() >= 4))
+        ratings_df = rating_arrays.to_dataframe()
+        ratings_counts = ratings_df["ISBN"].value_counts()
+        expected_df = ratings_df.loc[ratings_df["ISBN"].isin([isbn for isbn, count in ratings_counts.items() if count >= 4])]
+        self.assertEqual(filtered_rating_arrays.get_number_of_ratings(), len(expected_df))
+        self.assertSameTrainsets(filtered_rating_arrays.build_trainset(), self.build_surprise_trainset(expected_df.astype({"User-ID": str, "ISBN": str})))
+
+    def test_data_provider_from_django_database(self):
+        data_provider = DataProvider(filtering_min_ratings_threshold=4)
+        self.assertEqual(len(data_provider.ratings_df), len(self.ratings_list))
+        self.assertSameTrainsets(data_provider.get_filtered_ratings_trainset(), data_provider.get_filtered_ratings_dataset().build_full_trainset())
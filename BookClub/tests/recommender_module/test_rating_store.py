@@ -0,0 +1,70 @@
+"""Unit testing of the rating store"""
+from django.test import TestCase, tag
+from BookClub.tests.helpers import get_generated_ratings, get_ratings_dataset
+import numpy as np
+import tempfile
+import os
+from RecommenderModule.recommenders.resources.rating_store import RatingStore
+from RecommenderModule.recommenders.resources.item_id_mapping import ItemIdMapping
+from RecommenderModule.recommenders.resources.item_similarity_statistics import ItemSimilarityStatistics
+from RecommenderModule.recommenders.resources.library import Library
+
+
+@tag('recommenders')
+class RatingStoreTestCase(TestCase):
+    """Rating store tests, on a small generated trainset"""
+    def setUp(self):
+        self.trainset = get_ratings_dataset(get_generated_ratings(user_id_prefix="user"), shuffling_seed=0).build_full_trainset()
+        self.rating_store = RatingStore.from_trainset(self.trainset)
+
+    def assertSameRatings(self, rating_store, trainset, same_order=True):
+        self.assertEqual(rating_store.n_users, trainset.n_users)
+        self.assertEqual(rating_store.n_items, trainset.n_items)
+        self.assertEqual(rating_store.n_ratings, trainset.n_ratings)
+        for inner_user_id in trainset.all_users():
+            self.assertEqual(rating_store.ur[inner_user_id], trainset.ur[inner_user_id])
+            raw_user_id = trainset.to_raw_uid(inner_user_id)
+            self.assertEqual(rating_store.to_raw_uid(inner_user_id), raw_user_id)
+            self.assertEqual(rating_store.to_inner_uid(raw_user_id), inner_user_id)
+        for inner_item_id in trainset.all_items():
+            if same_order:
+                self.assertEqual(rating_store.ir[inner_item_id], trainset.ir[inner_item_id])
+            else:
+                self.assertEqual(sorted(rating_store.ir[inner_item_id]), sorted(trainset.ir[inner_item_id]))
+            raw_item_id = trainset.to_raw_iid(inner_item_id)
+            self.assertEqual(rating_store.to_raw_iid(inner_item_id), raw_item_id)
+            self.assertEqual(rating_store.to_inner_iid(raw_item_id), inner_item_id)
+
+    def test_from_trainset_same_ratings_as_trainset(self):
+        self.assertSameRatings(self.rating_store, self.trainset)
+
+    def test_save_and_load_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.rating_store.save(directory)
+            loaded_rating_store = RatingStore.load(directory, mmap_mode='r')
+            self.assertTrue(isinstance(loaded_rating_store.user_ratings, np.memmap))
+            self.assertSameRatings(loaded_rating_store, self.trainset)
+            self.assertEqual(list(ItemIdMapping.load(directory).raw_item_ids), list(self.rating_store.raw_item_ids))
+            self.assertFalse(os.path.exists(f"{directory}/rating_store_raw_item_ids.npy"))
+            del loaded_rating_store
+
+    def test_unknown_raw_ids_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            self.rating_store.to_inner_iid("X")
+        with self.assertRaises(ValueError):
+            self.rating_store.to_inner_uid("X")
+        with self.assertRaises(ValueError):
+            self.rating_store.to_inner_iid(1)
+
+    def test_from_user_ratings(self):
+        statistics = ItemSimilarityStatistics.from_trainset(self.trainset)
+        rating_store = RatingStore.from_user_ratings(*statistics.get_ratings())
+        self.assertSameRatings(rating_store, self.trainset, same_order=False)
+
+    def test_library_from_rating_store(self):
+        library_store = Library(trainset=self.rating_store)
+        library_trainset = Library(trainset=self.trainset)
+        for isbn in ["0", "5", "39"]:
+            self.assertEqual(library_store.get_all_ratings_for_isbn_from_trainset(isbn), library_trainset.get_all_ratings_for_isbn_from_trainset(isbn))
+        self.assertEqual(library_store.get_all_ratings_by_user("user3"), library_trainset.get_all_ratings_by_user("user3"))
+        self.assertEqual(library_store.get_list_of_all_books_in_trainset(), library_trainset.get_list_of_all_books_in_trainset())
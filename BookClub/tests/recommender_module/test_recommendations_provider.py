@@ -1,10 +1,16 @@
 """Unit testing of the recommendations provider"""
-from django.test import TestCase, tag
+from django.test import TestCase, tag, override_settings
 from BookClub.models import User, Book, BookReview, Club, UserRecommendations, ClubRecommendations
+from BookClub.models.recommendations_invalidation import recommendations_invalidator
 from RecommenderModule import recommendations_provider
 from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import \
     ItemBasedCollaborativeFilteringMethods
+from RecommenderModule.recommenders.resources.model_registry import model_registry
+from django.utils import timezone
+from datetime import timedelta
 import joblib
+import tempfile
+import os
 
 
 @tag('recommenders')
@@ -88,6 +94,29 @@ class RecommendationsProviderTestCase(TestCase):
         recommendations = recommendations_provider.get_user_personalised_recommendations("X")
         self.assertEqual(recommendations, [])
 
+    def test_get_user_hybrid_recommendations_wrong_user_id(self):
+        recommendations = recommendations_provider.get_user_hybrid_recommendations("X")
+        self.assertEqual(recommendations, recommendations_provider.get_user_popularity_recommendations("X"))
+
+    def test_get_user_hybrid_recommendations_does_not_contain_books_read_by_user(self):
+        trainset = ItemBasedCollaborativeFilteringMethods().trainset
+        for i, book in enumerate(list(trainset.all_items())[:10]):
+            book1 = Book.objects.create(title=f"Book {i}", ISBN=trainset.to_raw_iid(book), author="John Doe",
+                                        publicationYear="2002-02-02", publisher="Penguin")
+            BookReview.objects.create(creator=self.user, book=book1, book_rating=7)
+        recommendations = recommendations_provider.get_user_hybrid_recommendations(self.user.username)
+        self.assertEqual(len(recommendations), 10)
+        read_books = set(BookReview.objects.filter(creator=self.user).values_list('book__ISBN', flat=True))
+        self.assertFalse(read_books.intersection(recommendations))
+
+    def test_get_hybrid_recommender_is_rebuilt_after_reloading_a_recommender(self):
+        hybrid_recommender = recommendations_provider.get_hybrid_recommender()
+        self.assertIs(recommendations_provider.get_hybrid_recommender(), hybrid_recommender)
+        model_registry.set("popularity", model_registry.get("popularity"))
+        self.assertIs(recommendations_provider.get_hybrid_recommender(), hybrid_recommender)
+        model_registry.set("popularity", recommendations_provider.load_popularity_recommender())
+        self.assertIsNot(recommendations_provider.get_hybrid_recommender(), hybrid_recommender)
+
     def test_get_club_popularity_recommendations(self):
         recommendations = recommendations_provider.get_club_popularity_recommendations(self.club.club_url_name)
         self.assertEqual(len(recommendations), 10)
@@ -181,3 +210,150 @@ class RecommendationsProviderTestCase(TestCase):
         club_recommendation_2 = ClubRecommendations.objects.get(pk=2)
         self.assertTrue(club_recommendation_1.modified)
         self.assertTrue(club_recommendation_2.modified)
+
+    def get_expected_user_recommendations(self, username):
+        recommendations = recommendations_provider.get_user_personalised_recommendations(username)
+        if len(recommendations) < 3:
+            recommendations = recommendations_provider.get_user_popularity_recommendations(username)
+        return recommendations
+
+    def get_expected_club_recommendations(self, club_url_name):
+        recommendations = recommendations_provider.get_club_personalised_recommendations(club_url_name)
+        if len(recommendations) < 3:
+            recommendations = recommendations_provider.get_club_popularity_recommendations(club_url_name)
+        return recommendations
+
+    def test_precompute_modified_user_recommendations(self):
+        recommendations_provider.update_all_recommendations()
+        number_of_recommendations = UserRecommendations.objects.count()
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), number_of_recommendations)
+        self.assertFalse(UserRecommendations.objects.filter(modified=True).exists())
+        for user_recommendations in UserRecommendations.objects.select_related('user'):
+            self.assertEqual(user_recommendations.recommendations, self.get_expected_user_recommendations(user_recommendations.user.username))
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 0)
+
+    def test_precompute_modified_user_recommendations_most_recently_active_users_first(self):
+        recommendations_provider.update_all_recommendations()
+        user_recommendations = list(UserRecommendations.objects.select_related('user').order_by('pk'))
+        User.objects.filter(pk=user_recommendations[-1].user.pk).update(last_login=timezone.now())
+        User.objects.filter(pk=user_recommendations[0].user.pk).update(last_login=timezone.now() - timedelta(days=1))
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(batch_size=1), 1)
+        self.assertFalse(UserRecommendations.objects.get(pk=user_recommendations[-1].pk).modified)
+        self.assertTrue(UserRecommendations.objects.get(pk=user_recommendations[0].pk).modified)
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(batch_size=1), 1)
+        self.assertFalse(UserRecommendations.objects.get(pk=user_recommendations[0].pk).modified)
+
+    def test_precompute_modified_club_recommendations(self):
+        recommendations_provider.update_all_recommendations()
+        number_of_recommendations = ClubRecommendations.objects.count()
+        self.assertEqual(recommendations_provider.precompute_modified_club_recommendations(batch_size=1), 1)
+        self.assertEqual(ClubRecommendations.objects.filter(modified=True).count(), number_of_recommendations - 1)
+        recommendations_provider.precompute_modified_club_recommendations()
+        self.assertFalse(ClubRecommendations.objects.filter(modified=True).exists())
+        for club_recommendations in ClubRecommendations.objects.select_related('club'):
+            self.assertEqual(club_recommendations.recommendations, self.get_expected_club_recommendations(club_recommendations.club.club_url_name))
+
+    def test_precompute_skips_recently_invalidated_recommendations(self):
+        UserRecommendations.objects.update(modified=False)
+        self.book_review.book_rating = 3
+        self.book_review.save()
+        self.assertTrue(UserRecommendations.objects.get(user=self.book_review.creator).modified)
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 0)
+        with override_settings(RECOMMENDATIONS_INVALIDATION_WINDOW=0):
+            self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 1)
+
+    def test_ratings_changes_within_window_after_precompute_are_not_lost(self):
+        recommendations_invalidator.clear()
+        self.addCleanup(recommendations_invalidator.clear)
+        UserRecommendations.objects.update(modified=False)
+        # New recommendations are flagged as modified, without having been invalidated
+        UserRecommendations.objects.filter(user=self.book_review.creator).update(modified=True, invalidated_on=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book_review.book_rating = 3
+            self.book_review.save()
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book_review.book_rating = 4
+            self.book_review.save()
+        self.assertTrue(UserRecommendations.objects.get(user=self.book_review.creator).modified)
+        with override_settings(RECOMMENDATIONS_INVALIDATION_WINDOW=0):
+            self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 1)
+
+
+@tag('recommenders')
+class RecommendationsGenerationTestCase(TestCase):
+    """Recommendations provider tests of the generations of the models, with temporary generation files"""
+    fixtures = [
+        'BookClub/tests/fixtures/default_users.json',
+        'BookClub/tests/fixtures/default_books.json',
+        'BookClub/tests/fixtures/default_clubs.json',
+        'BookClub/tests/fixtures/default_club_members.json',
+        'BookClub/tests/fixtures/default_abstract_recommendations.json',
+        'BookClub/tests/fixtures/default_user_recommendations.json',
+        'BookClub/tests/fixtures/default_club_recommendations.json'
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.generation_file_paths = dict(model_registry.generation_file_paths)
+        for name in self.generation_file_paths.keys():
+            model_registry.generation_file_paths[name] = os.path.join(self.directory.name, f"{name}_generation.txt")
+        self.reload_recommenders()
+
+    def tearDown(self):
+        model_registry.generation_file_paths.update(self.generation_file_paths)
+        self.reload_recommenders()
+        self.directory.cleanup()
+
+    def reload_recommenders(self):
+        for name in recommendations_provider.recommendations_recommender_names:
+            model_registry.set(name, model_registry.get(name))
+
+    def retrain(self, name):
+        """Simulate the retraining of the recommender (without training it again)"""
+        model_registry.bump_model_generation(name)
+        model_registry.set(name, model_registry.get(name))
+
+    def test_get_recommendations_generation(self):
+        self.assertEqual(recommendations_provider.get_recommendations_generation(), 0)
+        self.retrain("item_based")
+        self.assertEqual(recommendations_provider.get_recommendations_generation(), 1)
+        self.retrain("content_based")
+        self.assertEqual(recommendations_provider.get_recommendations_generation(), 1)
+        self.retrain("popularity")
+        self.assertEqual(recommendations_provider.get_recommendations_generation(), 3)
+
+    @override_settings(RECOMMENDATIONS_USING_HYBRID_RECOMMENDER=True)
+    def test_get_recommendations_generation_using_hybrid_recommender(self):
+        self.retrain("content_based")
+        self.assertEqual(recommendations_provider.get_recommendations_generation(), 1)
+        self.assertEqual(recommendations_provider.get_loaded_recommendations_generation(), 1)
+
+    @override_settings(RECOMMENDATIONS_USING_HYBRID_RECOMMENDER=True)
+    def test_precompute_user_recommendations_using_hybrid_recommender(self):
+        recommendations_provider.update_all_recommendations()
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), UserRecommendations.objects.count())
+        for user_recommendations in UserRecommendations.objects.select_related('user'):
+            self.assertEqual(user_recommendations.recommendations, recommendations_provider.get_user_hybrid_recommendations(user_recommendations.user.username))
+
+    def test_retraining_does_not_update_recommendations(self):
+        recommendations_provider.precompute_modified_user_recommendations()
+        self.retrain("item_based")
+        self.assertFalse(UserRecommendations.objects.filter(modified=True).exists())
+        self.assertFalse(UserRecommendations.objects.filter(generation=1).exists())
+
+    def test_precompute_user_recommendations_of_previous_generation(self):
+        recommendations_provider.precompute_modified_user_recommendations()
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 0)
+        self.retrain("popularity")
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), UserRecommendations.objects.count())
+        self.assertFalse(UserRecommendations.objects.exclude(generation=1).exists())
+        self.assertEqual(recommendations_provider.precompute_modified_user_recommendations(), 0)
+
+    def test_precompute_club_recommendations_of_previous_generation(self):
+        recommendations_provider.precompute_modified_club_recommendations()
+        self.assertEqual(recommendations_provider.precompute_modified_club_recommendations(), 0)
+        self.retrain("item_based")
+        self.assertEqual(recommendations_provider.precompute_modified_club_recommendations(), ClubRecommendations.objects.count())
+        self.assertFalse(ClubRecommendations.objects.exclude(generation=1).exists())
+        self.assertEqual(recommendations_provider.precompute_modified_club_recommendations(), 0)
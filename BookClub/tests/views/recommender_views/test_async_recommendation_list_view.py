@@ -1,11 +1,14 @@
 """Unit testing for the Async Recommendations view"""
 from django.urls import reverse
-from django.test import TestCase, tag
+from django.test import TestCase, tag, override_settings
 from BookClub.models import Book, User, Club, BookReview, UserRecommendations, ClubRecommendations
 
 from RecommenderModule import recommendations_provider
 from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import \
     ItemBasedCollaborativeFilteringMethods
+from RecommenderModule.recommenders.resources.model_registry import model_registry
+from BookClub.tests.helpers import reverse_with_next
+from BookClub.views.recommendation_views.recommendations_cache import recommendations_cache
 
 
 @tag('views', 'async_recommendations')
@@ -19,6 +22,7 @@ class AsyncRecommendationListViewsTestCase(TestCase):
     ]
 
     def setUp(self):
+        recommendations_cache.clear()
         self.user1 = User.objects.get(pk=1)
         self.club = Club.objects.get(pk=1)
         self.user_url = reverse('async_user_recommendations')
@@ -71,6 +75,99 @@ class AsyncRecommendationListViewsTestCase(TestCase):
         for book in Book.objects.all():
             self.assertIn(book, view_recommendations)
 
+    def test_user_recommendations_keep_their_order(self):
+        isbns = [book.ISBN for book in Book.objects.order_by('-pk')]
+        UserRecommendations.objects.create(user=self.user1, recommendations=isbns, modified=False)
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.user_url)
+        self.assertEqual([book.ISBN for book in response.context['recommendations']], isbns)
+
+    def test_club_recommendations_keep_their_order(self):
+        isbns = [book.ISBN for book in Book.objects.order_by('-pk')]
+        ClubRecommendations.objects.create(club=self.club, recommendations=isbns, modified=False)
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.club_url)
+        self.assertEqual([book.ISBN for book in response.context['recommendations']], isbns)
+
+    def test_user_recommendations_are_only_rendered_once(self):
+        UserRecommendations.objects.create(user=self.user1, recommendations=[Book.objects.get(pk=1).ISBN], modified=False)
+        self.client.login(username=self.user1.username, password="Password123")
+        response1 = self.client.get(self.user_url)
+        self.assertTemplateUsed(response1, 'partials/recommendation_list_view.html')
+        response2 = self.client.get(self.user_url)
+        self.assertTemplateNotUsed(response2, 'partials/recommendation_list_view.html')
+        self.assertEqual(response1.json(), response2.json())
+
+    def test_recomputed_club_recommendations_are_rendered_again(self):
+        recommendations = ClubRecommendations.objects.create(club=self.club, recommendations=[Book.objects.get(pk=1).ISBN], modified=False)
+        self.client.login(username=self.user1.username, password="Password123")
+        self.client.get(self.club_url)
+        recommendations.recommendations = [Book.objects.get(pk=2).ISBN]
+        recommendations.save()
+        response = self.client.get(self.club_url)
+        self.assertEqual(list(response.context['recommendations']), [Book.objects.get(pk=2)])
+
+    def test_user_view_does_not_compute_modified_recommendations(self):
+        book = Book.objects.get(pk=1)
+        UserRecommendations.objects.create(user=self.user1, recommendations=[book.ISBN], modified=True)
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.user_url)
+        self.assertEqual(list(response.context['recommendations']), [book])
+        self.assertTrue(UserRecommendations.objects.get(user=self.user1).modified)
+
+    def test_club_view_does_not_compute_modified_recommendations(self):
+        book = Book.objects.get(pk=1)
+        ClubRecommendations.objects.create(club=self.club, recommendations=[book.ISBN], modified=True)
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.club_url)
+        self.assertEqual(list(response.context['recommendations']), [book])
+        self.assertTrue(ClubRecommendations.objects.get(club=self.club).modified)
+
+    def test_user_view_lists_popular_books_before_recommendations_are_precomputed(self):
+        popularity_recommendations = recommendations_provider.get_user_popularity_recommendations(self.user1.username)
+        for i, isbn in enumerate(popularity_recommendations):
+            Book.objects.create(title=f"Book {i}", ISBN=isbn, author="John Doe", publicationYear="2002-02-02", publisher="Penguin")
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.user_url)
+        self.assertEqual(sorted(book.ISBN for book in response.context['recommendations']), sorted(popularity_recommendations))
+        self.assertTrue(UserRecommendations.objects.get(user=self.user1).modified)
+
+    def test_user_view_redirects_when_not_logged_in(self):
+        response = self.client.get(self.user_url)
+        self.assertRedirects(response, reverse_with_next('login', self.user_url), status_code=302, target_status_code=200)
+
+    def test_club_view_redirects_when_not_logged_in(self):
+        response = self.client.get(self.club_url)
+        self.assertRedirects(response, reverse_with_next('login', self.club_url), status_code=302, target_status_code=200)
+
+    def create_popular_books(self, read_books):
+        popularity_recommendations = recommendations_provider.get_popularity_recommendations_from_read_books(read_books)
+        for i, isbn in enumerate(popularity_recommendations):
+            Book.objects.create(title=f"Book {i}", ISBN=isbn, author="John Doe", publicationYear="2002-02-02", publisher="Penguin")
+        return popularity_recommendations
+
+    @override_settings(RECOMMENDATIONS_LATENCY_BUDGET=0)
+    def test_user_view_lists_loaded_popular_books_when_latency_budget_is_exceeded(self):
+        popularity_recommendations = self.create_popular_books([])
+        model_registry.get("popularity")
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.user_url)
+        self.assertEqual(sorted(book.ISBN for book in response.context['recommendations']), sorted(popularity_recommendations))
+
+    @override_settings(RECOMMENDATIONS_LATENCY_BUDGET=0)
+    def test_club_view_lists_stored_recommendations_when_latency_budget_is_exceeded(self):
+        book = Book.objects.get(pk=1)
+        ClubRecommendations.objects.create(club=self.club, recommendations=[book.ISBN], modified=True)
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.club_url)
+        self.assertEqual(list(response.context['recommendations']), [book])
+
+    def test_club_view_lists_popular_books_before_recommendations_are_precomputed(self):
+        popularity_recommendations = self.create_popular_books([])
+        self.client.login(username=self.user1.username, password="Password123")
+        response = self.client.get(self.club_url)
+        self.assertEqual(sorted(book.ISBN for book in response.context['recommendations']), sorted(popularity_recommendations))
+
     def test_user_gets_personalised_recommendations_when_more_than_3_available(self):
         trainset = ItemBasedCollaborativeFilteringMethods().trainset
         i = 0
@@ -93,6 +190,8 @@ class AsyncRecommendationListViewsTestCase(TestCase):
                                         publicationYear="2002-02-02", publisher="Penguin")
             i += 1
 
+        UserRecommendations.objects.get_or_create(user=self.user1)
+        recommendations_provider.precompute_modified_user_recommendations()
         self.client.login(username=self.user1.username, password="Password123")
         response = self.client.get(self.user_url)
         view_recommendations = response.context['recommendations']
@@ -128,6 +227,8 @@ class AsyncRecommendationListViewsTestCase(TestCase):
                                         publicationYear="2002-02-02", publisher="Penguin")
             i += 1
 
+        ClubRecommendations.objects.get_or_create(club=self.club)
+        recommendations_provider.precompute_modified_club_recommendations()
         self.client.login(username=self.user1.username, password="Password123")
         response = self.client.get(self.club_url)
         view_recommendations = response.context['recommendations']
@@ -0,0 +1,75 @@
+"""Unit testing of the Recommendations Cache"""
+import asyncio
+import threading
+from unittest import mock
+from django.test import TestCase, tag
+from BookClub.views.recommendation_views.recommendations_cache import recommendations_cache
+
+
+@tag('views', 'recommendations_cache')
+class RecommendationsCacheTestCase(TestCase):
+    """Testing the cache of the rendered recommendation lists"""
+
+    def setUp(self):
+        recommendations_cache.clear()
+        self.renders = 0
+
+    def tearDown(self):
+        recommendations_cache.clear()
+
+    async def render(self):
+        self.renders += 1
+        await asyncio.sleep(0.1)
+        return {"books": [], "html": f"render {self.renders}"}
+
+    def test_keys_depend_on_owner_generation_and_isbns(self):
+        key = recommendations_cache.get_key("user:1", 1, ["A", "B"])
+        self.assertEqual(key, recommendations_cache.get_key("user:1", 1, ["A", "B"]))
+        self.assertNotEqual(key, recommendations_cache.get_key("club:1", 1, ["A", "B"]))
+        self.assertNotEqual(key, recommendations_cache.get_key("user:1", 2, ["A", "B"]))
+        self.assertNotEqual(key, recommendations_cache.get_key("user:1", 1, ["B", "A"]))
+
+    def test_rendered_list_is_cached(self):
+        key = recommendations_cache.get_key("user:1", 1, ["A"])
+        rendered_list1 = asyncio.run(recommendations_cache.get_or_render(key, self.render))
+        rendered_list2 = asyncio.run(recommendations_cache.get_or_render(key, self.render))
+        self.assertEqual(rendered_list1, rendered_list2)
+        self.assertEqual(self.renders, 1)
+
+    def test_concurrent_requests_render_once(self):
+        key = recommendations_cache.get_key("user:1", 1, ["A"])
+
+        async def get_concurrently():
+            return await asyncio.gather(*[recommendations_cache.get_or_render(key, self.render) for i in range(5)])
+
+        rendered_lists = asyncio.run(get_concurrently())
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(rendered_lists, [{"books": [], "html": "render 1"}] * 5)
+
+    def test_lock_is_released_when_rendering_fails(self):
+        key = recommendations_cache.get_key("user:1", 1, ["A"])
+
+        async def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(recommendations_cache.get_or_render(key, fail))
+        self.assertEqual(asyncio.run(recommendations_cache.get_or_render(key, self.render))["html"], "render 1")
+
+    def test_cache_is_not_called_from_the_event_loop_thread(self):
+        key = recommendations_cache.get_key("user:1", 1, ["A"])
+        cache = recommendations_cache.get_cache()
+        calling_threads = []
+
+        def get(*args, **kwargs):
+            calling_threads.append(threading.current_thread())
+            return None
+
+        async def get_from_event_loop():
+            with mock.patch.object(cache, "get", side_effect=get):
+                await recommendations_cache.get_or_render(key, self.render)
+            return threading.current_thread()
+
+        event_loop_thread = asyncio.run(get_from_event_loop())
+        self.assertTrue(len(calling_threads) > 0)
+        self.assertNotIn(event_loop_thread, calling_threads)
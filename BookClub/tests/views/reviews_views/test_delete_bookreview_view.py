@@ -4,7 +4,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.test import TestCase, tag
 from django.urls import reverse
 
-from BookClub.models import BookReview, User
+from BookClub.models import BookReview, User, UserRecommendations
 from BookClub.tests.helpers import LogInTester, reverse_with_next
 
 
@@ -103,3 +103,10 @@ class DeleteBookReview(TestCase, LogInTester):
         bookreview_exists_after = BookReview.objects.filter(pk=self.bookreview.id).exists()
         self.assertNotEqual(bookreview_exists_before, bookreview_exists_after)
         self.assertRedirects(response, self.redirect_url, status_code=302, target_status_code=200)
+
+    def test_successful_delete_invalidates_recommendations(self):
+        recommendations = UserRecommendations.objects.create(user=self.review_author, modified=False)
+        self.client.login(username=self.review_author.username, password="Password123")
+        self.client.post(self.url)
+        recommendations.refresh_from_db()
+        self.assertTrue(recommendations.modified)
@@ -1,11 +1,22 @@
 """Recommendation related views."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.template.loader import render_to_string
 from BookClub.helpers import get_club_from_url_name
 from BookClub.models import UserRecommendations, ClubRecommendations, User, Club, Book
-from RecommenderModule.recommendations_provider import get_club_personalised_recommendations, get_club_popularity_recommendations, get_user_personalised_recommendations, get_user_popularity_recommendations
+from RecommenderModule.recommendations_provider import get_popularity_recommendations_from_read_books, get_loaded_popularity_recommendations_from_read_books
+from RecommenderModule.recommenders.resources.library import Library
+from BookClub.views.recommendation_views.recommendations_cache import recommendations_cache
+
+# Bounded pool of threads running the recommender work (loading models and scoring) of the recommendation lists,
+# so that it does not block the requests served meanwhile
+recommendations_executor = ThreadPoolExecutor(max_workers=settings.RECOMMENDATIONS_THREAD_POOL_SIZE, thread_name_prefix="recommendations")
 
 
 class RecommendationBaseView(LoginRequiredMixin, TemplateView):
@@ -25,70 +36,84 @@ class RecommendationBaseView(LoginRequiredMixin, TemplateView):
         if club is not None:
             return "recommendations/recommendation_base_club.html"
         return "recommendations/recommendation_base_user.html"
-    
 
-class RecommendationUserListView(LoginRequiredMixin, TemplateView):
-    """List of user recommendations. If Recommendations do not exist, or have been modified, the code also loads the recommendations from file for this user."""
-    model = Book
-    template_name = "partials/recommendation_list_view.html"
-    context_object_name = "recommendations"
-
-    def get_queryset(self):
-        user = self.request.user
-        recommendations = UserRecommendations.objects.get_or_create(user=user)[0]
-        if recommendations.modified:
-            isbns = get_user_personalised_recommendations(
-                self.request.user.username)
-            if len(isbns) < 3:
-                isbns = get_user_popularity_recommendations(
-                    self.request.user.username)
-            recommendations.recommendations = isbns
-            recommendations.modified = False
-            recommendations.save()
-        else:
-            isbns = recommendations.recommendations
-        books = Book.objects.filter(ISBN__in=isbns)
-        return books
-    
-    def get(self, request, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-        recommendations = self.get_queryset()
-        context['recommendations'] = recommendations
-        html = render_to_string(template_name=self.template_name, context=context, request=request)
-        data_dict = {"html_from_view" : html}
-        return JsonResponse(data=data_dict, safe=False)
-    
-class RecommendationClubListView(LoginRequiredMixin, TemplateView):
-    """List of recommendation for a club. If Recommendations do not exist, or have been modified, the code also loads the recommendations from file for this club."""
-    model = Book
-    template_name = "partials/recommendation_list_view.html"
-    context_object_name = "recommendations"
-    
-    def get_queryset(self):
-        club = Club.objects.get(club_url_name=self.kwargs.get('club_url_name'))
-        recommendations = ClubRecommendations.objects.get_or_create(club=club)[0]
-        if recommendations.modified:
-            isbns = get_user_personalised_recommendations(
-                self.request.user.username)
-            if len(isbns) < 3:
-                isbns = get_user_popularity_recommendations(
-                    self.request.user.username)
-
-            recommendations.recommendations = isbns
-            recommendations.modified = False
-            recommendations.save()
-        else:
-            isbns = recommendations.recommendations
-        books = Book.objects.filter(ISBN__in=isbns)
-        return books
-    
-    def get(self, request, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-        recommendations = self.get_queryset()
-        context['recommendations'] = recommendations
-        html = render_to_string(
-            template_name=self.template_name, context=context, request=request)
-        data_dict = {"html_from_view": html}
-        return JsonResponse(data=data_dict, safe=False)
-
-    
\ No newline at end of file
+
+async def get_popularity_recommendations_within_latency_budget(read_books):
+    """Get the most popular books not read yet, from the recommendations thread pool.
+    If the recommender takes longer than the latency budget (e.g. while loading its model), the most popular books
+    are returned without waiting for it, if it is already loaded (work which has already started still completes in the background,
+    e.g. loading the model for the next requests)."""
+    loop = asyncio.get_running_loop()
+    recommendations_future = loop.run_in_executor(recommendations_executor, get_popularity_recommendations_from_read_books, read_books)
+    try:
+        return await asyncio.wait_for(recommendations_future, timeout=settings.RECOMMENDATIONS_LATENCY_BUDGET)
+    except asyncio.TimeoutError:
+        return get_loaded_popularity_recommendations_from_read_books(read_books)
+
+
+def get_stored_user_recommendations(user):
+    """Get the recommendations of the user (the list of ISBN of the recommended books and the generation of the models
+    they have been computed from), as precomputed by the precompute_recommendations command."""
+    return UserRecommendations.objects.get_or_create(user=user)[0]
+
+
+def get_stored_club_recommendations(club_url_name):
+    """Get the recommendations of the club (the list of ISBN of the recommended books and the generation of the models
+    they have been computed from), as precomputed by the precompute_recommendations command."""
+    club = Club.objects.get(club_url_name=club_url_name)
+    return ClubRecommendations.objects.get_or_create(club=club)[0]
+
+
+def get_ordered_books(isbns):
+    """Get the Books with the given ISBNs, in the order of the ISBNs (the order of the recommendations)."""
+    books = Book.objects.in_bulk(isbns, field_name='ISBN')
+    return [books[isbn] for isbn in isbns if isbn in books]
+
+
+def render_recommendations(request, isbns, **kwargs):
+    """Render the list of recommended books, as a dictionary containing the ordered books and the rendered HTML fragment."""
+    context = dict(kwargs)
+    context['recommendations'] = get_ordered_books(isbns)
+    html = render_to_string(template_name="partials/recommendation_list_view.html", context=context, request=request)
+    return {"books": context['recommendations'], "html": html}
+
+
+async def get_rendered_recommendations(request, owner, generation, isbns, **kwargs):
+    """Get the rendered list of recommended books from the recommendations cache (rendering it only once for the given owner,
+    generation of the models and ISBNs), as a JsonResponse which is then displayed using JS."""
+    cache_key = recommendations_cache.get_key(owner, generation, isbns)
+    rendered_recommendations = await recommendations_cache.get_or_render(
+        cache_key, lambda: sync_to_async(render_recommendations)(request, isbns, **kwargs))
+    data_dict = {"html_from_view": rendered_recommendations["html"]}
+    return JsonResponse(data=data_dict, safe=False)
+
+
+async def recommendation_user_list(request):
+    """List of user recommendations, as precomputed by the precompute_recommendations command.
+    If Recommendations have not been precomputed yet, the most popular books are listed instead.
+    The database is accessed from the request's thread, and the recommender work from the recommendations thread pool,
+    so that serving the list does not block the other requests (when served with ASGI)."""
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return redirect_to_login(request.get_full_path())
+    recommendations = await sync_to_async(get_stored_user_recommendations)(request.user)
+    isbns = recommendations.recommendations
+    if len(isbns) == 0:
+        read_books = await sync_to_async(Library().get_list_of_books_rated_by_user)(request.user.username)
+        isbns = await get_popularity_recommendations_within_latency_budget(read_books)
+    return await get_rendered_recommendations(request, f"user:{recommendations.user_id}", recommendations.generation, isbns)
+
+
+async def recommendation_club_list(request, club_url_name):
+    """List of recommendation for a club, as precomputed by the precompute_recommendations command.
+    If Recommendations have not been precomputed yet, the most popular books are listed instead.
+    The database is accessed from the request's thread, and the recommender work from the recommendations thread pool,
+    so that serving the list does not block the other requests (when served with ASGI)."""
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return redirect_to_login(request.get_full_path())
+    recommendations = await sync_to_async(get_stored_club_recommendations)(club_url_name)
+    isbns = recommendations.recommendations
+    if len(isbns) == 0:
+        read_books = await sync_to_async(Library().get_list_of_books_rated_by_club)(club_url_name)
+        isbns = await get_popularity_recommendations_within_latency_budget(read_books)
+    return await get_rendered_recommendations(request, f"club:{recommendations.club_id}", recommendations.generation, isbns,
+                                              club_url_name=club_url_name)
@@ -0,0 +1,59 @@
+"""Cache of the rendered recommendation lists."""
+import asyncio
+import hashlib
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+
+class RecommendationsCache:
+    """Keep the rendered recommendation lists (the ordered Books and the rendered HTML fragment) in a Django cache
+    (setting "RECOMMENDATIONS_CACHE_ALIAS"), so that the Books are only fetched and the list only rendered once.
+
+    Each list is cached under a key made of its owner (user or club), the generation of the models the recommendations
+    have been computed from, and a checksum of the recommended ISBNs: recomputed recommendations (after their ratings changed
+    or the models have been retrained) are cached under a new key, and the previous entries simply expire.
+    Concurrent first requests of the same list only render it once: the first request takes a lock (an entry added to the cache),
+    the others wait for the rendered list to be cached, until the lock times out.
+    The cache is called through sync_to_async, as its (file, database or network) backends block.
+    """
+    lock_timeout = 10.0
+    poll_interval = 0.05
+
+    def get_cache(self):
+        return caches[settings.RECOMMENDATIONS_CACHE_ALIAS]
+
+    def get_key(self, owner, generation, isbns):
+        """Get the cache key of the list of the given ISBNs recommended to the owner (e.g. 'user:1' or 'club:1')."""
+        checksum = hashlib.sha1("\n".join(isbns).encode()).hexdigest()
+        return f"recommendations:{owner}:{generation}:{checksum}"
+
+    async def get_or_render(self, key, render):
+        """Get the rendered list cached under the key, or render it by awaiting render() and cache it."""
+        cache = self.get_cache()
+        rendered_list = await sync_to_async(cache.get)(key)
+        if rendered_list is not None:
+            return rendered_list
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_timeout
+        locked = await sync_to_async(cache.add)(lock_key, True, timeout=self.lock_timeout)
+        while not locked and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            rendered_list = await sync_to_async(cache.get)(key)
+            if rendered_list is not None:
+                return rendered_list
+            locked = await sync_to_async(cache.add)(lock_key, True, timeout=self.lock_timeout)
+        try:
+            rendered_list = await render()
+            await sync_to_async(cache.set)(key, rendered_list, timeout=settings.RECOMMENDATIONS_CACHE_TIMEOUT)
+            return rendered_list
+        finally:
+            if locked:
+                await sync_to_async(cache.delete)(lock_key)
+
+    def clear(self):
+        self.get_cache().clear()
+
+
+recommendations_cache = RecommendationsCache()
@@ -142,6 +142,31 @@ LOGIN_URL = 'login'
 
 REDIRECT_URL_WHEN_LOGGED_IN = 'home'
 
+# Number of threads running the recommender work of the (async) recommendation lists, and time (in seconds) after which
+# the recommendation lists stop waiting for the recommender and fall back to the most popular books
+RECOMMENDATIONS_THREAD_POOL_SIZE = 4
+RECOMMENDATIONS_LATENCY_BUDGET = 2.0
+# Seconds during which repeated invalidations of the recommendations of a user are coalesced
+RECOMMENDATIONS_INVALIDATION_WINDOW = 5.0
+# Cache of the rendered recommendation lists (seconds they are kept for); a FileBasedCache can be used instead of the
+# local-memory cache, so that all processes share the rendered lists
+RECOMMENDATIONS_CACHE_ALIAS = 'recommendations'
+RECOMMENDATIONS_CACHE_TIMEOUT = 3600
+# Whether the stored recommendations are computed by the hybrid recommender (scoring the item-based, content-based and
+# popularity candidates in a single pass), and its parameters (e.g. 'item_based_weight', 'content_based_weight', 'popularity_weight')
+RECOMMENDATIONS_USING_HYBRID_RECOMMENDER = False
+RECOMMENDATIONS_HYBRID_PARAMETERS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'recommendations': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recommendations',
+    },
+}
+
 AUTH_USER_MODEL = 'BookClub.User'
 
 # Activate django_heroku
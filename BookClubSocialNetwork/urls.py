@@ -161,7 +161,7 @@ urlpatterns = [
 
     # '''Async Views'''
     path('search/', views.SearchView.as_view(), name='async_search'),
-    path('user_recommendations/', views.RecommendationUserListView.as_view(), name='async_user_recommendations'),
-    path('club_recommendations/<str:club_url_name>/', views.RecommendationClubListView.as_view(), name='async_club_recommendations'),
+    path('user_recommendations/', views.recommendation_user_list, name='async_user_recommendations'),
+    path('club_recommendations/<str:club_url_name>/', views.recommendation_club_list, name='async_club_recommendations'),
 
 ]
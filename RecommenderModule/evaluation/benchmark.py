@@ -0,0 +1,199 @@
+from RecommenderModule.recommenders.item_based_recommender import ItemBasedRecommender
+from RecommenderModule.recommenders.content_based_recommender import ContentBasedRecommender
+from RecommenderModule.recommenders.popular_books_recommender import PopularBooksRecommender
+from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import ItemBasedCollaborativeFilteringMethods
+from RecommenderModule.recommenders.resources.content_based_recommender_methods import ContentBasedRecommenderMethods
+from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
+from RecommenderModule.recommenders.resources.data_provider import DataProvider
+from BookClub.models import Club
+from RecommenderModule.evaluation.resources.worker_processes import can_fork_worker_processes, run_in_forked_processes, shared_state
+from django.utils import timezone
+import numpy as np
+import platform
+import resource
+import tempfile
+import time
+import sys
+import os
+
+"""Benchmark the shared recommender on the shared trainset (run in a worker process)"""
+def benchmark_recommender_in_worker_process(arguments):
+    benchmark = shared_state["benchmark"]
+    return benchmark.benchmark_recommender(shared_state["trainset"], *arguments)
+
+"""This class measures the performance of the recommenders (rather than the quality of their recommendations, see Evaluator):
+    for each dataset size (number of ratings sampled from the dataset) and each recommender, the time to fit the recommender,
+    the size of its saved artifact (model files) and the time to load it, the latency of the recommendations of (up to)
+    {number_of_users} users and {number_of_clubs} clubs, and the peak resident memory (RSS) of the process.
+    If forking is available, each recommender is benchmarked in its own process, so that its peak RSS is not hidden by the others."""
+class RecommenderBenchmark:
+
+    recommender_names = ["item_based", "content_based", "popularity"]
+    dataset = None
+    min_ratings_threshold = 15
+    number_of_users = 1000
+    number_of_clubs = 100
+    seed = 0
+    isolated = True
+    print_status = True
+
+    def __init__(self, dataset=None, min_ratings_threshold=15, get_data_from_csv=False, number_of_users=1000, number_of_clubs=100,
+                 seed=0, isolated=True, print_status=True):
+        self.min_ratings_threshold = min_ratings_threshold
+        self.number_of_users = number_of_users
+        self.number_of_clubs = number_of_clubs
+        self.seed = seed
+        self.isolated = isolated
+        self.print_status = print_status
+        if dataset is None:
+            data_provider = DataProvider(get_data_from_csv=get_data_from_csv, filtering_min_ratings_threshold=min_ratings_threshold, print_status=print_status)
+            dataset = data_provider.get_filtered_ratings_dataset()
+        self.dataset = dataset
+
+    """Create a recommender of the given name, fitted on the trainset"""
+    def create_recommender(self, recommender_name, trainset):
+        parameters = self.get_parameters(recommender_name)
+        if recommender_name == "item_based":
+            return ItemBasedRecommender(trainset=trainset, parameters=parameters)
+        elif recommender_name == "content_based":
+            return ContentBasedRecommender(trainset=trainset, parameters=parameters)
+        elif recommender_name == "popularity":
+            return PopularBooksRecommender(print_status=False, trainset=trainset, parameters=parameters)
+        raise ValueError(f"Recommender {recommender_name} not supported.")
+
+    """Get the parameters the recommender of the given name is fitted with"""
+    def get_parameters(self, recommender_name):
+        if recommender_name == "popularity":
+            return {"min_ratings_threshold": self.min_ratings_threshold}
+        return {}
+
+    """Build the trainset of (up to) {dataset_size} ratings, sampled from the dataset (all ratings if dataset_size is None)"""
+    def build_trainset(self, dataset_size=None):
+        raw_ratings = self.dataset.raw_ratings
+        if dataset_size is not None and dataset_size < len(raw_ratings):
+            sampled_indices = np.sort(np.random.default_rng(self.seed).choice(len(raw_ratings), size=dataset_size, replace=False))
+            raw_ratings = [raw_ratings[index] for index in sampled_indices]
+        return self.dataset.construct_trainset(raw_ratings)
+
+    """Save the artifact (model files) of the fitted recommender into the given directory"""
+    def save_artifact(self, recommender_name, recommender, directory):
+        if recommender_name == "item_based":
+            recommender.item_based_methods.path_to_model = directory
+            recommender.item_based_methods.save_model()
+        elif recommender_name == "content_based":
+            recommender.content_based_methods.path_to_model = directory
+            recommender.content_based_methods.save_model()
+        elif recommender_name == "popularity":
+            recommender.popular_books_methods.path_to_popularity_lists = directory
+            recommender.popular_books_methods.save_all_popularity_lists()
+
+    """Load the artifact (model files) of the recommender of the given name from the given directory,
+        as the recommenders load their saved models when they are not retrained"""
+    def load_artifact(self, recommender_name, directory):
+        if recommender_name == "item_based":
+            methods = ItemBasedCollaborativeFilteringMethods.__new__(ItemBasedCollaborativeFilteringMethods)
+            methods.path_to_model = directory
+            methods.import_model()
+        elif recommender_name == "content_based":
+            methods = ContentBasedRecommenderMethods.__new__(ContentBasedRecommenderMethods)
+            methods.path_to_model = directory
+            methods.import_model()
+        elif recommender_name == "popularity":
+            methods = PopularBooksMethods.__new__(PopularBooksMethods)
+            methods.path_to_popularity_lists = directory
+            methods.import_trained_lists()
+        return methods
+
+    """Get the total size (in bytes) of the files in the given directory"""
+    def get_directory_size(self, directory):
+        return sum(os.path.getsize(os.path.join(path, file_name)) for path, directory_names, file_names in os.walk(directory) for file_name in file_names)
+
+    """Get the peak resident memory (RSS) of the current process, in megabytes"""
+    def get_peak_rss(self):
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin": # In bytes on macOS, in kilobytes elsewhere
+            return peak_rss / 2**20
+        return peak_rss / 2**10
+
+    """Call get_recommendations with each of the ids, and get the percentiles of the latencies (in milliseconds)"""
+    def measure_latencies(self, get_recommendations, ids):
+        if len(ids) == 0:
+            return None
+        latencies = []
+        for owner_id in ids:
+            start_time = time.perf_counter()
+            get_recommendations(owner_id)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+        return {"count": len(latencies), "mean": float(np.mean(latencies)), "p50": p50, "p95": p95, "p99": p99, "max": max(latencies)}
+
+    """Get the ids of (up to) {number_of_users} users of the trainset, sampled with the seed of the benchmark"""
+    def get_sampled_user_ids(self, trainset):
+        user_inner_ids = np.arange(trainset.n_users)
+        if len(user_inner_ids) > self.number_of_users:
+            user_inner_ids = np.sort(np.random.default_rng(self.seed).choice(user_inner_ids, size=self.number_of_users, replace=False))
+        return [trainset.to_raw_uid(int(user_inner_id)) for user_inner_id in user_inner_ids]
+
+    """Get the url names of (up to) {number_of_clubs} clubs (the members of the clubs are always taken from Django)"""
+    def get_club_url_names(self):
+        return list(Club.objects.order_by('pk').values_list('club_url_name', flat=True)[:self.number_of_clubs])
+
+    """Benchmark the recommender of the given name on the trainset; returns the dictionary of its measures"""
+    def benchmark_recommender(self, trainset, recommender_name, dataset_size=None):
+        start_time = time.perf_counter()
+        recommender = self.create_recommender(recommender_name, trainset)
+        fit_time = time.perf_counter() - start_time
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.save_artifact(recommender_name, recommender, directory)
+            artifact_size = self.get_directory_size(directory)
+            start_time = time.perf_counter()
+            self.load_artifact(recommender_name, directory)
+            artifact_load_time = time.perf_counter() - start_time
+
+        return {
+            "recommender": recommender_name,
+            "dataset_size": dataset_size,
+            "number_of_ratings": trainset.n_ratings,
+            "number_of_users": trainset.n_users,
+            "number_of_books": trainset.n_items,
+            "fit_time_seconds": fit_time,
+            "artifact_size_bytes": artifact_size,
+            "artifact_load_time_seconds": artifact_load_time,
+            "user_latency_ms": self.measure_latencies(recommender.get_user_recommendations, self.get_sampled_user_ids(trainset)),
+            "club_latency_ms": self.measure_latencies(recommender.get_club_recommendations, self.get_club_url_names()),
+            "peak_rss_mb": self.get_peak_rss()
+        }
+
+    """Check whether each recommender can be benchmarked in its own (forked) process"""
+    def can_use_worker_processes(self):
+        return self.isolated and can_fork_worker_processes()
+
+    """Benchmark the recommender of the given name on the trainset, in its own forked process if possible"""
+    def run_benchmark(self, trainset, recommender_name, dataset_size=None):
+        if not self.can_use_worker_processes():
+            return self.benchmark_recommender(trainset, recommender_name, dataset_size)
+        return run_in_forked_processes(benchmark_recommender_in_worker_process, [(recommender_name, dataset_size)],
+                                       {"benchmark": self, "trainset": trainset}, 1)[0]
+
+    """Benchmark all the given recommenders on each of the dataset sizes (numbers of ratings, None for all ratings; all ratings by default);
+        returns the report of the benchmark, as a JSON-serialisable dictionary"""
+    def run_benchmarks(self, recommender_names=None, dataset_sizes=None):
+        if recommender_names is None:
+            recommender_names = self.recommender_names
+        if dataset_sizes is None:
+            dataset_sizes = [None]
+        results = []
+        for dataset_size in dataset_sizes:
+            trainset = self.build_trainset(dataset_size)
+            for recommender_name in recommender_names:
+                if self.print_status:
+                    print(f"Benchmarking {recommender_name} recommender on {trainset.n_ratings} ratings...", file=sys.stderr)
+                results.append(self.run_benchmark(trainset, recommender_name, dataset_size))
+        return {
+            "created_on": timezone.now().isoformat(),
+            "environment": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+            "parameters": {"recommenders": list(recommender_names), "dataset_sizes": list(dataset_sizes), "min_ratings_threshold": self.min_ratings_threshold,
+                           "number_of_users": self.number_of_users, "number_of_clubs": self.number_of_clubs, "seed": self.seed, "isolated": self.can_use_worker_processes()},
+            "results": results
+        }
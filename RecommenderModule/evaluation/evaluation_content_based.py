@@ -6,10 +6,11 @@ from RecommenderModule.evaluation.evaluator import Evaluator
     for the app's content-based recommender."""
 class EvaluationContentBased:
 
-    """Evaluate the possible content-based recommenders and print the insights."""
-    def run_evaluations(self):
+    """Evaluate the possible content-based recommenders and print the insights,
+        evaluating up to {number_of_workers} combinations of parameters concurrently."""
+    def run_evaluations(self, number_of_workers=1):
 
-        evaluator = Evaluator()
+        evaluator = Evaluator(number_of_workers=number_of_workers)
         parameters_to_evaluate = {
             'using_publication_year': [True, False],
         }
@@ -6,10 +6,11 @@ from RecommenderModule.evaluation.evaluator import Evaluator
     for the app's item-based recommender."""
 class EvaluationItemBased:
 
-    """Evaluate the possible item-based recommenders and print the insights."""
-    def run_evaluations(self):
+    """Evaluate the possible item-based recommenders and print the insights,
+        evaluating up to {number_of_workers} combinations of parameters concurrently."""
+    def run_evaluations(self, number_of_workers=1):
 
-        evaluator = Evaluator()
+        evaluator = Evaluator(number_of_workers=number_of_workers)
         parameters_to_evaluate = {
             'min_support': [1, 2, 5, 7, 8],
             'model_function_name': ['cosine', 'msd', 'pearson', 'pearson_baseline']
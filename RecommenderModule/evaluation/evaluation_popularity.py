@@ -18,10 +18,11 @@ class EvaluationPopularity:
     def __init__(self, min_ratings_threshold=300):
         self.min_ratings_threshold = min_ratings_threshold
 
-    """Evaluate the possible popularity recommenders and print the insights."""
-    def run_evaluations(self):
+    """Evaluate the possible popularity recommenders and print the insights,
+        evaluating up to {number_of_workers} combinations of parameters concurrently."""
+    def run_evaluations(self, number_of_workers=1):
 
-        evaluator = Evaluator()
+        evaluator = Evaluator(number_of_workers=number_of_workers)
         parameters_to_evaluate = {
             'min_ratings_threshold': [100, 200, 300],
             'ranking_method': ['average', 'median', 'combination']
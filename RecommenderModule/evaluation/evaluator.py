@@ -1,16 +1,34 @@
 from RecommenderModule.evaluation.resources.evaluation_metrics import EvaluationMetrics
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
 from RecommenderModule.evaluation.resources.evaluation_data_provider import EvaluationDataProvider
+from RecommenderModule.evaluation.resources.worker_processes import can_fork_worker_processes, run_in_forked_processes, shared_state
 import itertools as it
+import time
+
+"""Get the recommendations of the shared (fitted) recommender for the given shard of users (run in a worker process)"""
+def get_recommendations_for_users_shard(user_ids):
+    return shared_state["recommender"].get_user_recommendations_batch(user_ids)
+
+"""Fit the shared recommender with the given parameters, and evaluate it (run in a worker process)"""
+def evaluate_combination(combination):
+    evaluator = shared_state["evaluator"]
+    start_time = time.perf_counter()
+    recommender = shared_state["recommender"]
+    recommendations = evaluator.get_recommendations(recommender, combination)
+    evaluations = evaluator.compute_evaluations(recommendations, recommender)
+    return evaluations, time.perf_counter() - start_time
 
 """This class allows the developer to evaluate recommenders, using the same train and test sets"""
 class Evaluator:
 
     trainset = None
-    testset = []
+    testset = None
     evaluation_metrics = None
+    number_of_workers = 1
 
-    def __init__(self, min_ratings_threshold=None, print_status=True):
+    def __init__(self, min_ratings_threshold=None, print_status=True, number_of_workers=1, trainset=None, testset=None):
+        self.number_of_workers = number_of_workers
+        self.trainset, self.testset = trainset, [] if testset is None else testset
         self.trainset, self.testset = self.get_train_test_datasets(min_ratings_threshold, print_status)
         self.evaluation_metrics = EvaluationMetrics(self.trainset, self.testset)
 
@@ -30,50 +48,100 @@ class Evaluator:
 
 
     """Evaluate the recommender for all possible combinations of parameters, from the parameters_dict argument
-        (parameters_dict contains the parameter name as key and a list of its possible values as value)"""
+        (parameters_dict contains the parameter name as key and a list of its possible values as value);
+        with several workers, the combinations are evaluated concurrently, each one in its own process.
+        Returns the list of (combination, evaluations, wall time in seconds) of all combinations."""
     def evaluate_all_combinations(self, recommender, parameters_dict):
         all_combinations = self.make_combinations_from_dict(parameters_dict)
+        if self.can_use_worker_processes(len(all_combinations)):
+            return self.evaluate_combinations_concurrently(recommender, all_combinations)
+        results = []
         for combination in all_combinations:
-            self.evaluate_single_recommender(recommender, combination)
+            results.append(self.evaluate_single_recommender(recommender, combination))
+        return results
 
 
-    """Evaluate the recommender, using the given set of parameters"""
+    """Evaluate the recommender, using the given set of parameters;
+        returns the tuple (parameters, evaluations, wall time in seconds)"""
     def evaluate_single_recommender(self, recommender, parameters={}):
         print(f"\nEvaluating recommender with parameters: {parameters}")
-        recommendations = self.get_recommendations(recommender, parameters)
-        self.evaluate(recommendations, recommender)  # also calls print_evaluations
-
-
-    """Get a dictionary of the recommended books for all users in the trainset"""
-    def get_recommendations(self, recommender, parameters):
+        start_time = time.perf_counter()
+        recommendations = self.get_recommendations(recommender, parameters, shard_users=True)
+        evaluations = self.evaluate(recommendations, recommender)  # also calls print_evaluations
+        wall_time = time.perf_counter() - start_time
+        print(f"Wall time: {wall_time:.2f}s")
+        return (parameters, evaluations, wall_time)
+
+
+    """Evaluate all combinations of parameters concurrently, in {number_of_workers} forked processes
+        sharing the trainset, and print the evaluations of each combination in order"""
+    def evaluate_combinations_concurrently(self, recommender, all_combinations):
+        print(f"\nEvaluating {len(all_combinations)} combinations of parameters, using {self.number_of_workers} processes...")
+        results = []
+        for combination, (evaluations, wall_time) in zip(all_combinations, self.run_in_worker_processes(evaluate_combination, all_combinations, recommender)):
+            print(f"\nEvaluated recommender with parameters: {combination}")
+            self.print_evaluations(evaluations)
+            print(f"Wall time: {wall_time:.2f}s")
+            results.append((combination, evaluations, wall_time))
+        return results
+
+
+    """Get a dictionary of the recommended books for all users in the trainset;
+        if shard_users is True and several workers are available, users are split in shards that are processed concurrently"""
+    def get_recommendations(self, recommender, parameters, shard_users=False):
         print("Getting recommendations...")
         recommender.fit(trainset=self.trainset, parameters=parameters)
-        recommendations = {}
-        nb_users = self.trainset.n_users
-        for user_inner_id in self.trainset.all_users():
-            if user_inner_id % 5000 == 0:
-                print(f"{user_inner_id} / {nb_users}")
-            user_id = self.trainset.to_raw_uid(user_inner_id)
-            user_recommendations = recommender.get_user_recommendations(user_id)
-            recommendations[user_id] = user_recommendations
+        user_ids = [self.trainset.to_raw_uid(user_inner_id) for user_inner_id in self.trainset.all_users()]
+        if shard_users and self.can_use_worker_processes(len(user_ids)):
+            shard_size = -(-len(user_ids) // (self.number_of_workers * 4))
+            shards = [user_ids[start:start + shard_size] for start in range(0, len(user_ids), shard_size)]
+            recommendations = {}
+            for shard_recommendations in self.run_in_worker_processes(get_recommendations_for_users_shard, shards, recommender):
+                recommendations.update(shard_recommendations)
+        else:
+            recommendations = {}
+            nb_users = len(user_ids)
+            for start in range(0, nb_users, 5000):
+                print(f"{start} / {nb_users}")
+                recommendations.update(recommender.get_user_recommendations_batch(user_ids[start:start + 5000]))
         print("Getting recommendations done")
         return recommendations
 
 
+    """Check whether the work can be split between several worker processes
+        (forking is required, so that the workers share the trainset instead of copying it)"""
+    def can_use_worker_processes(self, number_of_tasks):
+        return self.number_of_workers > 1 and number_of_tasks > 1 and can_fork_worker_processes()
+
+
+    """Run the function on each of the arguments in {number_of_workers} forked processes, and return the results in order"""
+    def run_in_worker_processes(self, function, arguments_list, recommender):
+        return run_in_forked_processes(function, arguments_list, {"evaluator": self, "recommender": recommender}, self.number_of_workers)
+
+
     """Compute all evaluations for the given recommendations/recommender, 
         and then print them through the print_evaluations() method."""
     def evaluate(self, recommendations, recommender):
+        evaluations = self.compute_evaluations(recommendations, recommender)
+        self.print_evaluations(evaluations)
+        return evaluations
+
+
+    """Compute all evaluations for the given recommendations/recommender
+        (the metrics depending on the recommendations are computed in a single pass over the test set)"""
+    def compute_evaluations(self, recommendations, recommender):
+        metrics = self.evaluation_metrics.get_all_metrics(recommendations)
         evaluations = {
-            "Hit Rate (Recall)": self.evaluation_metrics.get_hit_rate(recommendations),
-            "Average Reciprocal Hit Rate": self.evaluation_metrics.get_average_reciprocal_hit_rate(recommendations),
-            "Precision": self.evaluation_metrics.get_precision(recommendations),
-            "F1 Score": self.evaluation_metrics.get_f1_score(recommendations),
-            "Novelty": self.evaluation_metrics.get_novelty(recommendations),
-            "Recommendation-Eligible Users Rate": self.evaluation_metrics.get_recommendation_eligible_users_rate(recommendations),
-            "User Coverage": self.evaluation_metrics.get_user_coverage(recommendations),
+            "Hit Rate (Recall)": metrics["hit_rate"],
+            "Average Reciprocal Hit Rate": metrics["average_reciprocal_hit_rate"],
+            "Precision": metrics["precision"],
+            "F1 Score": metrics["f1_score"],
+            "Novelty": metrics["novelty"],
+            "Recommendation-Eligible Users Rate": metrics["recommendation_eligible_users_rate"],
+            "User Coverage": metrics["user_coverage"],
             "Book Coverage": self.evaluation_metrics.get_book_coverage(recommender),
         }
-        self.print_evaluations(evaluations)
+        return evaluations
 
 
     """Print the results of the evaluation of the recommender system"""
@@ -1,10 +1,11 @@
-from collections import Counter
+import numpy as np
 
 class EvaluationMetrics:
 
     trainset = None
     testset = []
     popularity_list = []
+    popularity_ranks = {}
 
     def __init__(self, trainset, testset):
         self.trainset = trainset
@@ -13,143 +14,143 @@ class EvaluationMetrics:
 
 
     """Make a list of all books in the given trainset, sorted from the book with the most ratings to the one with the 
-    fewest ratings (descending order)."""
+    fewest ratings (descending order), and the map of each book to its popularity rank (1 for the most read book).
+    Books with the same number of ratings are sorted by order of first appearance in the trainset's ratings."""
     def compute_list_books_sorted_by_most_read(self):
-        all_book_occurrences = []
-        for user_inner_id, item_inner_id, rating in self.trainset.all_ratings():
-            all_book_occurrences.append(self.trainset.to_raw_iid(item_inner_id))
-        counter = Counter(all_book_occurrences)
-        sorted_books = sorted(counter.items(), key=lambda item: item[1], reverse=True)
-        self.popularity_list = [pair[0] for pair in sorted_books]
-
+        rated_items = np.fromiter((item_inner_id for user_inner_id in self.trainset.all_users() for item_inner_id, rating in self.trainset.ur[user_inner_id]), dtype=np.int64)
+        unique_items, first_appearances, counts = np.unique(rated_items, return_index=True, return_counts=True)
+        sorted_items = unique_items[np.lexsort((first_appearances, -counts))]
+        self.popularity_list = [self.trainset.to_raw_iid(int(item_inner_id)) for item_inner_id in sorted_items]
+        self.popularity_ranks = {book_isbn: rank for rank, book_isbn in enumerate(self.popularity_list, start=1)}
+
+
+    """Map each user's recommended books to their rank in the user's recommendations (1 for the first recommended book);
+        if a book is recommended more than once, its first rank is kept."""
+    def get_recommendation_ranks(self, recommendations):
+        recommendation_ranks = {}
+        for user_id, user_recommendations in recommendations.items():
+            user_ranks = {}
+            for rank, book_isbn in enumerate(user_recommendations, start=1):
+                user_ranks.setdefault(book_isbn, rank)
+            recommendation_ranks[user_id] = user_ranks
+        return recommendation_ranks
+
+
+    """Count the hits of the recommendations in the left-out LOOCV test set; returns the number of hits,
+        the sum of their reciprocal ranks in the recommendations, and the set of users having at least one hit."""
+    def count_hits(self, recommendations):
+        recommendation_ranks = self.get_recommendation_ranks(recommendations)
+        hits = 0
+        reciprocal_hits = 0
+        good_recommendation_users = set()
+        for user_id, book_id, rating in self.testset:
+            user_ranks = recommendation_ranks.get(user_id)
+            if user_ranks is None:
+                continue
+            rank = user_ranks.get(book_id)
+            if rank is not None:
+                # The hit is weighted by the rank of the book in the recommendations for the reciprocal hit-rate
+                hits += 1
+                reciprocal_hits += (1/rank)
+                good_recommendation_users.add(user_id)
+        return hits, reciprocal_hits, good_recommendation_users
+
+
+    """Get the total number of recommended books, over all users"""
+    def get_number_of_recommendations(self, recommendations):
+        return sum(len(user_recommendations) for user_recommendations in recommendations.values())
+
+
+    """Get the sum of the popularity ranks of all recommended books
+        (books not in the popularity list are considered as ranked last)"""
+    def get_popularity_ranks_sum(self, recommendations):
+        unknown_book_rank = len(self.popularity_list) + 1
+        return sum(self.popularity_ranks.get(isbn, unknown_book_rank) for user_recommendations in recommendations.values() for isbn in user_recommendations)
+
+
+    """Get the precision, given the number of hits and the number of recommended books"""
+    def compute_precision(self, hits, number_of_recommendations):
+        return hits / number_of_recommendations if number_of_recommendations > 0 else 0
+
+
+    """Get the F1 score, given the precision and the hit-rate (recall)"""
+    def compute_f1_score(self, precision, hit_rate):
+        return 2 * (precision * hit_rate) / (precision + hit_rate) if precision + hit_rate > 0 else 0
+
+
+    """Compute all metrics depending on the recommendations produced from the dataset's LOOCV train set,
+        in a single pass over the left-out LOOCV test set; returns a dictionary containing the value of each metric.
+        The get_<metric> methods below only compute what their metric needs."""
+    def get_all_metrics(self, recommendations):
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        number_of_recommendations = self.get_number_of_recommendations(recommendations)
+        hit_rate = hits / len(self.testset)
+        precision = self.compute_precision(hits, number_of_recommendations)
+        return {
+            "hit_rate": hit_rate,
+            "average_reciprocal_hit_rate": reciprocal_hits / len(self.testset),
+            "precision": precision,
+            "f1_score": self.compute_f1_score(precision, hit_rate),
+            "novelty": self.get_novelty(recommendations),
+            "recommendation_eligible_users_rate": self.get_recommendation_eligible_users_rate(recommendations),
+            "user_coverage": len(good_recommendation_users) / len(recommendations),
+        }
 
 
     """Get the hit-rate of an algorithm, given the recommendations produced from
         the dataset's LOOCV train set and the left-out LOOCV test set."""
     def get_hit_rate(self, recommendations):
-        hits = 0
-        total = len(self.testset)
-
-        for user_id, book_id, rating in self.testset:
-
-            # We increment the number of hits if the book has been recommended to the user
-            try:
-                if book_id in recommendations[user_id]:
-                    hits += 1
-            except:
-                pass
-
-        return hits / total
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        return hits / len(self.testset)
 
 
     """Get the average reciprocal (weighted) hit-rate of an algorithm, given the
         recommendations produced from the dataset's LOOCV train set and the
         left-out LOOCV test set."""
     def get_average_reciprocal_hit_rate(self, recommendations):
-        hits = 0
-        total = len(self.testset)
-
-        for user_id, book_id, rating in self.testset:
-
-            try:
-
-                # We increment the value of 'hits' if the book has been recommended to the user,
-                # with a weighting corresponding to its rank in the recommendations
-                rank = 1
-                for recommended_book in recommendations[user_id]:
-                    if book_id == recommended_book:
-                        hits += (1/rank)
-                        break
-                    rank += 1
-
-            except:
-                pass
-
-        return hits / total
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        return reciprocal_hits / len(self.testset)
 
 
     """Get the novelty (mean popularity rank of recommended items) of an algorithm,
         given the recommendations produced from the dataset's LOOCV train set and
         the train set itself."""
     def get_novelty(self, recommendations):
-
-        sum = 0
-        total = 0
-
-        for (user_id, recommended_books) in recommendations.items():
-            for isbn in recommended_books:
-                try:
-                    sum += self.popularity_list.index(isbn) + 1 # We add 1 to account for the fact that the first book in the list has index 0
-                except: # The book is not in the popularity list, we consider its index as the last index of the list + 1
-                    sum += len(self.popularity_list) + 1 # We add 1 to account for the fact that the first book in the list has index 0
-                total += 1
-
-        if total == 0:
+        number_of_recommendations = self.get_number_of_recommendations(recommendations)
+        if number_of_recommendations == 0:
             return 0
-        return sum / total
+        return self.get_popularity_ranks_sum(recommendations) / number_of_recommendations
 
     """Get the percentage of correct recommendations ('true positives') of an algorithm, given the recommendations produced 
         from the dataset's LOOCV train set and the left-out LOOCV test set.
         The rate is calculated as the number of recommended books that are correctly part of the testset
         out of the total number of books recommended."""
     def get_precision(self, recommendations):
-
-        hits = 0
-        total = 0
-
-        for user in recommendations.keys():
-            user_recommendations = recommendations[user]
-            total += len(user_recommendations)
-
-        for user_id, book_id, rating in self.testset:
-
-            # We increment the number of hits if the book has been recommended to the user
-            try:
-                if book_id in recommendations[user_id]:
-                    hits += 1
-            except:
-                pass
-
-        if total == 0:
-            return 0
-        return hits / total
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        return self.compute_precision(hits, self.get_number_of_recommendations(recommendations))
 
 
     """Get the percentage of users that can get recommendations using the evaluated recommender algorithm,
         given the recommendations produced from the dataset's LOOCV train set and the left-out LOOCV test set.
         The rate is calculated as the number of users given recommendations divided by the total number of users in the testset."""
     def get_recommendation_eligible_users_rate(self, recommendations):
-        eligible_users_number = len([(user, user_recommendations) for (user, user_recommendations) in recommendations.items() if user_recommendations != []])
-        all_users_number = self.trainset.n_users
-        return eligible_users_number / all_users_number
+        eligible_users_number = sum(1 for user_recommendations in recommendations.values() if user_recommendations != [])
+        return eligible_users_number / self.trainset.n_users
 
 
     """Get the percentage of users having at least 1 'good' recommendation.
         given the recommendations produced from the dataset's LOOCV train set and the left-out LOOCV test set."""
     def get_user_coverage(self, recommendations):
-
-        users_number = len(recommendations)
-
-        good_recommendation_users = set()
-        for user_id, book_id, rating in self.testset:
-
-            # We add the user to good_recommendation_users if the book has been recommended to the user
-            try:
-                if book_id in recommendations[user_id]:
-                    good_recommendation_users.add(user_id)
-            except:
-                pass
-
-        return len(good_recommendation_users) / users_number
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        return len(good_recommendation_users) / len(recommendations)
 
 
     """Get F1 score (harmonic mean of precision and recall),
         given the recommendations produced from the dataset's LOOCV train set and the left-out LOOCV test set."""
     def get_f1_score(self, recommendations):
-        precision = self.get_precision(recommendations)
-        recall = self.get_hit_rate(recommendations)
-        f1_score = 2 * (precision * recall) / (precision + recall)
-        return f1_score
+        hits, reciprocal_hits, good_recommendation_users = self.count_hits(recommendations)
+        precision = self.compute_precision(hits, self.get_number_of_recommendations(recommendations))
+        return self.compute_f1_score(precision, hits / len(self.testset))
 
     """Get coverage of the recommender (percentage of books that can be recommended to users),
         given an instance of a recommender."""
@@ -0,0 +1,21 @@
+from django.db import connections
+import multiprocessing
+
+"""State shared with the worker processes: it is set before the processes are forked, so that the workers
+    inherit its values (e.g. the trainset and the recommender) copy-on-write, instead of receiving pickled copies"""
+shared_state = {}
+
+"""Check whether worker processes can be forked (so that they share the state instead of copying it)"""
+def can_fork_worker_processes():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+"""Run the function on each of the arguments in (up to) {number_of_processes} forked processes, which can read the given state
+    from shared_state, and return the results in order"""
+def run_in_forked_processes(function, arguments_list, state, number_of_processes):
+    shared_state.update(state)
+    connections.close_all() # Database connections must not be shared with the forked processes
+    try:
+        with multiprocessing.get_context("fork").Pool(min(number_of_processes, len(arguments_list))) as pool:
+            return pool.map(function, arguments_list, chunksize=1)
+    finally:
+        shared_state.clear()
@@ -1,33 +1,109 @@
 from RecommenderModule.recommenders.popular_books_recommender import PopularBooksRecommender
 from RecommenderModule.recommenders.item_based_recommender import ItemBasedRecommender
 from RecommenderModule.recommenders.content_based_recommender import ContentBasedRecommender
+from RecommenderModule.recommenders.hybrid_recommender import HybridRecommender
+from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
+from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import ItemBasedCollaborativeFilteringMethods
+from RecommenderModule.recommenders.resources.content_based_recommender_methods import ContentBasedRecommenderMethods
+from RecommenderModule.recommenders.resources.model_registry import model_registry
 from RecommenderModule.recommenders.resources.library import Library
 from BookClub.models.recommendations import UserRecommendations, ClubRecommendations
+from django.db.models import F, Max, Q
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+
+"""Load the popularity recommender from its trained popularity lists"""
+def load_popularity_recommender():
+    popularity_recommender = PopularBooksRecommender()
+    popularity_recommender.popular_books_methods = PopularBooksMethods(print_status=False)
+    return popularity_recommender
+
+model_registry.register("popularity", load_popularity_recommender, [
+    f"{PopularBooksMethods.path_to_popularity_lists}/sorted_average_ratings.sav",
+    f"{PopularBooksMethods.path_to_popularity_lists}/sorted_median_ratings.sav",
+    f"{PopularBooksMethods.path_to_popularity_lists}/sorted_combination_scores.sav"
+], generation_file_path=f"{PopularBooksMethods.path_to_popularity_lists}/generation.txt")
+model_registry.register("item_based", ItemBasedRecommender, [
+    f"{ItemBasedCollaborativeFilteringMethods.path_to_model}/similarities_matrix.npy",
+    f"{ItemBasedCollaborativeFilteringMethods.path_to_model}/raw_item_ids.npy"
+], generation_file_path=f"{ItemBasedCollaborativeFilteringMethods.path_to_model}/generation.txt")
+model_registry.register("content_based", ContentBasedRecommender, [
+    f"{ContentBasedRecommenderMethods.path_to_model}/neighbours_model.npz"
+], generation_file_path=f"{ContentBasedRecommenderMethods.path_to_model}/generation.txt")
+
+# The recommenders whose models are used to compute the stored user and club recommendations
+recommendations_recommender_names = ["item_based", "popularity"]
+# The recommenders combined by the hybrid recommender (setting "RECOMMENDATIONS_USING_HYBRID_RECOMMENDER")
+hybrid_recommender_names = ["item_based", "content_based", "popularity"]
+# The hybrid recommender built from the loaded recommenders, and the recommenders it has been built from
+hybrid_recommender_cache = {"hybrid_recommender": None, "recommenders": None}
+
+"""Get the names of the recommenders whose models are used to compute the stored user and club recommendations"""
+def get_recommendations_recommender_names():
+    if settings.RECOMMENDATIONS_USING_HYBRID_RECOMMENDER:
+        return hybrid_recommender_names
+    return recommendations_recommender_names
+
+"""Get the hybrid recommender combining the loaded item-based, content-based and popularity recommenders (loading them if needed),
+    with the weights of setting "RECOMMENDATIONS_HYBRID_PARAMETERS"; it is only rebuilt once one of the recommenders has been reloaded or retrained"""
+def get_hybrid_recommender():
+    recommenders = [model_registry.get(name) for name in hybrid_recommender_names]
+    cached_recommenders = hybrid_recommender_cache["recommenders"]
+    if cached_recommenders is None or any(recommender is not cached_recommender for recommender, cached_recommender in zip(recommenders, cached_recommenders)):
+        hybrid_recommender_cache["hybrid_recommender"] = HybridRecommender(*recommenders, parameters=settings.RECOMMENDATIONS_HYBRID_PARAMETERS)
+        hybrid_recommender_cache["recommenders"] = recommenders
+    return hybrid_recommender_cache["hybrid_recommender"]
 
 """Get the 10 most popular books recommended to the user (that the user has not read yet).
     Returns a list of ISBN numbers."""
 def get_user_popularity_recommendations(user_id):
-    popularity_recommender = PopularBooksRecommender()
+    popularity_recommender = model_registry.get("popularity")
     recommended_books = popularity_recommender.get_user_recommendations(user_id)
     return recommended_books
 
 """Get the 10 most popular books recommended to the club (that no member has read yet).
     Returns a list of ISBN numbers."""
 def get_club_popularity_recommendations(club_url_name):
-    popularity_recommender = PopularBooksRecommender()
+    popularity_recommender = model_registry.get("popularity")
     recommended_books = popularity_recommender.get_club_recommendations(club_url_name)
     return recommended_books
 
+"""Get the 10 most popular books that are not in the given list of read books (ISBN numbers), e.g. the books read by a user
+    fetched beforehand, so that no database query is needed.
+    Returns a list of ISBN numbers."""
+def get_popularity_recommendations_from_read_books(read_books):
+    popularity_recommender = model_registry.get("popularity")
+    return popularity_recommender.get_recommendations_from_read_books(read_books)
+
+"""Get the 10 most popular books that are not in the given list of read books (ISBN numbers), without waiting for the
+    popularity recommender to be loaded. Returns a list of ISBN numbers (empty if the popularity recommender is not loaded yet)."""
+def get_loaded_popularity_recommendations_from_read_books(read_books):
+    popularity_recommender = model_registry.get_loaded("popularity")
+    if popularity_recommender is None:
+        return []
+    return popularity_recommender.get_recommendations_from_read_books(read_books)
+
 """Retrain the popularity recommender with the current data."""
 def retrain_popularity_recommender(min_ratings_threshold=300):
     popularity_recommender = PopularBooksRecommender()
     popularity_recommender.fit_and_save(parameters={"min_ratings_threshold": min_ratings_threshold, 'ranking_method': 'combination'})
-    update_all_recommendations()
+    model_registry.bump_model_generation("popularity")
+    model_registry.set("popularity", popularity_recommender)
+
+"""Refresh the popularity lists of the popularity recommender from the books' rating statistics
+    (kept up to date whenever a review is saved or deleted), without retraining it from all ratings."""
+def refresh_popularity_recommender(min_ratings_threshold=300):
+    popularity_recommender = PopularBooksRecommender()
+    popularity_recommender.popular_books_methods = PopularBooksMethods(parameters={"min_ratings_threshold": min_ratings_threshold, 'ranking_method': 'combination'},
+                                                                       retraining_and_saving=True, from_rating_statistics=True, print_status=False)
+    model_registry.bump_model_generation("popularity")
+    model_registry.set("popularity", popularity_recommender)
 
 """Get (up to) 10 book recommendations, from books the user has rated.
     Returns a list of ISBN numbers."""
 def get_user_personalised_recommendations(user_id):
-    item_based_recommender = ItemBasedRecommender()
+    item_based_recommender = model_registry.get("item_based")
     recommended_books = item_based_recommender.get_user_recommendations(user_id)
     return recommended_books
 
@@ -35,16 +111,84 @@ def get_user_personalised_recommendations(user_id):
     The number of members having read the same book adds weighting in the recommendations.
     Returns a list of ISBN numbers."""
 def get_club_personalised_recommendations(club_url_name):
-    item_based_recommender = ItemBasedRecommender()
+    item_based_recommender = model_registry.get("item_based")
     recommended_books = item_based_recommender.get_club_recommendations(club_url_name)
     return recommended_books
 
+"""Get (up to) 10 book recommendations from the hybrid recommender, fetching the ratings of the user once: the books are scored
+    from the item-based, content-based and popularity recommenders at once, or ranked by popularity only if there are less than 3
+    personalised recommendations. Returns a list of ISBN numbers."""
+def get_user_hybrid_recommendations(user_id):
+    return get_hybrid_recommender().get_user_recommendations(user_id)
+
+"""Get (up to) 10 book recommendations from the hybrid recommender, fetching the ratings of the members of the club once.
+    Returns a list of ISBN numbers."""
+def get_club_hybrid_recommendations(club_url_name):
+    return get_hybrid_recommender().get_club_recommendations(club_url_name)
+
+"""Get (up to) 10 book recommendations for each of the specified users, scoring all users at once; users with less than 3
+    personalised recommendations get the most popular books instead (in the same pass, if using the hybrid recommender).
+    Returns a dictionary containing the list of ISBN numbers recommended to each user."""
+def get_user_recommendations_batch(user_ids):
+    if settings.RECOMMENDATIONS_USING_HYBRID_RECOMMENDER:
+        return get_hybrid_recommender().get_user_recommendations_batch(user_ids)
+    item_based_recommender = model_registry.get("item_based")
+    recommendations = item_based_recommender.get_user_recommendations_batch(user_ids)
+    users_without_recommendations = [user_id for user_id in user_ids if len(recommendations.get(user_id, [])) < 3]
+    if len(users_without_recommendations) > 0:
+        popularity_recommender = model_registry.get("popularity")
+        recommendations.update(popularity_recommender.get_user_recommendations_batch(users_without_recommendations))
+    return recommendations
+
+"""Get (up to) 10 book recommendations for each of the specified clubs, scoring all clubs at once; clubs with less than 3
+    personalised recommendations get the most popular books instead (in the same pass, if using the hybrid recommender).
+    Returns a dictionary containing the list of ISBN numbers recommended to each club."""
+def get_club_recommendations_batch(club_url_names):
+    if settings.RECOMMENDATIONS_USING_HYBRID_RECOMMENDER:
+        return get_hybrid_recommender().get_club_recommendations_batch(club_url_names)
+    item_based_recommender = model_registry.get("item_based")
+    recommendations = item_based_recommender.get_club_recommendations_batch(club_url_names)
+    clubs_without_recommendations = [club_url_name for club_url_name in club_url_names if len(recommendations.get(club_url_name, [])) < 3]
+    if len(clubs_without_recommendations) > 0:
+        popularity_recommender = model_registry.get("popularity")
+        recommendations.update(popularity_recommender.get_club_recommendations_batch(clubs_without_recommendations))
+    return recommendations
+
 """Retrain the item-based recommender with the current data;
     parameters may contain a value for 'min_ratings_threshold', 'min_support' and 'model_function_name' """
 def retrain_item_based_recommender(parameters={}):
     item_based_recommender = ItemBasedRecommender()
     item_based_recommender.fit_and_save(parameters=parameters)
-    update_all_recommendations()
+    model_registry.bump_model_generation("item_based")
+    model_registry.set("item_based", item_based_recommender)
+
+"""Update the item-based recommender with a batch of new, changed or deleted ratings, as a list of (user_id, book_isbn, rating)
+    tuples (rating being None for a deleted rating), without retraining it; only the similarities of the books whose ratings
+    changed are recomputed. The updated recommender replaces the shared one at once, which keeps serving recommendations meanwhile.
+    The recommender is retrained instead if its similarity can not be updated incrementally."""
+def update_item_based_recommender(ratings_changes):
+    item_based_recommender = model_registry.get("item_based")
+    if not item_based_recommender.item_based_methods.can_update_ratings():
+        retrain_item_based_recommender(parameters={
+            'min_ratings_threshold': item_based_recommender.item_based_methods.min_ratings_threshold,
+            'min_support': item_based_recommender.item_based_methods.min_support,
+            'model_function_name': item_based_recommender.item_based_methods.model_function_name
+        })
+        return
+    updated_item_based_recommender = item_based_recommender.get_updated_recommender(ratings_changes, save=True)
+    model_registry.bump_model_generation("item_based")
+    model_registry.set("item_based", updated_item_based_recommender)
+
+"""Update the item-based recommender with the ratings created, changed or deleted in the database since it was trained (or last updated),
+    if its similarity can be updated incrementally; returns the number of ratings changes applied"""
+def update_item_based_recommender_from_database():
+    item_based_recommender = model_registry.get("item_based")
+    if not item_based_recommender.item_based_methods.can_update_ratings():
+        return 0
+    ratings_changes = item_based_recommender.item_based_methods.get_ratings_changes_from_django_database()
+    if len(ratings_changes) > 0:
+        update_item_based_recommender(ratings_changes)
+    return len(ratings_changes)
 
 """Get the ISBN value of all books in the item-based trainset"""
 def get_list_of_all_books_in_item_based_trainset():
@@ -55,15 +199,79 @@ def get_list_of_all_books_in_item_based_trainset():
 def retrain_content_based_recommender():
     content_based_recommender = ContentBasedRecommender()
     content_based_recommender.fit_and_save()
-    update_all_recommendations()
+    model_registry.bump_model_generation("content_based")
+    model_registry.set("content_based", content_based_recommender)
 
-"""Force the system to update all user and club recommendations with the newly trained recommenders"""
+"""Force the system to update all user and club recommendations.
+    Retraining a recommender does not need it: the generation of its model is incremented instead, so that all recommendations
+    computed from the previous generation are detected as stale (see get_recommendations_generation)."""
 def update_all_recommendations():
-    user_recommendations = UserRecommendations.objects.all()
-    for recommendation in user_recommendations:
-        recommendation.modified = True
-    UserRecommendations.objects.bulk_update(user_recommendations, ['modified'])
-    club_recommendations = ClubRecommendations.objects.all()
-    for recommendation in club_recommendations:
-        recommendation.modified = True
-    ClubRecommendations.objects.bulk_update(club_recommendations, ['modified'])
+    UserRecommendations.objects.update(modified=True)
+    ClubRecommendations.objects.update(modified=True)
+
+"""Get the generation of the trained models (as saved with their model files) used to compute the user and club recommendations;
+    stored recommendations computed from an older generation are stale"""
+def get_recommendations_generation():
+    return max(model_registry.get_model_generation(name) for name in get_recommendations_recommender_names())
+
+"""Get the generation of the loaded models used to compute the user and club recommendations (loading them if needed)"""
+def get_loaded_recommendations_generation():
+    recommender_names = get_recommendations_recommender_names()
+    for name in recommender_names:
+        model_registry.get(name)
+    return max(model_registry.get_generation(name) for name in recommender_names)
+
+"""Exclude the recommendations invalidated less than a coalescing window ago (setting "RECOMMENDATIONS_INVALIDATION_WINDOW"),
+    as the invalidations of their ratings' changes within the window are coalesced: they are precomputed once the window is over."""
+def get_settled_recommendations(recommendations):
+    settle_time = timezone.now() - timedelta(seconds=settings.RECOMMENDATIONS_INVALIDATION_WINDOW)
+    return recommendations.exclude(invalidated_on__gt=settle_time)
+
+"""Precompute the recommendations of (up to) {batch_size} users whose recommendations are flagged as modified or have been computed
+    from an older generation of the models, the most recently active users first, and store them (with the generation of the models
+    they are computed from) so that they only have to be read when displayed.
+    Returns the number of users whose recommendations have been precomputed (0 once there are no modified recommendations left)."""
+def precompute_modified_user_recommendations(batch_size=500):
+    generation = get_loaded_recommendations_generation()
+    recommendations_batch = list(get_settled_recommendations(UserRecommendations.objects.filter(Q(modified=True) | Q(generation__lt=generation))).select_related('user')
+                                 .order_by(F('user__last_login').desc(nulls_last=True), 'pk')[:batch_size])
+    if len(recommendations_batch) == 0:
+        return 0
+    recommendations_ids = [recommendations.pk for recommendations in recommendations_batch]
+    # Clear the flag before computing, so that ratings changing meanwhile flag the recommendations as modified again
+    UserRecommendations.objects.filter(pk__in=recommendations_ids).update(modified=False)
+    try:
+        recommended_books = get_user_recommendations_batch([recommendations.user.username for recommendations in recommendations_batch])
+    except:
+        UserRecommendations.objects.filter(pk__in=recommendations_ids).update(modified=True)
+        raise
+    for recommendations in recommendations_batch:
+        recommendations.recommendations = recommended_books[recommendations.user.username]
+        recommendations.generation = generation
+    UserRecommendations.objects.bulk_update(recommendations_batch, ['recommendations', 'generation'])
+    return len(recommendations_batch)
+
+"""Precompute the recommendations of (up to) {batch_size} clubs whose recommendations are flagged as modified or have been computed
+    from an older generation of the models, the clubs with the most recently active members first, and store them (with the generation
+    of the models they are computed from) so that they only have to be read when displayed.
+    Returns the number of clubs whose recommendations have been precomputed (0 once there are no modified recommendations left)."""
+def precompute_modified_club_recommendations(batch_size=500):
+    generation = get_loaded_recommendations_generation()
+    recommendations_batch = list(get_settled_recommendations(ClubRecommendations.objects.filter(Q(modified=True) | Q(generation__lt=generation))).select_related('club')
+                                 .annotate(last_member_login=Max('club__clubmembership__user__last_login'))
+                                 .order_by(F('last_member_login').desc(nulls_last=True), 'pk')[:batch_size])
+    if len(recommendations_batch) == 0:
+        return 0
+    recommendations_ids = [recommendations.pk for recommendations in recommendations_batch]
+    # Clear the flag before computing, so that ratings changing meanwhile flag the recommendations as modified again
+    ClubRecommendations.objects.filter(pk__in=recommendations_ids).update(modified=False)
+    try:
+        recommended_books = get_club_recommendations_batch([recommendations.club.club_url_name for recommendations in recommendations_batch])
+    except:
+        ClubRecommendations.objects.filter(pk__in=recommendations_ids).update(modified=True)
+        raise
+    for recommendations in recommendations_batch:
+        recommendations.recommendations = recommended_books[recommendations.club.club_url_name]
+        recommendations.generation = generation
+    ClubRecommendations.objects.bulk_update(recommendations_batch, ['recommendations', 'generation'])
+    return len(recommendations_batch)
@@ -6,8 +6,12 @@ class ContentBasedRecommender(AbstractRecommender):
 
     content_based_methods = None
 
-    def __init__(self):
-        self.content_based_methods = ContentBasedRecommenderMethods()
+    """Load the saved model, or fit the recommender on the trainset (with the given parameters) if one is given"""
+    def __init__(self, trainset=None, parameters={}):
+        if trainset is None:
+            self.content_based_methods = ContentBasedRecommenderMethods()
+        else:
+            self.fit(trainset=trainset, parameters=parameters)
 
     """Train the recommender to recommend books, using the current or given data;
                 parameters may contain a value for 'using_publication_year' """
@@ -23,6 +27,11 @@ class ContentBasedRecommender(AbstractRecommender):
     def get_user_recommendations(self, user_id):
         return self.content_based_methods.get_recommendations_positive_ratings_only_from_user_id(user_id, min_rating=6)
 
+    """Get the recommended books (up to 10) for each of the specified user_ids, from all of the users' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_user_recommendations_batch(self, user_ids):
+        return self.content_based_methods.get_recommendations_positive_ratings_only_from_user_ids(user_ids, min_rating=6)
+
     """Get the recommended books (up to 10) given a specified club_id, from all of the club's members' positively (> 6/10) rated books"""
     def get_club_recommendations(self, club_url_name):
         return self.content_based_methods.get_recommendations_positive_ratings_only_from_club_url_name(club_url_name, min_rating=6)
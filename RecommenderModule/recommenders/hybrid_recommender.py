@@ -0,0 +1,74 @@
+from RecommenderModule.recommenders.resources.hybrid_recommender_methods import HybridRecommenderMethods
+from RecommenderModule.recommenders.resources.popular_books_recommender_methods import PopularBooksMethods
+from RecommenderModule.recommenders.resources.abstract_recommender import AbstractRecommender
+
+"""This class allows the developer to recommend books to a user, combining the item-based, content-based and popularity recommenders
+    given (any of them can be left out): the ratings of the user are fetched once, and the books are ranked from a single score vector"""
+class HybridRecommender(AbstractRecommender):
+
+    item_based_recommender = None
+    content_based_recommender = None
+    popularity_recommender = None
+    parameters = {}
+    hybrid_methods = None
+
+    def __init__(self, item_based_recommender=None, content_based_recommender=None, popularity_recommender=None, parameters={}):
+        self.item_based_recommender = item_based_recommender
+        self.content_based_recommender = content_based_recommender
+        self.popularity_recommender = popularity_recommender
+        self.parameters = parameters
+        self.build_hybrid_methods()
+
+    """Build the hybrid methods from the methods of the current recommenders;
+        parameters may contain a value for 'item_based_weight', 'content_based_weight', 'popularity_weight',
+        'min_personalised_recommendations' and 'number_of_recommendations' """
+    def build_hybrid_methods(self):
+        item_based_methods = self.item_based_recommender.item_based_methods if self.item_based_recommender is not None else None
+        content_based_methods = self.content_based_recommender.content_based_methods if self.content_based_recommender is not None else None
+        popular_books_methods = None
+        if self.popularity_recommender is not None:
+            if self.popularity_recommender.popular_books_methods is None:
+                self.popularity_recommender.popular_books_methods = PopularBooksMethods(print_status=False)
+            popular_books_methods = self.popularity_recommender.popular_books_methods
+        self.hybrid_methods = HybridRecommenderMethods(item_based_methods=item_based_methods, content_based_methods=content_based_methods,
+                                                       popular_books_methods=popular_books_methods, parameters=self.parameters)
+
+    """Train all recommenders to recommend books, using the current or given data;
+        parameters are given to each recommender"""
+    def fit(self, trainset=None, parameters={}):
+        for recommender in (self.item_based_recommender, self.content_based_recommender, self.popularity_recommender):
+            if recommender is not None:
+                recommender.fit(trainset=trainset, parameters=parameters)
+        self.build_hybrid_methods()
+
+    """Train all recommenders to recommend books, using the current or given data, and save them to be re-used as default;
+        parameters are given to each recommender"""
+    def fit_and_save(self, trainset=None, parameters={}):
+        for recommender in (self.item_based_recommender, self.content_based_recommender, self.popularity_recommender):
+            if recommender is not None:
+                recommender.fit_and_save(trainset=trainset, parameters=parameters)
+        self.build_hybrid_methods()
+
+    """Get the recommended books (up to 10) given a specified user_id, from all of the user's positively (> 6/10) rated books,
+        or the most popular books the user has not read if there are not enough personalised recommendations"""
+    def get_user_recommendations(self, user_id):
+        return self.hybrid_methods.get_recommendations_from_user_id(user_id)
+
+    """Get the recommended books (up to 10) for each of the specified user_ids, scoring all users at once;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_user_recommendations_batch(self, user_ids):
+        return self.hybrid_methods.get_recommendations_from_user_ids(user_ids)
+
+    """Get the recommended books (up to 10) given a specified club_url_name, from all of the club's members' positively (> 6/10) rated books,
+        or the most popular books no member has read if there are not enough personalised recommendations"""
+    def get_club_recommendations(self, club_url_name):
+        return self.hybrid_methods.get_recommendations_from_club_url_name(club_url_name)
+
+    """Get the recommended books (up to 10) for each of the specified club_url_names, scoring all clubs at once;
+        returns a dictionary containing the list of recommended books of each club"""
+    def get_club_recommendations_batch(self, club_url_names):
+        return self.hybrid_methods.get_recommendations_from_club_url_names(club_url_names)
+
+    """Get the number of books that can be recommender to the user, using this recommender algorithm"""
+    def get_number_of_recommendable_books(self):
+        return self.hybrid_methods.get_number_of_books()
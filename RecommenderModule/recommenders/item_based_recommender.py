@@ -1,13 +1,18 @@
 from RecommenderModule.recommenders.resources.item_based_collaborative_filtering_methods import ItemBasedCollaborativeFilteringMethods
 from RecommenderModule.recommenders.resources.abstract_recommender import AbstractRecommender
+import copy
 
 """This class allows the developer to recommend books to a user, similar to the user's rated books"""
 class ItemBasedRecommender(AbstractRecommender):
 
     item_based_methods = None
 
-    def __init__(self):
-        self.item_based_methods = ItemBasedCollaborativeFilteringMethods()
+    """Load the saved model, or fit the recommender on the trainset (with the given parameters) if one is given"""
+    def __init__(self, trainset=None, parameters={}):
+        if trainset is None:
+            self.item_based_methods = ItemBasedCollaborativeFilteringMethods()
+        else:
+            self.fit(trainset=trainset, parameters=parameters)
 
     """Train the recommender to recommend books, using the current or given data;
             parameters may contain a value for 'min_ratings_threshold', 'min_support' and 'model_function_name' """
@@ -19,14 +24,34 @@ class ItemBasedRecommender(AbstractRecommender):
     def fit_and_save(self, trainset=None, parameters={}):
         self.item_based_methods = ItemBasedCollaborativeFilteringMethods(trainset=trainset, retraining_and_saving=True, parameters=parameters)
 
+    """Get a copy of the recommender updated with a batch of new, changed or deleted ratings, as a list of (user_id, book_isbn, rating) tuples
+            (rating being None for a deleted rating), without retraining it (only for the 'cosine', 'msd' and 'pearson' models);
+            this recommender keeps serving recommendations from the previous model until the copy replaces it"""
+    def get_updated_recommender(self, ratings_changes, save=False):
+        updated_recommender = copy.copy(self)
+        updated_recommender.item_based_methods = self.item_based_methods.get_updated_methods(ratings_changes)
+        if save:
+            updated_recommender.item_based_methods.save_model()
+        return updated_recommender
+
     """Get the recommended books (up to 10) given a specified user_id, from all of the user's positively (> 6/10) rated books"""
     def get_user_recommendations(self, user_id):
         return self.item_based_methods.get_recommendations_positive_ratings_only_from_user_id(user_id, min_rating=6)
 
+    """Get the recommended books (up to 10) for each of the specified user_ids, from all of the users' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_user_recommendations_batch(self, user_ids):
+        return self.item_based_methods.get_recommendations_positive_ratings_only_from_user_ids(user_ids, min_rating=6)
+
     """Get the recommended books (up to 10) given a specified club_id, from all of the club's members' positively (> 6/10) rated books"""
     def get_club_recommendations(self, club_url_name):
         return self.item_based_methods.get_recommendations_positive_ratings_only_from_club_url_name(club_url_name, min_rating=6)
 
+    """Get the recommended books (up to 10) for each of the specified club_url_names, from all of the clubs' members' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each club"""
+    def get_club_recommendations_batch(self, club_url_names):
+        return self.item_based_methods.get_recommendations_positive_ratings_only_from_club_url_names(club_url_names, min_rating=6)
+
     """Get the number of books that can be recommender to the user, using this recommender algorithm"""
     def get_number_of_recommendable_books(self):
         return self.item_based_methods.trainset.n_items
@@ -8,8 +8,13 @@ class PopularBooksRecommender(AbstractRecommender):
     popular_books_methods = None
     trainset = None
 
-    def __init__(self, print_status=False):
+    """If a trainset is given, the recommender is fitted on it (with the given parameters), and the books read by the users
+        and clubs are read from it instead of the Django database"""
+    def __init__(self, print_status=False, trainset=None, parameters={}):
         self.print_status = print_status
+        self.trainset = trainset
+        if trainset is not None:
+            self.fit(trainset=trainset, parameters=parameters)
 
     """Train the recommender to recommend books, using the current or given data;
         parameters may contain a value for 'min_ratings_threshold' and 'ranking_method' """
@@ -29,6 +34,25 @@ class PopularBooksRecommender(AbstractRecommender):
             self.popular_books_methods = PopularBooksMethods(print_status=self.print_status)
         return self.popular_books_methods.get_recommendations(read_books=user_read_books)
 
+    """Get most popular books (up to 10) according to their average rating, that each of the specified users has not read yet;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_user_recommendations_batch(self, user_ids):
+        library = Library(self.trainset)
+        all_ratings_by_user = library.get_all_ratings_by_users(user_ids)
+        if self.popular_books_methods is None:
+            self.popular_books_methods = PopularBooksMethods(print_status=self.print_status)
+        recommendations = {}
+        for user_id, user_ratings in all_ratings_by_user.items():
+            user_read_books = [rating[0] for rating in user_ratings]
+            recommendations[user_id] = self.popular_books_methods.get_recommendations(read_books=user_read_books)
+        return recommendations
+
+    """Get most popular books (up to 10) according to their average rating, that are not in the given list of read books (ISBN)"""
+    def get_recommendations_from_read_books(self, read_books):
+        if self.popular_books_methods is None:
+            self.popular_books_methods = PopularBooksMethods(print_status=self.print_status)
+        return self.popular_books_methods.get_recommendations(read_books=read_books)
+
     """Get most popular books (up to 10) according to their average rating, that no member of the club has read yet"""
     def get_club_recommendations(self, club_url_name):
         library = Library(self.trainset)
@@ -15,10 +15,20 @@ class AbstractRecommender:
     def get_user_recommendations(self, user_id):
         raise NotImplementedError("Attempting to use abstract method from BaseRecommender super class.")
 
+    """Get the recommended books (up to 10) for each of the specified user_ids, as a dictionary containing the list of recommended books of each user;
+        recommenders can override this method to score all users at once"""
+    def get_user_recommendations_batch(self, user_ids):
+        return {user_id: self.get_user_recommendations(user_id) for user_id in user_ids}
+
     """Get the recommended books (up to 10) given a specified club_url_name, from all of the club's members' positively (> 6/10) rated books"""
     def get_club_recommendations(self, club_url_name):
         raise NotImplementedError("Attempting to use abstract method from BaseRecommender super class.")
 
+    """Get the recommended books (up to 10) for each of the specified club_url_names, as a dictionary containing the list of recommended books of each club;
+        recommenders can override this method to score all clubs at once"""
+    def get_club_recommendations_batch(self, club_url_names):
+        return {club_url_name: self.get_club_recommendations(club_url_name) for club_url_name in club_url_names}
+
     """Get the number of books that can be recommender to the user, using this recommender algorithm"""
     def get_number_of_recommendable_books(self):
         raise NotImplementedError("Attempting to use abstract method from BaseRecommender super class.")
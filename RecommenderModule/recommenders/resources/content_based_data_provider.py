@@ -1,5 +1,5 @@
-import pandas as pd
 from BookClub.models import Book
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 
 """This class loads the book depository dataset from the 'book_depository_dataset.csv' file,
     filters the dataset to keep only books from our database and compute a list of content for each book"""
@@ -20,7 +20,7 @@ class ContentBasedDataProvider:
 
     """Import and return the book depository dataset from the 'book_depository_dataset.csv' file"""
     def get_book_depository_dataset(self):
-        return pd.read_csv(self.path_to_book_depository_dataset)
+        return dataset_cache.read_csv(self.path_to_book_depository_dataset)
 
     """Filter the book depository dataset to only keep rows containing books from our dataset"""
     def compute_filtered_book_depository_dataset(self, original_trainset, get_data_from_csv):
@@ -41,7 +41,7 @@ class ContentBasedDataProvider:
 
     """Import the books dataset from the 'BX_Books.csv' file, and return a list of ISBNs for all books in the dataset"""
     def get_all_books_in_csv_dataset(self):
-        books_df = pd.read_csv(self.path_to_books_df, sep=';', encoding_errors="ignore")
+        books_df = dataset_cache.read_csv(self.path_to_books_df, sep=';', encoding_errors="ignore")
         all_books = list(books_df["ISBN"])
         return all_books
 
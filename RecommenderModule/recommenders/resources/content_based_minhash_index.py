@@ -0,0 +1,78 @@
+import numpy as np
+from scipy import sparse
+
+"""This class generates the candidate pairs of similar books, from the MinHash signatures of their sets of categories
+    (Locality-Sensitive Hashing), so that only the similarities of the candidate pairs have to be computed, instead of
+    the similarities of all pairs of books.
+    Each signature is made of {number_of_bands} bands of {rows_per_band} MinHash values: two books are candidates if
+    all the values of one of their bands are equal, which happens with a probability of 1 - (1 - J^rows_per_band)^number_of_bands
+    for books whose sets of categories have a Jaccard similarity of J. More bands (or fewer rows per band) find more of the
+    similar books (higher recall), more rows per band generate fewer candidates (faster).
+    Within each bucket of books sharing a band, a book is only paired with the {max_bucket_neighbours} books that follow it
+    (ordered by publication year, if given), so that the number of candidate pairs grows linearly with the number of books."""
+class ContentBasedMinHashIndex:
+
+    prime = (1 << 31) - 1
+    number_of_bands = 16
+    rows_per_band = 2
+    max_bucket_neighbours = 50
+    signatures = None
+
+    def __init__(self, categories_matrix, number_of_bands=16, rows_per_band=2, max_bucket_neighbours=50, publication_years=None, seed=0):
+        self.number_of_bands = number_of_bands
+        self.rows_per_band = rows_per_band
+        self.max_bucket_neighbours = max_bucket_neighbours
+        self.publication_years = publication_years
+        self.seed = seed
+        self.categories_matrix = sparse.csr_matrix(categories_matrix)
+        self.build_signatures()
+
+    """Compute the MinHash signature of the set of categories (column indices of the incidence matrix) of each book;
+        books without categories keep the maximum value in all their signature, and are never candidates"""
+    def build_signatures(self):
+        number_of_hashes = self.number_of_bands * self.rows_per_band
+        random_generator = np.random.default_rng(self.seed)
+        coefficients = random_generator.integers(1, self.prime, size=number_of_hashes, dtype=np.int64)
+        offsets = random_generator.integers(0, self.prime, size=number_of_hashes, dtype=np.int64)
+        categories = self.categories_matrix.indices.astype(np.int64)
+        indptr = self.categories_matrix.indptr
+        number_of_books = self.categories_matrix.shape[0]
+        self.signatures = np.full((number_of_books, number_of_hashes), self.prime, dtype=np.int64)
+        books_with_categories = np.flatnonzero(np.diff(indptr) > 0)
+        if len(categories) == 0:
+            return
+        for hash_index in range(number_of_hashes):
+            hashes = (coefficients[hash_index] * categories + offsets[hash_index]) % self.prime
+            self.signatures[books_with_categories, hash_index] = np.minimum.reduceat(hashes, indptr[books_with_categories])
+
+    """Get the candidate pairs of books, as a symmetric boolean sparse (books x books) matrix"""
+    def get_candidates_matrix(self):
+        number_of_books = self.signatures.shape[0]
+        books_with_categories = np.flatnonzero(np.diff(self.categories_matrix.indptr) > 0)
+        if self.publication_years is not None:
+            books_with_categories = books_with_categories[np.argsort(self.publication_years[books_with_categories], kind="stable")]
+        candidates_matrix = sparse.csr_matrix((number_of_books, number_of_books), dtype=bool)
+        for band in range(self.number_of_bands):
+            band_signatures = self.signatures[books_with_categories, band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            buckets = np.unique(band_signatures, axis=0, return_inverse=True)[1].ravel()
+            # Order the books by bucket (keeping the order of publication years within each bucket)
+            order = np.argsort(buckets, kind="stable")
+            books = books_with_categories[order]
+            buckets = buckets[order]
+            rows_list = []
+            columns_list = []
+            for distance in range(1, min(self.max_bucket_neighbours, len(books) - 1) + 1):
+                same_bucket = buckets[:-distance] == buckets[distance:]
+                if not same_bucket.any():
+                    break
+                rows_list.append(books[:-distance][same_bucket])
+                columns_list.append(books[distance:][same_bucket])
+            if rows_list:
+                # Merged band by band, so that the pairs found in several bands are only stored once
+                rows = np.concatenate(rows_list)
+                columns = np.concatenate(columns_list)
+                candidates_matrix = candidates_matrix + sparse.csr_matrix(
+                    (np.ones(2 * len(rows), dtype=bool), (np.concatenate([rows, columns]), np.concatenate([columns, rows]))),
+                    shape=(number_of_books, number_of_books)
+                )
+        return candidates_matrix
@@ -0,0 +1,75 @@
+from scipy import sparse
+import numpy as np
+
+"""This class stores, for each book, its (up to) {number_of_neighbours} most similar books with a non-zero similarity,
+    in contiguous arrays: the neighbours of the book at index i are indices[offsets[i]:offsets[i+1]],
+    with their similarities in scores[offsets[i]:offsets[i+1]] (sorted from the most to the least similar)"""
+class ContentBasedNeighboursModel:
+
+    book_isbns = None
+    indices = None
+    scores = None
+    offsets = None
+    isbn_indices = {}
+    neighbours_matrix = None
+
+    def __init__(self, book_isbns, indices, scores, offsets):
+        self.book_isbns = np.asarray(book_isbns, dtype=str)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.isbn_indices = {book_isbn: index for index, book_isbn in enumerate(self.book_isbns.tolist())}
+
+    """Build the model from a ContentBasedSimilarityEngine, keeping the {number_of_neighbours} most similar books of each book"""
+    @classmethod
+    def from_similarity_engine(cls, similarity_engine, number_of_neighbours=100):
+        indices_list = []
+        scores_list = []
+        offsets = [0]
+        for start, block in similarity_engine.iterate_similarities_blocks():
+            for block_row in range(block.shape[0]):
+                row_start, row_end = block.indptr[block_row], block.indptr[block_row + 1]
+                row_indices = block.indices[row_start:row_end]
+                row_scores = block.data[row_start:row_end]
+                if len(row_scores) > number_of_neighbours:
+                    top_k = np.argpartition(-row_scores, number_of_neighbours - 1)[:number_of_neighbours]
+                    row_indices = row_indices[top_k]
+                    row_scores = row_scores[top_k]
+                order = np.argsort(-row_scores, kind="stable")
+                indices_list.append(row_indices[order])
+                scores_list.append(row_scores[order])
+                offsets.append(offsets[-1] + len(order))
+        indices = np.concatenate(indices_list) if indices_list else np.array([])
+        scores = np.concatenate(scores_list) if scores_list else np.array([])
+        return cls(similarity_engine.book_isbns, indices, scores, offsets)
+
+    """Get the number of books in the model"""
+    def get_number_of_books(self):
+        return len(self.book_isbns)
+
+    """Get the index of the book with the given ISBN, or None if the book is not in the model"""
+    def get_book_index(self, book_isbn):
+        return self.isbn_indices.get(book_isbn)
+
+    """Get the neighbours of the book at the given index, as a pair of arrays (indices, scores)"""
+    def get_neighbours(self, book_index):
+        start, end = self.offsets[book_index], self.offsets[book_index + 1]
+        return self.indices[start:end], self.scores[start:end]
+
+    """Get the (books x books) sparse matrix of the similarities between each book and its neighbours (built on first use)"""
+    def get_neighbours_matrix(self):
+        if self.neighbours_matrix is None:
+            number_of_books = self.get_number_of_books()
+            self.neighbours_matrix = sparse.csr_matrix((self.scores.astype(np.float64), self.indices, self.offsets), shape=(number_of_books, number_of_books))
+        return self.neighbours_matrix
+
+    """Save the model arrays in a single (uncompressed) .npz file"""
+    def save(self, path):
+        with open(path, "wb") as file:
+            np.savez(file, book_isbns=self.book_isbns, indices=self.indices, scores=self.scores, offsets=self.offsets)
+
+    """Load a model saved with the save() method"""
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(arrays["book_isbns"], arrays["indices"], arrays["scores"], arrays["offsets"])
@@ -1,9 +1,9 @@
 from RecommenderModule.recommenders.resources.library import Library
 from RecommenderModule.recommenders.resources.content_based_data_provider import ContentBasedDataProvider
-from collections import defaultdict
-from operator import itemgetter
-import joblib
-import math
+from RecommenderModule.recommenders.resources.content_based_similarity_engine import ContentBasedSimilarityEngine
+from RecommenderModule.recommenders.resources.content_based_neighbours_model import ContentBasedNeighboursModel
+from scipy import sparse
+import numpy as np
 
 """This class provides the developer with methods to recommend books to a user, 
     based on content similarity between books"""
@@ -13,8 +13,13 @@ class ContentBasedRecommenderMethods:
     library = None
     content_based_data_provider = None
     book_content_list = []
-    similarities_dictionary = {}
+    neighbours_model = None
     using_publication_year = True
+    number_of_neighbours = 100
+    using_minhash_candidates = False
+    minhash_number_of_bands = 16
+    minhash_rows_per_band = 2
+    minhash_max_bucket_neighbours = 50
 
     def __init__(self, parameters={}, retraining=False, retraining_and_saving=False, trainset=None, get_data_from_csv=False):
         self.initialise_parameters(parameters)
@@ -35,6 +40,16 @@ class ContentBasedRecommenderMethods:
     def initialise_parameters(self, parameters):
         if "using_publication_year" in parameters.keys():
             self.using_publication_year = parameters["using_publication_year"]
+        if "number_of_neighbours" in parameters.keys():
+            self.number_of_neighbours = parameters["number_of_neighbours"]
+        if "using_minhash_candidates" in parameters.keys():
+            self.using_minhash_candidates = parameters["using_minhash_candidates"]
+        if "minhash_number_of_bands" in parameters.keys():
+            self.minhash_number_of_bands = parameters["minhash_number_of_bands"]
+        if "minhash_rows_per_band" in parameters.keys():
+            self.minhash_rows_per_band = parameters["minhash_rows_per_band"]
+        if "minhash_max_bucket_neighbours" in parameters.keys():
+            self.minhash_max_bucket_neighbours = parameters["minhash_max_bucket_neighbours"]
 
     """Build the list containing a dictionary for each book in the filtered book depository dataset, 
         which contains: 'book_isbn', 'categories' (genres) and 'publication_year' """
@@ -42,53 +57,23 @@ class ContentBasedRecommenderMethods:
         content_based_data_provider = ContentBasedDataProvider(original_trainset=trainset, get_data_from_csv=get_data_from_csv)
         self.book_content_list = content_based_data_provider.get_list_of_dict_book_content()
 
-    """Train the model on the defined data and build the associated similarities dictionary"""
+    """Train the model on the defined data and build the associated neighbours model,
+        keeping the {number_of_neighbours} most similar books of each book
+        (among the candidates generated from MinHash signatures of the categories, if using_minhash_candidates is True)"""
     def train_model(self):
-        similarities_dictionary = {}
-        for book_content_dict_1 in self.book_content_list:
-            book_isbn_1 = book_content_dict_1["book_isbn"]
-            for book_content_dict_2 in self.book_content_list:
-                book_isbn_2 = book_content_dict_2["book_isbn"]
-                if not book_isbn_1 == book_isbn_2:
-                    similarity = self.get_content_similarity_between_books(book_content_dict_1, book_content_dict_2)
-                    if book_isbn_1 not in similarities_dictionary.keys():
-                        similarities_dictionary[book_isbn_1] = {}
-                    (similarities_dictionary[book_isbn_1])[book_isbn_2] = similarity
-                    if book_isbn_2 not in similarities_dictionary.keys():
-                        similarities_dictionary[book_isbn_2] = {}
-                    (similarities_dictionary[book_isbn_2])[book_isbn_1] = similarity
-        self.similarities_dictionary = similarities_dictionary
-
-    """Get the overall similarity value (between 0 and 1) between the contents of 2 books"""
-    def get_content_similarity_between_books(self, book_content_dict_1, book_content_dict_2):
-        categories_similarity = self.compute_categories_similarity(book_content_dict_1["categories"], book_content_dict_2["categories"])
-        if self.using_publication_year:
-            publication_year_similarity = self.compute_publication_year_similarity(book_content_dict_1["publication_year"], book_content_dict_2["publication_year"])
-            similarity = categories_similarity * publication_year_similarity
-            return similarity
-        return categories_similarity
-    """Calculate the similarity value (between 0 and 1) between the categories of 2 books"""
-    def compute_categories_similarity(self, categories1, categories2):
-        common_categories = [category for category in categories1 if category in categories2]
-        if len(common_categories) == 0:
-            return 0
-        similarity = len(common_categories) / math.sqrt(len(categories1) * len(categories2))
-        return similarity
-
-    """Calculate the similarity value (between 0 and 1) between the publication years of 2 books"""
-    def compute_publication_year_similarity(self, publication_year_1, publication_year_2):
-        diff = abs(publication_year_1 - publication_year_2)
-        similarity = math.exp(-diff / 10.0)
-        return similarity
-
-    """Save the similarities_dictionary as .sav file, using the joblib library."""
+        similarity_engine = ContentBasedSimilarityEngine(self.book_content_list, using_publication_year=self.using_publication_year)
+        if self.using_minhash_candidates:
+            similarity_engine.use_minhash_candidates(number_of_bands=self.minhash_number_of_bands, rows_per_band=self.minhash_rows_per_band,
+                                                     max_bucket_neighbours=self.minhash_max_bucket_neighbours)
+        self.neighbours_model = ContentBasedNeighboursModel.from_similarity_engine(similarity_engine, number_of_neighbours=self.number_of_neighbours)
+
+    """Save the neighbours model as .npz file."""
     def save_model(self):
-        joblib.dump(self.similarities_dictionary, f"{self.path_to_model}/similarities_dictionary.sav")
+        self.neighbours_model.save(f"{self.path_to_model}/neighbours_model.npz")
 
-    """Import the similarities_dictionary from the .sav file, using the joblib library."""
+    """Import the neighbours model from the .npz file."""
     def import_model(self):
-        self.similarities_dictionary = joblib.load(f"{self.path_to_model}/similarities_dictionary.sav")
-
+        self.neighbours_model = ContentBasedNeighboursModel.load(f"{self.path_to_model}/neighbours_model.npz")
 
     """Get the recommended books (up to 10) given a specified user_id, from all of the user's positively (> 6/10) rated books"""
     def get_recommendations_positive_ratings_only_from_user_id(self, user_id, min_rating=6):
@@ -111,31 +96,76 @@ class ContentBasedRecommenderMethods:
     """Get the recommended books (up to 10) given a list of books rated positively and a list of all books rated
         by the user/club"""
     def get_recommendations_from_positive_ratings(self, positive_ratings, all_books_rated):
+        neighbours_model = self.neighbours_model
 
         # Weigh items by rating
-        candidates = defaultdict(float)
-        for item_id, rating in positive_ratings:
-            try:
-                similarity_row = self.similarities_dictionary[item_id]
-                for book_isbn, similarity in similarity_row.items():
-                    candidates[book_isbn] += similarity * (rating / 10.0)
-            except:
-                pass
+        candidates = np.zeros(neighbours_model.get_number_of_books())
+        for book_isbn, rating in positive_ratings:
+            book_index = neighbours_model.get_book_index(book_isbn)
+            if book_index is not None:
+                neighbours_indices, neighbours_scores = neighbours_model.get_neighbours(book_index)
+                candidates[neighbours_indices] += neighbours_scores * (rating / 10.0)
+
+        # Check if user has already read the book, and only recommend the book if it has some similarity
+        for book_isbn, rating in all_books_rated:
+            book_index = neighbours_model.get_book_index(book_isbn)
+            if book_index is not None:
+                candidates[book_index] = 0
+        candidates[np.isnan(candidates)] = 0
+        recommendable_books = np.flatnonzero(candidates)
+
+        # Get the top 10 recommendations
+        order = np.argsort(-candidates[recommendable_books], kind="stable")[:10]
+        return [str(book_isbn) for book_isbn in neighbours_model.book_isbns[recommendable_books[order]]]
+
+    """Get the recommended books (up to 10) for each of the specified users, from all of the users' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_recommendations_positive_ratings_only_from_user_ids(self, user_ids, min_rating=6, batch_size=256):
+        all_ratings_by_user = self.library.get_all_ratings_by_users(user_ids)
+        user_ids = list(all_ratings_by_user.keys())
+        recommendations = {}
+        for start in range(0, len(user_ids), batch_size):
+            batch_user_ids = user_ids[start:start + batch_size]
+            all_ratings_lists = [all_ratings_by_user[user_id] for user_id in batch_user_ids]
+            batch_recommendations = self.get_recommendations_from_ratings_batch(all_ratings_lists, min_rating=min_rating)
+            recommendations.update(zip(batch_user_ids, batch_recommendations))
+        return recommendations
+
+    """Get the recommended books (up to 10) for each list of ratings (all books rated by a user), from the positively rated books;
+        all lists are scored at once, with a single product of the sparse (lists x books) matrix of rating weights and the neighbours matrix"""
+    def get_recommendations_from_ratings_batch(self, all_ratings_lists, min_rating=6):
+        neighbours_model = self.neighbours_model
+        rows = []
+        columns = []
+        rating_weights = []
+        for row, all_ratings in enumerate(all_ratings_lists):
+            for book_isbn, rating in self.get_positive_ratings_from_all_ratings(all_ratings, min_rating=min_rating):
+                book_index = neighbours_model.get_book_index(book_isbn)
+                if book_index is not None:
+                    rows.append(row)
+                    columns.append(book_index)
+                    rating_weights.append(rating / 10.0)
+        number_of_books = neighbours_model.get_number_of_books()
+        weights_matrix = sparse.csr_matrix((rating_weights, (rows, columns)), shape=(len(all_ratings_lists), number_of_books))
+        candidates_matrix = (weights_matrix @ neighbours_model.get_neighbours_matrix()).tocsr()
+
+        recommendations = []
+        for row, all_ratings in enumerate(all_ratings_lists):
+            start, end = candidates_matrix.indptr[row], candidates_matrix.indptr[row + 1]
+            candidates_indices = candidates_matrix.indices[start:end]
+            candidates = candidates_matrix.data[start:end]
 
-        # Get top-rated items from similar users
-        final_recommendations = []
-        all_books_rated_isbn = [rating[0] for rating in all_books_rated]
-        for book_isbn, rating_sum in sorted(candidates.items(), key=itemgetter(1), reverse=True):
             # Check if user has already read the book, and only recommend the book if it has some similarity
-            if (book_isbn not in all_books_rated_isbn) and (not math.isnan(rating_sum)) and rating_sum != 0:
-                try:
-                    final_recommendations.append(book_isbn)
-                    if len(final_recommendations) >= 10: # Get the top 10 recommendations
-                        break
-                except:
-                    pass
-
-        return final_recommendations
+            read_books = [neighbours_model.get_book_index(book_isbn) for book_isbn, rating in all_ratings]
+            recommendable = ~np.isin(candidates_indices, [book_index for book_index in read_books if book_index is not None])
+            recommendable &= ~np.isnan(candidates) & (candidates != 0)
+            candidates_indices = candidates_indices[recommendable]
+            candidates = candidates[recommendable]
+
+            # Get the top 10 recommendations (ties are ordered by book index, as in get_recommendations_from_positive_ratings)
+            order = np.lexsort((candidates_indices, -candidates))[:10]
+            recommendations.append([str(book_isbn) for book_isbn in neighbours_model.book_isbns[candidates_indices[order]]])
+        return recommendations
 
     """Get the recommended books (up to 10) given a specified club_url_name, from all of the club's members' positively (> 6/10) rated books"""
     def get_recommendations_positive_ratings_only_from_club_url_name(self, club_url_name, min_rating=6):
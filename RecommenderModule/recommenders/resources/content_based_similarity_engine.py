@@ -0,0 +1,102 @@
+from RecommenderModule.recommenders.resources.content_based_minhash_index import ContentBasedMinHashIndex
+import numpy as np
+from scipy import sparse
+
+"""This class computes the content similarities between all books of a book content list
+    (as built by the ContentBasedDataProvider), using blocked sparse matrix products
+    instead of comparing every pair of books one by one.
+    With MinHash candidates, only the similarities of the candidate pairs of books generated by a ContentBasedMinHashIndex
+    are computed (exactly), so that the computation grows linearly with the number of books."""
+class ContentBasedSimilarityEngine:
+
+    book_content_list = []
+    book_isbns = []
+    categories_matrix = None
+    categories_counts = None
+    publication_years = None
+    using_publication_year = True
+    block_size = 1024
+    candidates_matrix = None
+
+    def __init__(self, book_content_list, using_publication_year=True, block_size=1024):
+        self.book_content_list = book_content_list
+        self.using_publication_year = using_publication_year
+        self.block_size = block_size
+        self.build_book_isbns()
+        self.build_categories_matrix()
+        self.build_publication_years()
+
+    """Store the ISBN of each book, in the order of the book content list (row index of the matrices)"""
+    def build_book_isbns(self):
+        self.book_isbns = [book_content_dict["book_isbn"] for book_content_dict in self.book_content_list]
+
+    """Build the sparse (books x categories) incidence matrix, and the number of categories of each book"""
+    def build_categories_matrix(self):
+        category_indices = {}
+        rows = []
+        columns = []
+        for row_index, book_content_dict in enumerate(self.book_content_list):
+            book_categories = set(book_content_dict["categories"])
+            for category in book_categories:
+                column_index = category_indices.setdefault(category, len(category_indices))
+                rows.append(row_index)
+                columns.append(column_index)
+        self.categories_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)),
+            shape=(len(self.book_content_list), len(category_indices)),
+            dtype=np.float64
+        )
+        self.categories_counts = np.diff(self.categories_matrix.indptr).astype(np.float64)
+
+    """Build the vector of publication years, in the order of the book content list"""
+    def build_publication_years(self):
+        self.publication_years = np.array(
+            [book_content_dict["publication_year"] for book_content_dict in self.book_content_list],
+            dtype=np.float64
+        )
+
+    """Only compute the similarities of the candidate pairs of books generated from the MinHash signatures of their categories
+        (see ContentBasedMinHashIndex for the parameters)"""
+    def use_minhash_candidates(self, number_of_bands=16, rows_per_band=2, max_bucket_neighbours=50):
+        minhash_index = ContentBasedMinHashIndex(
+            self.categories_matrix,
+            number_of_bands=number_of_bands,
+            rows_per_band=rows_per_band,
+            max_bucket_neighbours=max_bucket_neighbours,
+            publication_years=self.publication_years if self.using_publication_year else None
+        )
+        self.candidates_matrix = minhash_index.get_candidates_matrix()
+
+    """Get the pairs of books (rows of the block [start, end[, columns) to compute the similarities of, along with their numbers of
+        common categories: all pairs of books sharing at least one category, or the candidate pairs if MinHash candidates are used"""
+    def get_block_pairs(self, start, end):
+        if self.candidates_matrix is None:
+            # The product of two incidence rows is the number of common categories
+            block = (self.categories_matrix[start:end] @ self.categories_matrix.T).tocoo()
+            return block.row + start, block.col, block.data
+        block = self.candidates_matrix[start:end].tocoo()
+        rows = block.row + start
+        columns = block.col
+        common_categories = np.asarray(self.categories_matrix[rows].multiply(self.categories_matrix[columns]).sum(axis=1)).ravel()
+        return rows, columns, common_categories
+
+    """Compute the similarities between the books of the rows [start, end[ and all books, as a sparse matrix.
+        Only pairs of different books sharing at least one category are stored."""
+    def compute_similarities_block(self, start, end):
+        rows, columns, common_categories = self.get_block_pairs(start, end)
+        similarities = common_categories / np.sqrt(self.categories_counts[rows] * self.categories_counts[columns])
+        if self.using_publication_year:
+            years_difference = np.abs(self.publication_years[rows] - self.publication_years[columns])
+            similarities = similarities * np.exp(-years_difference / 10.0)
+        different_books = (rows != columns) & (similarities != 0)
+        return sparse.coo_matrix(
+            (similarities[different_books], (rows[different_books] - start, columns[different_books])),
+            shape=(end - start, len(self.book_content_list))
+        ).tocsr()
+
+    """Iterate over blocks of rows of the similarities matrix, as (start_row, sparse_block) pairs"""
+    def iterate_similarities_blocks(self):
+        number_of_books = len(self.book_content_list)
+        for start in range(0, number_of_books, self.block_size):
+            end = min(start + self.block_size, number_of_books)
+            yield start, self.compute_similarities_block(start, end)
@@ -1,6 +1,6 @@
 from surprise import Dataset, Reader
-import pandas as pd
-from BookClub.models.review import BookReview
+from RecommenderModule.recommenders.resources.rating_arrays import RatingArrays
+from RecommenderModule.recommenders.resources.dataset_cache import dataset_cache
 
 
 """This class loads the ratings dataset from the 'BX-Book-Ratings.csv' file and builds the train sets"""
@@ -8,6 +8,7 @@ class DataProvider:
 
     ratings_path = "static/dataset/BX-Book-Ratings.csv"
     ratings_df = None
+    rating_arrays = None
     filtering_min_ratings_threshold = 1
     filtered_ratings_df = None
     filtered_ratings_dataset = None
@@ -29,19 +30,18 @@ class DataProvider:
     """Load the ratings from the csv file, split the data in train and test partitions, and build train set"""
     def load_ratings_datasets(self, get_data_from_csv=False):
         if get_data_from_csv:
-            # Get data from csv as pandas DataFrame
-            ratings_df = pd.read_csv(self.ratings_path, sep=';', encoding_errors="ignore")
+            # Get data from csv (through the binary dataset cache) as pandas DataFrame
+            ratings_df = dataset_cache.read_csv(self.ratings_path, sep=';', encoding_errors="ignore")
             ratings_df["User-ID"] = ratings_df["User-ID"].astype(str)
             self.ratings_df = ratings_df
         else:
             self.get_ratings_from_django_database()
 
-    """Get data from Django database as pandas DataFrame"""
+    """Get data from Django database, streamed in chunks into integer-coded arrays (self.rating_arrays),
+        and as a pandas DataFrame with categorical columns sharing the codes of the arrays"""
     def get_ratings_from_django_database(self):
-        ratings_query = BookReview.objects.all().values('creator__username', 'book__ISBN', 'book_rating')
-        ratings_list = [[rating['creator__username'], rating['book__ISBN'], rating['book_rating']] for rating in ratings_query]
-        ratings_df = pd.DataFrame.from_records(ratings_list, columns=["User-ID", "ISBN", "Book-Rating"])
-        self.ratings_df = ratings_df
+        self.rating_arrays = RatingArrays.from_django_database()
+        self.ratings_df = self.rating_arrays.to_dataframe()
 
     """Filter the book dataset to keep only books with at least {self.filtering_min_ratings_threshold} ratings"""
     def get_filtered_books_list(self):
@@ -59,6 +59,13 @@ class DataProvider:
         {self.filtering_min_ratings_threshold} (defined in constructor) ratings
         (100% of dataset goes into training)"""
     def load_filtered_ratings_dataset(self):
+        if self.rating_arrays is not None:
+            # Build the train set directly from the arrays (the surprise dataset is only built if needed)
+            filtered_rating_arrays = self.rating_arrays.filter_items(self.filtering_min_ratings_threshold)
+            self.filtered_ratings_df = filtered_rating_arrays.to_dataframe()
+            self.filtered_ratings_dataset = None
+            self.filtered_ratings_trainset = filtered_rating_arrays.build_trainset()
+            return
         # Get original data from csv
         ratings_df = self.ratings_df
         # Get list of all books with at least {self.filtering_min_ratings_threshold} ratings
@@ -74,6 +81,9 @@ class DataProvider:
 
     """Get the filtered ratings dataset object"""
     def get_filtered_ratings_dataset(self):
+        if self.filtered_ratings_dataset is None:
+            reader = Reader(line_format='user item rating', sep=';', skip_lines=0, rating_scale=(0,10))
+            self.filtered_ratings_dataset = Dataset.load_from_df(self.filtered_ratings_df, reader)
         return self.filtered_ratings_dataset
 
     """Get the filtered ratings train set"""
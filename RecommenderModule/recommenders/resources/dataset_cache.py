@@ -0,0 +1,151 @@
+import hashlib
+import logging
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+"""This class reads the csv files of the datasets through a binary cache: the first time a csv file is read
+    (with given pandas.read_csv options), the parsed DataFrame is saved column by column as a .npz file,
+    named after the checksum of the csv file and of the options. Next reads load the columns from the .npz file
+    instead of parsing the csv file again, until the csv file changes.
+    Numeric columns are saved as typed arrays; columns of short texts (such as ISBNs) as fixed-width text arrays;
+    other text columns as a single UTF-8 buffer with the offsets of each value, along with the type of each value
+    (so that text, integer, float and missing values mixed in a column are read back as they were parsed)."""
+class DatasetCache:
+
+    format_version = 1
+    cache_directory = "static/dataset/cache"
+    max_fixed_width = 32
+    TEXT = 0
+    INTEGER = 1
+    FLOAT = 2
+    MISSING = 3
+
+    def __init__(self, cache_directory="static/dataset/cache"):
+        self.cache_directory = cache_directory
+
+    """Read the csv file as a pandas DataFrame (taking the same options as pandas.read_csv), from the cache if possible"""
+    def read_csv(self, file_path, **read_csv_options):
+        cache_file_path = self.get_cache_file_path(file_path, read_csv_options)
+        if os.path.exists(cache_file_path):
+            try:
+                return self.load_dataframe(cache_file_path)
+            except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as exception: # Truncated or corrupted cache file
+                logger.warning("Could not read the cache file %s, parsing %s instead: %s", cache_file_path, file_path, exception)
+        else:
+            logger.info("No cache file for %s yet, parsing it", file_path)
+        dataframe = pd.read_csv(file_path, **read_csv_options)
+        try:
+            self.save_dataframe(dataframe, cache_file_path)
+            self.remove_stale_cache_files(file_path, cache_file_path)
+        except (OSError, ValueError) as exception: # Columns that can not be cached, or cache directory not writable
+            logger.warning("Could not cache %s: %s", file_path, exception)
+        return dataframe
+
+    """Get the checksum of the options the csv file is read with (and of the format of the cache files)"""
+    def get_options_checksum(self, read_csv_options):
+        return hashlib.sha256(f"{self.format_version}{sorted(read_csv_options.items())}".encode()).hexdigest()[:8]
+
+    """Get the checksum of the content of the csv file"""
+    def get_file_checksum(self, file_path):
+        checksum = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                checksum.update(block)
+        return checksum.hexdigest()[:16]
+
+    """Get the path of the cache file of the csv file read with the given options ('{csv file name}.{options checksum}.{content checksum}.npz')"""
+    def get_cache_file_path(self, file_path, read_csv_options):
+        file_name = f"{os.path.basename(file_path)}.{self.get_options_checksum(read_csv_options)}.{self.get_file_checksum(file_path)}.npz"
+        return os.path.join(self.cache_directory, file_name)
+
+    """Save the columns of the DataFrame into the .npz file (written to a temporary file first, so that readers never see a partial file)"""
+    def save_dataframe(self, dataframe, cache_file_path):
+        arrays = {"columns": np.array([str(column) for column in dataframe.columns])}
+        if list(arrays["columns"]) != list(dataframe.columns) or not isinstance(dataframe.index, pd.RangeIndex):
+            raise ValueError("Only DataFrames with text column names and a default index can be cached.")
+        for position, column in enumerate(dataframe.columns):
+            values = dataframe[column].to_numpy()
+            if values.dtype.kind in "biuf":
+                arrays[f"values_{position}"] = values
+            elif values.dtype == object:
+                arrays.update(self.encode_text_column(values, position))
+            else:
+                raise ValueError(f"Columns of type {values.dtype} can not be cached.")
+        os.makedirs(self.cache_directory, exist_ok=True)
+        temporary_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+        with open(temporary_file_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_file_path, cache_file_path)
+
+    """Encode a column of text values (possibly mixed with numbers or missing values): short texts only are saved as a fixed-width
+        text array, other columns as a single UTF-8 buffer with the (character) offsets of each value and the type of each value"""
+    def encode_text_column(self, values, position):
+        types = np.empty(len(values), dtype=np.int8)
+        texts = []
+        for index, value in enumerate(values):
+            if isinstance(value, str):
+                types[index] = self.TEXT
+                texts.append(value)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+                types[index] = self.INTEGER
+                texts.append(str(int(value)))
+            elif isinstance(value, (float, np.floating)) and not np.isnan(value):
+                types[index] = self.FLOAT
+                texts.append(repr(float(value)))
+            elif value is None or isinstance(value, (float, np.floating)):
+                types[index] = self.MISSING
+                texts.append("")
+            else:
+                raise ValueError(f"Values of type {type(value)} can not be cached.")
+        if np.all(types == self.TEXT) and max((len(text) for text in texts), default=0) <= self.max_fixed_width:
+            return {f"strings_{position}": np.array(texts, dtype=str)}
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return {
+            f"text_{position}": np.frombuffer("".join(texts).encode("utf-8", "surrogatepass"), dtype=np.uint8),
+            f"offsets_{position}": offsets,
+            f"types_{position}": types
+        }
+
+    """Load the DataFrame saved in the .npz file"""
+    def load_dataframe(self, cache_file_path):
+        with np.load(cache_file_path, allow_pickle=False) as arrays:
+            columns = list(arrays["columns"])
+            data = {}
+            for position, column in enumerate(columns):
+                if f"values_{position}" in arrays.files:
+                    data[column] = arrays[f"values_{position}"]
+                elif f"strings_{position}" in arrays.files:
+                    data[column] = arrays[f"strings_{position}"].astype(object)
+                else:
+                    data[column] = self.decode_text_column(arrays[f"text_{position}"], arrays[f"offsets_{position}"], arrays[f"types_{position}"])
+        return pd.DataFrame(data, columns=columns)
+
+    def decode_text_column(self, text, offsets, types):
+        text = text.tobytes().decode("utf-8", "surrogatepass")
+        offsets = offsets.tolist()
+        values = np.empty(len(types), dtype=object)
+        values[:] = [text[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        for index in np.flatnonzero(types != self.TEXT).tolist():
+            if types[index] == self.INTEGER:
+                values[index] = int(values[index])
+            elif types[index] == self.FLOAT:
+                values[index] = float(values[index])
+            else:
+                values[index] = np.nan
+        return values
+
+    """Remove the cache files of previous versions of the csv file read with the same options"""
+    def remove_stale_cache_files(self, file_path, cache_file_path):
+        prefix = os.path.basename(cache_file_path).rsplit(".", 2)[0]
+        for file_name in os.listdir(self.cache_directory):
+            other_cache_file_path = os.path.join(self.cache_directory, file_name)
+            if file_name.rsplit(".", 2)[0] == prefix and file_name.endswith(".npz") and other_cache_file_path != cache_file_path:
+                os.remove(other_cache_file_path)
+
+
+dataset_cache = DatasetCache()
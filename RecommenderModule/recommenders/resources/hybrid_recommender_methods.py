@@ -0,0 +1,208 @@
+from RecommenderModule.recommenders.resources.library import Library
+from RecommenderModule.recommenders.resources.item_id_mapping import get_top_n_indices
+from scipy import sparse
+import numpy as np
+
+"""This class provides the developer with methods to recommend books from a single score vector, combining the scores of the
+    item-based and content-based recommenders (computed from the same ratings, fetched once) and the popularity of the books.
+    The books of all models are indexed once in a shared vector (the books of the popularity list first, in order of popularity);
+    the scores of each recommender are normalised (divided by the best score of each user) and added into the shared vector
+    with their configurable weights ("item_based_weight", "content_based_weight" and "popularity_weight").
+    If fewer than {min_personalised_recommendations} books get a personalised score (e.g. for a new user), the books are only ranked
+    by popularity instead, as the popularity recommender would rank them. A recommender which is not given is left out."""
+class HybridRecommenderMethods:
+
+    item_based_methods = None
+    content_based_methods = None
+    popular_books_methods = None
+    library = None
+
+    item_based_weight = 1.0
+    content_based_weight = 0.5
+    popularity_weight = 0.05
+    min_personalised_recommendations = 3
+    number_of_recommendations = 10
+    min_rating = 6
+
+    book_isbns = []
+    isbn_indices = {}
+    item_based_indices = None
+    content_based_indices = None
+    popularity_scores = None
+    number_of_popular_books = 0
+
+    def __init__(self, item_based_methods=None, content_based_methods=None, popular_books_methods=None, parameters={}, library=None):
+        self.initialise_parameters(parameters)
+        self.item_based_methods = item_based_methods
+        self.content_based_methods = content_based_methods
+        self.popular_books_methods = popular_books_methods
+        if library is None:
+            library = item_based_methods.library if item_based_methods is not None else Library()
+        self.library = library
+        self.build_books_index()
+
+    """Store the values of the parameters into class attributes"""
+    def initialise_parameters(self, parameters):
+        if "item_based_weight" in parameters.keys():
+            self.item_based_weight = parameters["item_based_weight"]
+        if "content_based_weight" in parameters.keys():
+            self.content_based_weight = parameters["content_based_weight"]
+        if "popularity_weight" in parameters.keys():
+            self.popularity_weight = parameters["popularity_weight"]
+        if "min_personalised_recommendations" in parameters.keys():
+            self.min_personalised_recommendations = parameters["min_personalised_recommendations"]
+        if "number_of_recommendations" in parameters.keys():
+            self.number_of_recommendations = parameters["number_of_recommendations"]
+
+    """Index the books of all models in the shared score vector, and compute the (normalised) popularity score of each book"""
+    def build_books_index(self):
+        self.book_isbns = []
+        self.isbn_indices = {}
+        popularity_list = self.get_popularity_list()
+        popularity_indices = self.index_books([isbn for isbn, score in popularity_list])
+        if self.item_based_methods is not None:
+            trainset = self.item_based_methods.trainset
+            self.item_based_indices = self.index_books([str(trainset.to_raw_iid(inner_item_id)) for inner_item_id in trainset.all_items()])
+        if self.content_based_methods is not None:
+            self.content_based_indices = self.index_books(self.content_based_methods.neighbours_model.book_isbns.tolist())
+        self.popularity_scores = np.zeros(len(self.book_isbns))
+        popularity_scores = np.array([score for isbn, score in popularity_list], dtype=np.float64)
+        if len(popularity_scores) > 0 and popularity_scores.max() > 0:
+            self.popularity_scores[popularity_indices] = np.maximum(popularity_scores, 0) / popularity_scores.max()
+        self.number_of_popular_books = int(np.count_nonzero(popularity_scores > 0))
+
+    """Get the indices of the given books in the shared score vector, indexing the books which are not indexed yet"""
+    def index_books(self, isbns):
+        indices = np.empty(len(isbns), dtype=np.int64)
+        for position, isbn in enumerate(isbns):
+            index = self.isbn_indices.get(isbn)
+            if index is None:
+                index = len(self.book_isbns)
+                self.isbn_indices[isbn] = index
+                self.book_isbns.append(isbn)
+            indices[position] = index
+        return indices
+
+    """Get the popularity list (pairs (isbn, score), from the most to the least popular book) of the chosen ranking method"""
+    def get_popularity_list(self):
+        if self.popular_books_methods is None:
+            return []
+        if self.popular_books_methods.ranking_method == "average":
+            return self.popular_books_methods.sorted_average_ratings
+        elif self.popular_books_methods.ranking_method == "median":
+            return self.popular_books_methods.sorted_median_ratings
+        return self.popular_books_methods.sorted_combination_scores
+
+    """Get the number of books that can be recommended by at least one of the models"""
+    def get_number_of_books(self):
+        return len(self.book_isbns)
+
+    """Get the recommended books given a specified user_id, from all of the user's rated books"""
+    def get_recommendations_from_user_id(self, user_id):
+        return self.get_recommendations_from_ratings_batch([self.library.get_all_ratings_by_user(user_id)])[0]
+
+    """Get the recommended books for each of the specified users, from all of the users' rated books;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_recommendations_from_user_ids(self, user_ids, batch_size=256):
+        all_ratings_by_user = self.library.get_all_ratings_by_users(user_ids)
+        user_ids = list(all_ratings_by_user.keys())
+        recommendations = {}
+        for start in range(0, len(user_ids), batch_size):
+            batch_user_ids = user_ids[start:start + batch_size]
+            batch_recommendations = self.get_recommendations_from_ratings_batch([all_ratings_by_user[user_id] for user_id in batch_user_ids])
+            recommendations.update(zip(batch_user_ids, batch_recommendations))
+        return recommendations
+
+    """Get the recommended books given a specified club_url_name, from all of the club's members' rated books"""
+    def get_recommendations_from_club_url_name(self, club_url_name):
+        return self.get_recommendations_from_ratings_batch([self.library.get_all_ratings_by_club(club_url_name)])[0]
+
+    """Get the recommended books for each of the specified clubs, from all of the clubs' members' rated books;
+        returns a dictionary containing the list of recommended books of each club"""
+    def get_recommendations_from_club_url_names(self, club_url_names, batch_size=256):
+        club_url_names = list(dict.fromkeys(club_url_names))
+        recommendations = {}
+        for start in range(0, len(club_url_names), batch_size):
+            batch_club_url_names = club_url_names[start:start + batch_size]
+            batch_recommendations = self.get_recommendations_from_ratings_batch([self.library.get_all_ratings_by_club(club_url_name) for club_url_name in batch_club_url_names])
+            recommendations.update(zip(batch_club_url_names, batch_recommendations))
+        return recommendations
+
+    """Get the recommended books for each list of ratings (pairs (book_isbn, rating) of all books rated by a user or a club):
+        each model scores all lists at once, and the scores of each list are combined into its shared score vector"""
+    def get_recommendations_from_ratings_batch(self, all_ratings_lists):
+        personalised_scores = np.zeros((len(all_ratings_lists), self.get_number_of_books()))
+        if self.item_based_methods is not None and self.item_based_weight != 0:
+            self.add_item_based_scores(personalised_scores, all_ratings_lists)
+        if self.content_based_methods is not None and self.content_based_weight != 0:
+            self.add_content_based_scores(personalised_scores, all_ratings_lists)
+
+        recommendations = []
+        for row, all_ratings in enumerate(all_ratings_lists):
+            read_books = [self.isbn_indices[book_isbn] for book_isbn, rating in all_ratings if book_isbn in self.isbn_indices]
+            scores = personalised_scores[row]
+            scores[read_books] = 0
+            if np.count_nonzero(scores > 0) < self.min_personalised_recommendations: # Fall back on the most popular books
+                top_books = self.get_most_popular_books(set(read_books), n=self.number_of_recommendations)
+            else:
+                scores += self.popularity_weight * self.popularity_scores
+                scores[read_books] = 0
+                # Ties are broken by index, i.e. by popularity first
+                top_books = get_top_n_indices(scores, scores > 0, n=self.number_of_recommendations)
+            recommendations.append([self.book_isbns[index] for index in top_books])
+        return recommendations
+
+    """Add the (weighted, normalised) item-based scores of the positive ratings of each list to the shared score vectors"""
+    def add_item_based_scores(self, personalised_scores, all_ratings_lists):
+        similarities_matrix = self.item_based_methods.similarities_matrix
+        rows = []
+        columns = []
+        rating_weights = []
+        for row, all_ratings in enumerate(all_ratings_lists):
+            for item_id, rating in self.item_based_methods.get_inner_ratings_from_raw_ratings(all_ratings, min_rating=self.min_rating):
+                rows.append(row)
+                columns.append(item_id)
+                rating_weights.append(rating / 10.0)
+        if len(rating_weights) == 0:
+            return
+        weights_matrix = sparse.csr_matrix((rating_weights, (rows, columns)), shape=(len(all_ratings_lists), similarities_matrix.shape[0]))
+        scores = np.nan_to_num(np.asarray(weights_matrix @ similarities_matrix, dtype=np.float64))
+        self.add_normalised_scores(personalised_scores, scores, self.item_based_indices, self.item_based_weight)
+
+    """Add the (weighted, normalised) content-based scores of the positive ratings of each list to the shared score vectors"""
+    def add_content_based_scores(self, personalised_scores, all_ratings_lists):
+        neighbours_model = self.content_based_methods.neighbours_model
+        rows = []
+        columns = []
+        rating_weights = []
+        for row, all_ratings in enumerate(all_ratings_lists):
+            for book_isbn, rating in all_ratings:
+                book_index = neighbours_model.get_book_index(book_isbn)
+                if book_index is not None and rating >= self.min_rating:
+                    rows.append(row)
+                    columns.append(book_index)
+                    rating_weights.append(rating / 10.0)
+        if len(rating_weights) == 0:
+            return
+        number_of_books = neighbours_model.get_number_of_books()
+        weights_matrix = sparse.csr_matrix((rating_weights, (rows, columns)), shape=(len(all_ratings_lists), number_of_books))
+        scores = np.nan_to_num((weights_matrix @ neighbours_model.get_neighbours_matrix()).toarray())
+        self.add_normalised_scores(personalised_scores, scores, self.content_based_indices, self.content_based_weight)
+
+    """Add the scores of a model (one row per list, one column per book of the model) to the shared score vectors, at the indices of
+        the books of the model, each row being divided by its best score so that the weights of the models are comparable"""
+    def add_normalised_scores(self, personalised_scores, scores, indices, weight):
+        best_scores = scores.max(axis=1, initial=0, keepdims=True)
+        best_scores[best_scores <= 0] = 1
+        personalised_scores[:, indices] += weight * (scores / best_scores)
+
+    """Get the indices of the (up to) n most popular books which have not been read: the books of the popularity list are indexed first,
+        in order of popularity, so the first unread indices are the most popular books, as the popularity recommender would rank them"""
+    def get_most_popular_books(self, read_books, n=10):
+        top_books = []
+        for index in range(self.number_of_popular_books):
+            if index not in read_books:
+                top_books.append(index)
+                if len(top_books) >= n:
+                    break
+        return top_books
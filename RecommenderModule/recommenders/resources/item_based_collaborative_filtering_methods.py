@@ -1,10 +1,16 @@
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
 from RecommenderModule.recommenders.resources.library import Library
-from surprise import KNNBasic
-from collections import defaultdict
-from operator import itemgetter
-import math
+from RecommenderModule.recommenders.resources.item_id_mapping import ItemIdMapping, get_top_n_indices, save_array
+from RecommenderModule.recommenders.resources.item_similarity_statistics import ItemSimilarityStatistics
+from RecommenderModule.recommenders.resources.rating_arrays import RatingArrays
+from RecommenderModule.recommenders.resources.rating_store import RatingStore
+from BookClub.models import ClubBookRatings
+from surprise import KNNBasic, Trainset
+from scipy import sparse
+import numpy as np
 import joblib
+import copy
+import os
 
 """This class provides the developer with methods to recommend books to a user, similar to the user's rated books"""
 class ItemBasedCollaborativeFilteringMethods:
@@ -13,6 +19,7 @@ class ItemBasedCollaborativeFilteringMethods:
     data_provider = None
     trainset = None
     similarities_matrix = None
+    similarity_statistics = None
     library = None
 
     min_ratings_threshold = 15
@@ -65,15 +72,82 @@ class ItemBasedCollaborativeFilteringMethods:
         model.fit(self.trainset)
         self.similarities_matrix = model.sim
 
-    """Save the trainset and the similarities_matrix as .sav files, using the joblib library."""
+    """Save the similarities_matrix as raw float32 .npy file, the mapping between raw and inner item ids and the ratings
+        (as a RatingStore of flat arrays, sharing the files of the mapping) as .npy files, so that the model can be memory-mapped
+        without unpickling the trainset. The ratings are those of the similarity statistics if the model has been updated incrementally.
+        The trainset is still saved as .sav file (using the joblib library) after training, for the tools using it,
+        and the parameters of the model are saved too."""
     def save_model(self):
-        joblib.dump(self.trainset, f"{self.path_to_model}/trainset.sav")
-        joblib.dump(self.similarities_matrix, f"{self.path_to_model}/similarities_matrix.sav")
+        rating_store = None
+        if self.similarity_statistics is not None:
+            rating_store = RatingStore.from_user_ratings(*self.similarity_statistics.get_ratings())
+        elif isinstance(self.trainset, Trainset): # surprise Trainset (not an ItemIdMapping)
+            joblib.dump(self.trainset, f"{self.path_to_model}/trainset.sav")
+            rating_store = RatingStore.from_trainset(self.trainset)
+        if rating_store is not None:
+            rating_store.save(self.path_to_model)
+        else:
+            ItemIdMapping.from_trainset(self.trainset).save(self.path_to_model)
+        save_array(f"{self.path_to_model}/similarities_matrix.npy", np.asarray(self.similarities_matrix, dtype=np.float32))
+        joblib.dump({"model_function_name": self.model_function_name, "min_support": self.min_support, "min_ratings_threshold": self.min_ratings_threshold},
+                    f"{self.path_to_model}/model_parameters.sav")
+        if os.path.exists(f"{self.path_to_model}/updated_ratings.sav"): # Ratings saved by previous versions, now in the rating store
+            os.remove(f"{self.path_to_model}/updated_ratings.sav")
 
-    """Import the trainset and the similarities_matrix from .sav files, using the joblib library."""
+    """Import the similarities_matrix and the mapping between raw and inner item ids from .npy files, memory-mapped (read-only)
+        so that all processes share the same pages; the mapping replaces the trainset to serve recommendations."""
     def import_model(self):
-        self.trainset = joblib.load(f"{self.path_to_model}/trainset.sav")
-        self.similarities_matrix = joblib.load(f"{self.path_to_model}/similarities_matrix.sav")
+        self.trainset = ItemIdMapping.load(self.path_to_model, mmap_mode='r')
+        self.similarities_matrix = np.load(f"{self.path_to_model}/similarities_matrix.npy", mmap_mode='r')
+        if os.path.exists(f"{self.path_to_model}/model_parameters.sav"):
+            self.initialise_parameters(joblib.load(f"{self.path_to_model}/model_parameters.sav"))
+
+    """Build the similarity statistics of all pairs of books, from the trainset (or from the saved rating store, once the model has been imported)"""
+    def build_similarity_statistics(self):
+        if isinstance(self.trainset, Trainset):
+            trainset = self.trainset
+        else:
+            try:
+                trainset = RatingStore.load(self.path_to_model, mmap_mode='r')
+            except FileNotFoundError: # Model saved without rating store (its files are not committed, they are built by training)
+                trainset = joblib.load(f"{self.path_to_model}/trainset.sav")
+        self.similarity_statistics = ItemSimilarityStatistics.from_trainset(trainset, similarity_name=self.model_function_name, min_support=self.min_support)
+
+    """Check whether the similarities of the model can be updated incrementally (see get_updated_methods)"""
+    def can_update_ratings(self):
+        return self.model_function_name in ItemSimilarityStatistics.supported_similarity_names
+
+    """Get the list of (user_id, book_isbn, rating) changes (rating being None for a deleted rating) between the ratings the model
+        has been trained on (or last updated with) and the current ratings of the Django database; only the ratings of the books of the
+        model, and of the new books having at least {min_ratings_threshold} ratings, are taken into account"""
+    def get_ratings_changes_from_django_database(self):
+        if self.similarity_statistics is None:
+            self.build_similarity_statistics()
+        return self.similarity_statistics.get_ratings_changes(RatingArrays.from_django_database(), min_ratings_threshold=self.min_ratings_threshold)
+
+    """Get a copy of the model updated with a batch of new, changed or deleted ratings, as a list of (user_id, book_isbn, rating) tuples
+        (rating being None for a deleted rating), without retraining it: only the rows (and columns) of the similarities matrix of the books
+        whose ratings changed are recomputed, from the similarity statistics of all pairs of books.
+        This model is left unchanged, so that it keeps serving recommendations until the updated copy replaces it; the similarity
+        statistics are handed over to the copy. Only possible for the 'cosine', 'msd' and 'pearson' similarities (raises a ValueError otherwise)."""
+    def get_updated_methods(self, ratings_changes):
+        if self.similarity_statistics is None:
+            self.build_similarity_statistics()
+        similarity_statistics = self.similarity_statistics
+        self.similarity_statistics = None
+        changed_items = similarity_statistics.update_ratings(ratings_changes)
+        # Update a copy of the similarities matrix (grown with the new books), as the current one may still be read meanwhile
+        number_of_items = similarity_statistics.get_number_of_items()
+        previous_number_of_items = self.similarities_matrix.shape[0]
+        similarities_matrix = np.zeros((number_of_items, number_of_items), dtype=self.similarities_matrix.dtype)
+        similarities_matrix[:previous_number_of_items, :previous_number_of_items] = self.similarities_matrix
+        similarity_statistics.update_similarities_matrix(similarities_matrix, changed_items)
+        updated_methods = copy.copy(self)
+        if number_of_items > previous_number_of_items:
+            updated_methods.trainset = ItemIdMapping(np.array(similarity_statistics.raw_item_ids, dtype=str))
+        updated_methods.similarities_matrix = similarities_matrix
+        updated_methods.similarity_statistics = similarity_statistics
+        return updated_methods
 
     """Get the recommended books (up to 10) given a specified user_id, from all of the user's rated books"""
     def get_recommendations_all_ratings_from_user_id(self, user_id):
@@ -109,34 +183,100 @@ class ItemBasedCollaborativeFilteringMethods:
         # Define all books rated (read) by the user
         if all_books_rated is None:
             all_books_rated = ratings
+        if len(ratings) == 0:
+            return []
 
-        # Weigh items by rating
-        candidates = defaultdict(float)
-        for item_id, rating in ratings:
-            similarity_row = self.similarities_matrix[item_id]
-            for inner_id, score in enumerate(similarity_row):
-                candidates[inner_id] += score * (rating / 10.0)
-
-        # Get top-rated items from similar users
-        final_recommendations = []
-        all_books_rated_isbn = [rating[0] for rating in all_books_rated]
-        for item_id, rating_sum in sorted(candidates.items(), key=itemgetter(1), reverse=True):
-            # Check if user has already read the book, and only recommend the book if it has some similarity
-            if (item_id not in all_books_rated_isbn) and (not math.isnan(rating_sum)) and rating_sum != 0:
-                try:
-                    book_isbn = self.trainset.to_raw_iid(item_id)
-                    final_recommendations.append(book_isbn)
-                    if len(final_recommendations) >= 10: # Get the top 10 recommendations
-                        break
-                except:
-                    pass
+        # Weigh items by rating, as a single product of the rating weights with the rated rows of the similarities matrix
+        rated_items = np.array([item_id for item_id, rating in ratings], dtype=np.int64)
+        rating_weights = np.array([rating / 10.0 for item_id, rating in ratings], dtype=np.float64)
+        candidates = rating_weights @ self.similarities_matrix[rated_items]
+
+        # Only recommend books the user has not read yet, and which have some similarity
+        recommendable = ~np.isnan(candidates) & (candidates != 0)
+        recommendable[[item_id for item_id, rating in all_books_rated]] = False
 
-        return final_recommendations
+        # Get the top 10 recommendations
+        top_items = get_top_n_indices(candidates, recommendable, n=10)
+        return [self.trainset.to_raw_iid(item_id) for item_id in top_items]
+
+    """Get the recommended books (up to 10) for each of the specified users, from all of the users' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each user"""
+    def get_recommendations_positive_ratings_only_from_user_ids(self, user_ids, min_rating=6, batch_size=256):
+        raw_ratings_by_user = self.library.get_all_ratings_by_users(user_ids)
+        user_ids = list(raw_ratings_by_user.keys())
+        recommendations = {}
+        for start in range(0, len(user_ids), batch_size):
+            batch_user_ids = user_ids[start:start + batch_size]
+            inner_ratings_lists = [self.get_inner_ratings_from_raw_ratings(raw_ratings_by_user[user_id]) for user_id in batch_user_ids]
+            batch_recommendations = self.get_recommendations_from_inner_ratings_batch(inner_ratings_lists, min_rating=min_rating)
+            recommendations.update(zip(batch_user_ids, batch_recommendations))
+        return recommendations
 
-    """Get the recommended books (up to 10) given a specified club_url_name, from all of the club's members' positively (> 6/10) rated books"""
+    """Get the recommended books (up to 10) for each list of inner ratings (all books rated by a user), from the positively rated books;
+        all lists are scored at once, with a single product of the sparse (lists x items) matrix of rating weights and the similarities matrix"""
+    def get_recommendations_from_inner_ratings_batch(self, inner_ratings_lists, min_rating=6):
+        rows = []
+        columns = []
+        rating_weights = []
+        for row, inner_ratings in enumerate(inner_ratings_lists):
+            for item_id, rating in inner_ratings:
+                if rating >= min_rating:
+                    rows.append(row)
+                    columns.append(item_id)
+                    rating_weights.append(rating / 10.0)
+        weights_matrix = sparse.csr_matrix((rating_weights, (rows, columns)), shape=(len(inner_ratings_lists), self.similarities_matrix.shape[0]))
+        candidates_matrix = np.asarray(weights_matrix @ self.similarities_matrix)
+
+        recommendations = []
+        for row, inner_ratings in enumerate(inner_ratings_lists):
+            if weights_matrix.indptr[row] == weights_matrix.indptr[row + 1]: # No positive ratings
+                recommendations.append([])
+                continue
+            candidates = candidates_matrix[row]
+            recommendable = ~np.isnan(candidates) & (candidates != 0)
+            recommendable[[item_id for item_id, rating in inner_ratings]] = False
+            top_items = get_top_n_indices(candidates, recommendable, n=10)
+            recommendations.append([self.trainset.to_raw_iid(item_id) for item_id in top_items])
+        return recommendations
+
+    """Check whether the clubs can be scored from their rating profiles (the sums of their members' positive ratings of each book,
+        kept up to date in Django), which are only available for Django ratings and the default positive rating threshold"""
+    def is_using_club_rating_profiles(self, min_rating):
+        return self.library.trainset is None and min_rating == ClubBookRatings.POSITIVE_RATING
+
+    """Extract the inner ids of the books of a club's rating profile (see Library.get_club_rating_profile), along with the sum
+        of the members' positive ratings of each book, as (inner item id, positive ratings sum) pairs: weighing the similarities
+        by the sums of the ratings scores the club as the concatenation of its members' ratings would"""
+    def get_inner_ratings_from_club_rating_profile(self, rating_profile):
+        return self.get_inner_ratings_from_raw_ratings([(book_isbn, positive_ratings_sum) for book_isbn, ratings_count, positive_ratings_sum in rating_profile])
+
+    """Get the recommended books (up to 10) given a specified club_url_name, from all of the club's members' positively (> 6/10) rated books;
+        the club is scored from its rating profile, as a single user would, if possible"""
     def get_recommendations_positive_ratings_only_from_club_url_name(self, club_url_name, min_rating=6):
+        if self.is_using_club_rating_profiles(min_rating):
+            inner_ratings = self.get_inner_ratings_from_club_rating_profile(self.library.get_club_rating_profile(club_url_name))
+            positive_inner_ratings = [(item_id, positive_ratings_sum) for item_id, positive_ratings_sum in inner_ratings if positive_ratings_sum > 0]
+            return self.get_recommendations_from_inner_ratings(positive_inner_ratings, all_books_rated=inner_ratings)
         raw_ratings = self.library.get_all_ratings_by_club(club_url_name)
         inner_ratings = self.get_inner_ratings_from_raw_ratings(raw_ratings)
         positive_inner_ratings = self.get_inner_ratings_from_raw_ratings(raw_ratings, min_rating=min_rating)
         recommendations = self.get_recommendations_from_inner_ratings(positive_inner_ratings, all_books_rated=inner_ratings)
         return recommendations
+
+    """Get the recommended books (up to 10) for each of the specified clubs, from all of the clubs' members' positively (> 6/10) rated books;
+        returns a dictionary containing the list of recommended books of each club"""
+    def get_recommendations_positive_ratings_only_from_club_url_names(self, club_url_names, min_rating=6, batch_size=256):
+        club_url_names = list(dict.fromkeys(club_url_names))
+        using_club_rating_profiles = self.is_using_club_rating_profiles(min_rating)
+        recommendations = {}
+        for start in range(0, len(club_url_names), batch_size):
+            batch_club_url_names = club_url_names[start:start + batch_size]
+            if using_club_rating_profiles:
+                # Books rated by members with negative ratings only have a positive ratings sum of 0: they are not weighed, only excluded
+                rating_profiles = self.library.get_club_rating_profiles(batch_club_url_names)
+                inner_ratings_lists = [self.get_inner_ratings_from_club_rating_profile(rating_profiles[club_url_name]) for club_url_name in batch_club_url_names]
+            else:
+                inner_ratings_lists = [self.get_inner_ratings_from_raw_ratings(self.library.get_all_ratings_by_club(club_url_name)) for club_url_name in batch_club_url_names]
+            batch_recommendations = self.get_recommendations_from_inner_ratings_batch(inner_ratings_lists, min_rating=min_rating)
+            recommendations.update(zip(batch_club_url_names, batch_recommendations))
+        return recommendations
@@ -0,0 +1,84 @@
+import numpy as np
+import os
+
+"""Save the array as .npy file, writing it to a temporary file first and then replacing the previous file,
+    so that processes which have memory-mapped the previous file keep reading consistent data"""
+def save_array(path, array):
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary_path, path)
+
+"""Get the indices of the (up to) n items with the highest scores among the recommendable items (a boolean mask of the scores),
+    sorted from the highest to the lowest score (ties are broken by index)"""
+def get_top_n_indices(scores, recommendable, n=10):
+    candidate_items = np.flatnonzero(recommendable)
+    candidate_scores = scores[candidate_items]
+    if len(candidate_items) > n:
+        # Keep every item scoring at least as much as the n-th best item, to break ties deterministically
+        nth_best_score = -np.partition(-candidate_scores, n - 1)[n - 1]
+        best = candidate_scores >= nth_best_score
+        candidate_items = candidate_items[best]
+        candidate_scores = candidate_scores[best]
+    order = np.lexsort((candidate_items, -candidate_scores))[:n]
+    return candidate_items[order].tolist()
+
+"""This class maps the raw ids (ISBN) of the books of a trainset to their inner ids (index in the
+    similarities matrix) and back, using compact arrays that can be saved as .npy files and memory-mapped.
+    It provides the methods of the surprise Trainset used to serve recommendations, so that it can
+    replace the (pickled) trainset once the model has been trained."""
+class ItemIdMapping:
+
+    raw_item_ids = None
+    sorted_raw_item_ids = None
+    sorted_inner_item_ids = None
+
+    def __init__(self, raw_item_ids, sorted_raw_item_ids=None, sorted_inner_item_ids=None):
+        self.raw_item_ids = np.asanyarray(raw_item_ids)
+        if sorted_raw_item_ids is None or sorted_inner_item_ids is None:
+            sorted_inner_item_ids = np.argsort(self.raw_item_ids, kind="stable").astype(np.int64)
+            sorted_raw_item_ids = self.raw_item_ids[sorted_inner_item_ids]
+        self.sorted_raw_item_ids = sorted_raw_item_ids
+        self.sorted_inner_item_ids = sorted_inner_item_ids
+
+    """Build the mapping of the items of the given surprise trainset"""
+    @classmethod
+    def from_trainset(cls, trainset):
+        return cls(np.array([str(trainset.to_raw_iid(inner_item_id)) for inner_item_id in trainset.all_items()], dtype=str))
+
+    """Get the number of items"""
+    @property
+    def n_items(self):
+        return len(self.raw_item_ids)
+
+    """Get the inner ids of all items"""
+    def all_items(self):
+        return range(self.n_items)
+
+    """Get the inner id of the item with the given raw id, raising a ValueError if the item is unknown (as the surprise Trainset does)"""
+    def to_inner_iid(self, raw_item_id):
+        if not isinstance(raw_item_id, str):
+            raise ValueError(f"Item {raw_item_id} is not part of the trainset.")
+        position = np.searchsorted(self.sorted_raw_item_ids, raw_item_id)
+        if position < len(self.sorted_raw_item_ids) and self.sorted_raw_item_ids[position] == raw_item_id:
+            return int(self.sorted_inner_item_ids[position])
+        raise ValueError(f"Item {raw_item_id} is not part of the trainset.")
+
+    """Get the raw id of the item with the given inner id"""
+    def to_raw_iid(self, inner_item_id):
+        return str(self.raw_item_ids[inner_item_id])
+
+    """Save the mapping arrays as .npy files, in the given directory"""
+    def save(self, directory):
+        save_array(f"{directory}/raw_item_ids.npy", self.raw_item_ids)
+        save_array(f"{directory}/sorted_raw_item_ids.npy", self.sorted_raw_item_ids)
+        save_array(f"{directory}/sorted_inner_item_ids.npy", self.sorted_inner_item_ids)
+
+    """Load the mapping arrays saved with the save() method, memory-mapped (read-only) if mmap_mode='r'"""
+    @classmethod
+    def load(cls, directory, mmap_mode=None):
+        return cls(
+            np.load(f"{directory}/raw_item_ids.npy", mmap_mode=mmap_mode),
+            np.load(f"{directory}/sorted_raw_item_ids.npy", mmap_mode=mmap_mode),
+            np.load(f"{directory}/sorted_inner_item_ids.npy", mmap_mode=mmap_mode)
+        )
@@ -0,0 +1,193 @@
+from scipy import sparse
+import numpy as np
+
+"""This class keeps, for each pair of items (books) (i, j), the sufficient statistics of their similarity,
+    over the users who rated both items: the number of common users (frequencies[i, j]), the sum of the products
+    of their ratings (products[i, j]), the sum of the squared ratings of item i (squares[i, j]) and the sum of the
+    ratings of item i (sums[i, j]).
+    The 'cosine', 'msd' and 'pearson' item-based similarities (as computed by surprise's KNNBasic) are derived from
+    these statistics, so that when some ratings change, only the statistics of the users who changed their ratings
+    are updated, and only the similarities of the books whose ratings changed are recomputed.
+    The statistics are stored as 4 dense (items x items) float32 matrices, and take 4 times the memory of a (float32) similarities matrix;
+    they are sums of integer ratings, which float32 holds exactly up to 2**24 (the similarities are computed from them in float64)."""
+class ItemSimilarityStatistics:
+
+    supported_similarity_names = ['cosine', 'msd', 'pearson']
+    similarity_name = 'cosine'
+    min_support = 1
+    raw_item_ids = []
+    item_inner_ids = {}
+    user_ratings = {}
+    frequencies = None
+    products = None
+    squares = None
+    sums = None
+
+    def __init__(self, similarity_name='cosine', min_support=1):
+        if similarity_name not in self.supported_similarity_names:
+            raise ValueError(f"Similarity {similarity_name} can not be updated incrementally (supported similarities: {', '.join(self.supported_similarity_names)}).")
+        self.similarity_name = similarity_name
+        self.min_support = min_support
+        self.raw_item_ids = []
+        self.item_inner_ids = {}
+        self.user_ratings = {}
+        self.frequencies = np.zeros((0, 0), dtype=np.float32)
+        self.products = np.zeros((0, 0), dtype=np.float32)
+        self.squares = np.zeros((0, 0), dtype=np.float32)
+        self.sums = np.zeros((0, 0), dtype=np.float32)
+
+    """Build the statistics of all pairs of items of the given surprise trainset (items keep their inner ids)"""
+    @classmethod
+    def from_trainset(cls, trainset, similarity_name='cosine', min_support=1):
+        raw_item_ids = [trainset.to_raw_iid(inner_item_id) for inner_item_id in trainset.all_items()]
+        user_ratings = {}
+        for inner_user_id in trainset.all_users():
+            user_ratings[trainset.to_raw_uid(inner_user_id)] = {inner_item_id: rating for inner_item_id, rating in trainset.ur[inner_user_id]}
+        return cls.from_ratings(raw_item_ids, user_ratings, similarity_name=similarity_name, min_support=min_support)
+
+    """Build the statistics of all pairs of items from the raw ids of the items (in order of their inner ids) and a dictionary
+        containing, for each user, a dictionary {inner_item_id: rating} of the user's ratings (as returned by get_ratings())"""
+    @classmethod
+    def from_ratings(cls, raw_item_ids, user_ratings, similarity_name='cosine', min_support=1):
+        statistics = cls(similarity_name=similarity_name, min_support=min_support)
+        statistics.add_items(raw_item_ids)
+        statistics.user_ratings = dict(user_ratings)
+        statistics.add_users_contributions(list(statistics.user_ratings.values()), sign=1)
+        return statistics
+
+    """Get the raw ids of the items (in order of their inner ids) and the ratings of all users, from which the statistics are built"""
+    def get_ratings(self):
+        return (list(self.raw_item_ids), self.user_ratings)
+
+    """Get the number of items"""
+    def get_number_of_items(self):
+        return len(self.raw_item_ids)
+
+    """Add the given (new) items, with empty statistics"""
+    def add_items(self, raw_item_ids):
+        for raw_item_id in raw_item_ids:
+            self.item_inner_ids[raw_item_id] = len(self.raw_item_ids)
+            self.raw_item_ids.append(raw_item_id)
+        number_of_new_items = self.get_number_of_items() - self.frequencies.shape[0]
+        if number_of_new_items > 0:
+            self.frequencies = np.pad(self.frequencies, (0, number_of_new_items))
+            self.products = np.pad(self.products, (0, number_of_new_items))
+            self.squares = np.pad(self.squares, (0, number_of_new_items))
+            self.sums = np.pad(self.sums, (0, number_of_new_items))
+
+    """Add (sign=1) or remove (sign=-1) the contributions of the given users to the statistics of all pairs of items;
+        users_ratings is a list containing a dictionary {inner_item_id: rating} for each user"""
+    def add_users_contributions(self, users_ratings, sign=1):
+        rows = [row for row, ratings in enumerate(users_ratings) for inner_item_id in ratings.keys()]
+        columns = [inner_item_id for ratings in users_ratings for inner_item_id in ratings.keys()]
+        values = [rating for ratings in users_ratings for rating in ratings.values()]
+        shape = (len(users_ratings), self.get_number_of_items())
+        ratings_matrix = sparse.csr_matrix((np.array(values, dtype=np.float64), (rows, columns)), shape=shape)
+        rated_matrix = sparse.csr_matrix((np.ones(len(values)), (rows, columns)), shape=shape)
+        squared_ratings_matrix = ratings_matrix.multiply(ratings_matrix).tocsr()
+        self.add_sparse_matrix(self.frequencies, rated_matrix.T @ rated_matrix, sign)
+        self.add_sparse_matrix(self.products, ratings_matrix.T @ ratings_matrix, sign)
+        self.add_sparse_matrix(self.squares, squared_ratings_matrix.T @ rated_matrix, sign)
+        self.add_sparse_matrix(self.sums, ratings_matrix.T @ rated_matrix, sign)
+
+    """Add the values of the sparse matrix (multiplied by sign) to the dense matrix"""
+    def add_sparse_matrix(self, dense_matrix, sparse_matrix, sign):
+        sparse_matrix = sparse_matrix.tocoo()
+        dense_matrix[sparse_matrix.row, sparse_matrix.col] += sign * sparse_matrix.data
+
+    """Apply a batch of new, changed or deleted ratings, as a list of (user_id, book_isbn, rating) tuples
+        (rating being None for a deleted rating); books that are not known yet are added.
+        Returns the inner ids of the books whose ratings changed."""
+    def update_ratings(self, ratings_changes):
+        new_items = []
+        for user_id, book_isbn, rating in ratings_changes:
+            if rating is not None and book_isbn not in self.item_inner_ids and book_isbn not in new_items:
+                new_items.append(book_isbn)
+        self.add_items(new_items)
+
+        new_user_ratings = {}
+        changed_items = set()
+        for user_id, book_isbn, rating in ratings_changes:
+            ratings = new_user_ratings.setdefault(user_id, dict(self.user_ratings.get(user_id, {})))
+            inner_item_id = self.item_inner_ids.get(book_isbn)
+            if inner_item_id is None: # Deleted rating of an unknown book
+                continue
+            if rating is None:
+                ratings.pop(inner_item_id, None)
+            else:
+                ratings[inner_item_id] = rating
+            if ratings.get(inner_item_id) != self.user_ratings.get(user_id, {}).get(inner_item_id):
+                changed_items.add(inner_item_id)
+
+        user_ids = list(new_user_ratings.keys())
+        self.add_users_contributions([self.user_ratings.get(user_id, {}) for user_id in user_ids], sign=-1)
+        self.add_users_contributions([new_user_ratings[user_id] for user_id in user_ids], sign=1)
+        for user_id in user_ids:
+            self.user_ratings[user_id] = new_user_ratings[user_id]
+        return np.array(sorted(changed_items), dtype=np.int64)
+
+    """Get the list of (user_id, book_isbn, rating) changes (rating being None for a deleted rating) turning the ratings
+        of the statistics into the given current ratings (a RatingArrays of all ratings); only the ratings of the known books,
+        and of the new books having at least {min_ratings_threshold} ratings, are taken into account"""
+    def get_ratings_changes(self, rating_arrays, min_ratings_threshold=1):
+        item_ratings_counts = rating_arrays.get_item_ratings_counts()
+        kept_items = np.array([raw_item_id in self.item_inner_ids or ratings_count >= min_ratings_threshold
+                               for raw_item_id, ratings_count in zip(rating_arrays.raw_item_ids, item_ratings_counts.tolist())], dtype=bool)
+        kept_ratings = kept_items[rating_arrays.item_indices] if len(kept_items) > 0 else np.zeros(0, dtype=bool)
+        current_user_ratings = {}
+        for user_index, item_index, rating in zip(rating_arrays.user_indices[kept_ratings].tolist(), rating_arrays.item_indices[kept_ratings].tolist(),
+                                                  rating_arrays.ratings[kept_ratings].tolist()):
+            current_user_ratings.setdefault(rating_arrays.raw_user_ids[user_index], {})[rating_arrays.raw_item_ids[item_index]] = rating
+        ratings_changes = []
+        for user_id in list(self.user_ratings.keys()) + [user_id for user_id in current_user_ratings.keys() if user_id not in self.user_ratings]:
+            previous_ratings = {self.raw_item_ids[inner_item_id]: rating for inner_item_id, rating in self.user_ratings.get(user_id, {}).items()}
+            current_ratings = current_user_ratings.get(user_id, {})
+            for book_isbn, rating in current_ratings.items():
+                if previous_ratings.get(book_isbn) != rating:
+                    ratings_changes.append((user_id, book_isbn, rating))
+            for book_isbn in previous_ratings.keys():
+                if book_isbn not in current_ratings:
+                    ratings_changes.append((user_id, book_isbn, None))
+        return ratings_changes
+
+    """Compute the rows of the similarities matrix for the items with the given inner ids
+        (following the definitions of surprise's similarity measures, over the common users only)"""
+    def compute_similarities_rows(self, inner_item_ids):
+        inner_item_ids = np.asarray(inner_item_ids, dtype=np.int64)
+        frequencies = self.frequencies[inner_item_ids].astype(np.float64)
+        products = self.products[inner_item_ids].astype(np.float64)
+        squares_i = self.squares[inner_item_ids].astype(np.float64)
+        squares_j = self.squares[:, inner_item_ids].T.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.similarity_name == 'cosine':
+                denominators = np.sqrt(squares_i * squares_j)
+                similarities = np.where(denominators > 0, products / denominators, 0)
+            elif self.similarity_name == 'msd':
+                squared_differences = squares_i + squares_j - 2 * products
+                similarities = np.where(frequencies > 0, 1 / (squared_differences / frequencies + 1), 0)
+            else: # pearson
+                sums_i = self.sums[inner_item_ids].astype(np.float64)
+                sums_j = self.sums[:, inner_item_ids].T.astype(np.float64)
+                numerators = frequencies * products - sums_i * sums_j
+                denominators = np.sqrt((frequencies * squares_i - sums_i ** 2) * (frequencies * squares_j - sums_j ** 2))
+                similarities = np.where(denominators != 0, numerators / denominators, 0)
+        similarities[frequencies < self.min_support] = 0
+        similarities[np.arange(len(inner_item_ids)), inner_item_ids] = 1
+        return similarities
+
+    """Compute the whole similarities matrix, {block_size} rows at a time"""
+    def compute_similarities_matrix(self, block_size=1024):
+        number_of_items = self.get_number_of_items()
+        similarities_matrix = np.zeros((number_of_items, number_of_items))
+        for start in range(0, number_of_items, block_size):
+            end = min(start + block_size, number_of_items)
+            similarities_matrix[start:end] = self.compute_similarities_rows(np.arange(start, end))
+        return similarities_matrix
+
+    """Recompute the rows and columns of the given (writable) similarities matrix for the items with the given inner ids"""
+    def update_similarities_matrix(self, similarities_matrix, inner_item_ids):
+        if len(inner_item_ids) == 0:
+            return
+        similarities_rows = self.compute_similarities_rows(inner_item_ids)
+        similarities_matrix[inner_item_ids, :] = similarities_rows
+        similarities_matrix[:, inner_item_ids] = similarities_rows.T
@@ -1,10 +1,12 @@
-from BookClub.models import User, BookReview, Club, ClubMembership
+from BookClub.models import BookReview, ClubMembership, ClubBookRatings
+from RecommenderModule.recommenders.resources.rating_store import RatingStore
 import joblib
 
 """This class acts as a library to recover information about books and ratings."""
 class Library:
 
     trainset = None
+    path_to_item_based_model = "RecommenderModule/recommenders/resources/item_based_model"
     path_to_item_based_trainset = "RecommenderModule/recommenders/resources/item_based_model/trainset.sav"
 
     def __init__(self, trainset=None):
@@ -17,23 +19,21 @@ class Library:
             return []
         else:
             item_inner_id = self.trainset.to_inner_iid(isbn)
+            if isinstance(self.trainset, RatingStore):
+                return self.trainset.get_item_ratings(item_inner_id).tolist()
             ratings_tuples = self.trainset.ir[item_inner_id]
             ratings = []
             for user_inner_id, rating in ratings_tuples:
                 ratings.append(rating)
             return ratings
 
-    """Get a list of pairs (book_isbn, rating) of all books the specified user has rated"""
+    """Get a list of pairs (book_isbn, rating) of all books the specified user has rated
+        (from Django, with a single query)"""
     def get_all_ratings_by_user(self, user_id):
         if self.trainset is None: # Get from Django
 
             try:
-                user = User.objects.get(username=user_id)
-                user_reviews = BookReview.objects.filter(creator=user)
-                ratings = []
-                for review in user_reviews:
-                    ratings.append((review.book.ISBN, review.book_rating))
-                return ratings
+                return list(BookReview.objects.filter(creator__username=user_id).values_list('book__ISBN', 'book_rating'))
             except:
                 return []
 
@@ -49,23 +49,39 @@ class Library:
             except:
                 return []
 
+    """Get a dictionary containing, for each of the specified users, the list of pairs (book_isbn, rating) of all books the user has rated"""
+    def get_all_ratings_by_users(self, user_ids, chunk_size=500):
+        all_ratings = {user_id: [] for user_id in user_ids}
+        if self.trainset is None: # Get from Django, with one query per chunk of users
+            user_ids = list(all_ratings.keys())
+            for start in range(0, len(user_ids), chunk_size):
+                ratings_query = BookReview.objects.filter(creator__username__in=user_ids[start:start + chunk_size]).values_list('creator__username', 'book__ISBN', 'book_rating')
+                for user_id, book_isbn, rating in ratings_query:
+                    all_ratings[user_id].append((book_isbn, rating))
+        else:
+            for user_id in all_ratings.keys():
+                all_ratings[user_id] = self.get_all_ratings_by_user(user_id)
+        return all_ratings
+
     """Get the ISBN value of all books the specified user has rated"""
     def get_list_of_books_rated_by_user(self, user_id):
         ratings = self.get_all_ratings_by_user(user_id)
         return [rating[0] for rating in ratings]
 
-    """Get the ISBN value of all books that the members of the specified club have rated"""
+    """Get a list of pairs (book_isbn, rating) of all books that the members of the specified club have rated
+        (from Django, with a single query joining the memberships, reviews and books)"""
     def get_all_ratings_by_club(self, club_url_name):
-        # Method only directly uses Django objects, because trainset does not involve the concept of clubs
+        # The club members are always taken from Django, because trainset does not involve the concept of clubs
         try:
-            club = Club.objects.get(club_url_name=club_url_name)
-            club_memberships = ClubMembership.objects.filter(club=club)
-            books = []
-            for membership in club_memberships:
-                user = membership.user
-                user_books = self.get_all_ratings_by_user(user.username)
-                books.extend(user_books)
-            return books
+            if self.trainset is None:
+                ratings_query = BookReview.objects.filter(creator__clubmembership__club__club_url_name=club_url_name).order_by('creator__clubmembership__id', '-created_on')
+                return list(ratings_query.values_list('book__ISBN', 'book_rating'))
+            else:
+                members_usernames = ClubMembership.objects.filter(club__club_url_name=club_url_name).order_by('id').values_list('user__username', flat=True)
+                books = []
+                for username in members_usernames:
+                    books.extend(self.get_all_ratings_by_user(username))
+                return books
         except:
             return []
 
@@ -74,8 +90,31 @@ class Library:
         ratings = self.get_all_ratings_by_club(club_url_name)
         return [rating[0] for rating in ratings]
 
-    """Import the item-based trainset from the trainset.sav file, using joblib"""
+    """Get the rating profile of the specified club: a list of triples (book_isbn, ratings_count, positive_ratings_sum) of all books
+        that the members of the club have rated, with the number of members having rated each book and the sum of their positive ratings
+        (from Django, with a single query, whatever the number of members)"""
+    def get_club_rating_profile(self, club_url_name):
+        return list(ClubBookRatings.objects.filter(club__club_url_name=club_url_name).values_list('book__ISBN', 'ratings_count', 'positive_ratings_sum'))
+
+    """Get a dictionary containing, for each of the specified clubs, the rating profile of the club (see get_club_rating_profile)"""
+    def get_club_rating_profiles(self, club_url_names, chunk_size=500):
+        rating_profiles = {club_url_name: [] for club_url_name in club_url_names}
+        club_url_names = list(rating_profiles.keys())
+        for start in range(0, len(club_url_names), chunk_size):
+            profiles_query = ClubBookRatings.objects.filter(club__club_url_name__in=club_url_names[start:start + chunk_size]).values_list(
+                'club__club_url_name', 'book__ISBN', 'ratings_count', 'positive_ratings_sum')
+            for club_url_name, book_isbn, ratings_count, positive_ratings_sum in profiles_query:
+                rating_profiles[club_url_name].append((book_isbn, ratings_count, positive_ratings_sum))
+        return rating_profiles
+
+    """Import the ratings of the item-based trainset from the rating store files (memory-mapped, read-only),
+        or from the trainset.sav file (using joblib) if the model has been saved without them"""
     def import_item_based_trainset(self):
+        try:
+            self.trainset = RatingStore.load(self.path_to_item_based_model, mmap_mode='r')
+            return
+        except:
+            pass
         try:
             self.trainset = joblib.load(self.path_to_item_based_trainset)
         except:
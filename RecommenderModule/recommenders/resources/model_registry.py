@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""This class keeps a single, shared instance of each trained recommender per process,
+    so that the trained models are only loaded from disk once instead of once per request.
+    Each trained model carries a generation number (saved in a file next to its model files), incremented whenever
+    the model is retrained, so that results computed from a previous generation of the model can be detected as stale.
+    When a newer generation of the trained model is detected, the recommender is reloaded in a background thread,
+    and the previous instance keeps serving requests until the new one is ready."""
+class ModelRegistry:
+
+    check_interval = 30
+
+    def __init__(self, check_interval=30):
+        self.check_interval = check_interval
+        self.loaders = {}
+        self.model_file_paths = {}
+        self.generation_file_paths = {}
+        self.locks = {}
+        self.recommenders = {}
+        self.versions = {}
+        self.generations = {}
+        self.last_checks = {}
+        self.reloading = set()
+        self.reloading_lock = threading.Lock()
+
+    """Register a recommender under the given name, with the function loading it, the paths of its trained model files
+        and the path of the file containing the generation number of its trained model"""
+    def register(self, name, loader, model_file_paths, generation_file_path=None):
+        self.loaders[name] = loader
+        self.model_file_paths[name] = list(model_file_paths)
+        self.generation_file_paths[name] = generation_file_path
+        self.locks[name] = threading.Lock()
+
+    """Get the shared instance of the recommender registered under the given name, loading it if it is not loaded yet"""
+    def get(self, name):
+        recommender = self.recommenders.get(name)
+        if recommender is None:
+            return self.load(name)
+        self.check_for_new_version(name)
+        return recommender
+
+    """Get the shared instance of the recommender registered under the given name only if it is already loaded (None otherwise),
+        without waiting for it to be loaded"""
+    def get_loaded(self, name):
+        return self.recommenders.get(name)
+
+    """Load the recommender registered under the given name (only once, even if called from several threads at the same time)"""
+    def load(self, name):
+        with self.locks[name]:
+            recommender = self.recommenders.get(name)
+            if recommender is None:
+                # The generation is read before loading the model, as it is saved after the model files
+                version = self.get_model_version(name)
+                recommender = self.loaders[name]()
+                if version is None: # The model files have been created while loading the recommender
+                    version = self.get_model_version(name)
+                self.store(name, recommender, version)
+            return recommender
+
+    """Replace the shared instance of the recommender registered under the given name, e.g. after retraining it in this process"""
+    def set(self, name, recommender):
+        with self.locks[name]:
+            self.store(name, recommender, self.get_model_version(name))
+
+    """Store the recommender and the version of the model files it has been loaded from"""
+    def store(self, name, recommender, version):
+        self.recommenders[name] = recommender
+        self.versions[name] = version
+        self.generations[name] = version if version is not None else self.get_model_generation(name)
+        self.last_checks[name] = time.monotonic()
+
+    """Forget all loaded recommenders, so that they are loaded again on their next use"""
+    def clear(self):
+        for name in self.loaders.keys():
+            with self.locks[name]:
+                self.recommenders.pop(name, None)
+                self.versions.pop(name, None)
+                self.generations.pop(name, None)
+                self.last_checks.pop(name, None)
+
+    """Get the version of the trained model files of the recommender registered under the given name, as the generation
+        of the model (None if any of its model files is missing). The model files are replaced one by one, and the generation
+        file only once they all have been saved, so that the recommender is never reloaded from partially replaced model files."""
+    def get_model_version(self, name):
+        if not all(os.path.exists(path) for path in self.model_file_paths[name]):
+            return None
+        return self.get_model_generation(name)
+
+    """Get the generation number of the trained model of the recommender registered under the given name, as saved
+        next to its model files (0 if the model has no generation file)"""
+    def get_model_generation(self, name):
+        generation_file_path = self.generation_file_paths.get(name)
+        if generation_file_path is None:
+            return 0
+        try:
+            with open(generation_file_path, "r") as file:
+                return int(file.read())
+        except (OSError, ValueError):
+            return 0
+
+    """Get the generation number of the trained model of the loaded instance of the recommender registered under the given name"""
+    def get_generation(self, name):
+        return self.generations.get(name, 0)
+
+    """Save a new generation number for the trained model of the recommender registered under the given name (after retraining it),
+        greater than the generations of all registered models; the file is replaced at once, so that it is never read partially written.
+        Returns the new generation number."""
+    def bump_model_generation(self, name):
+        generation = max(self.get_model_generation(other_name) for other_name in self.loaders.keys()) + 1
+        generation_file_path = self.generation_file_paths[name]
+        temporary_path = f"{generation_file_path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(str(generation))
+        os.replace(temporary_path, generation_file_path)
+        return generation
+
+    """Start reloading the recommender in the background if a newer generation of its model has been saved
+        (the generation file is checked at most once every {check_interval} seconds)"""
+    def check_for_new_version(self, name):
+        now = time.monotonic()
+        if now - self.last_checks.get(name, now) < self.check_interval:
+            return
+        self.last_checks[name] = now
+        version = self.get_model_version(name)
+        if version is None or version == self.versions.get(name):
+            return
+        with self.reloading_lock:
+            if name in self.reloading:
+                return
+            self.reloading.add(name)
+        thread = threading.Thread(target=self.reload, args=(name, version), daemon=True)
+        thread.start()
+
+    """Load a new instance of the recommender, and replace the shared instance once it is ready"""
+    def reload(self, name, version):
+        try:
+            recommender = self.loaders[name]()
+            with self.locks[name]:
+                self.store(name, recommender, version)
+        except Exception:
+            logger.exception("Reloading recommender '%s' failed", name)
+        finally:
+            with self.reloading_lock:
+                self.reloading.discard(name)
+
+
+model_registry = ModelRegistry()
@@ -1,9 +1,8 @@
 from RecommenderModule.recommenders.resources.data_provider import DataProvider
 from RecommenderModule.recommenders.resources.library import Library
-import math
+from BookClub.models.book_rating_statistics import BookRatingStatistics
 import numpy as np
 import joblib
-from collections import Counter
 
 """This class provides the developer with methods to recommend the most popular books to a user"""
 class PopularBooksMethods:
@@ -18,13 +17,23 @@ class PopularBooksMethods:
     median_ratings = {}
     sorted_median_ratings = []
     sorted_combination_scores = []
+    ratings_counts = None
+    books_average_ratings = None
+    books_median_ratings = None
     min_ratings_threshold = 300
     ranking_method = "average"
 
-    def __init__(self, parameters={}, retraining=False, retraining_and_saving=False, trainset=None, print_status=True):
+    """If from_rating_statistics is True, the popularity lists are computed from the books' rating statistics
+        (kept up to date whenever a review is saved or deleted), instead of being trained from all ratings"""
+    def __init__(self, parameters={}, retraining=False, retraining_and_saving=False, trainset=None, print_status=True, from_rating_statistics=False):
         self.print_status = print_status
         self.initialise_parameters(parameters)
-        if trainset is None:
+        if from_rating_statistics:
+            self.load_books_ratings_statistics()
+            self.compute_all_popularity_lists()
+            if retraining_and_saving:
+                self.save_all_popularity_lists()
+        elif trainset is None:
             if retraining or retraining_and_saving:
                 self.load_filtered_books_list()
                 self.compute_all_popularity_lists()
@@ -64,11 +73,49 @@ class PopularBooksMethods:
             self.filtered_books_list = self.data_provider.get_filtered_books_list()
             self.trainset = self.data_provider.get_filtered_ratings_trainset()
         else:
-            inner_books_list = [inner_item_id for (inner_user_id, inner_item_id, rating) in self.trainset.all_ratings()]
-            counter = Counter(inner_books_list)
-            books_list = [self.trainset.to_raw_iid(inner_item_id) for (inner_item_id, count) in counter.items() if count >= self.min_ratings_threshold]
-            self.filtered_books_list = books_list
+            # Books are kept in order of first appearance in the trainset's ratings
+            inner_books_array = np.fromiter((inner_item_id for inner_user_id in self.trainset.all_users() for (inner_item_id, rating) in self.trainset.ur[inner_user_id]), dtype=np.int64)
+            inner_books, first_appearances, counts = np.unique(inner_books_array, return_index=True, return_counts=True)
+            filtered_inner_books = inner_books[counts >= self.min_ratings_threshold]
+            filtered_inner_books = filtered_inner_books[np.argsort(first_appearances[counts >= self.min_ratings_threshold])]
+            self.filtered_books_list = [self.trainset.to_raw_iid(int(inner_item_id)) for inner_item_id in filtered_inner_books]
         self.library = Library(trainset=self.trainset)
+        self.ratings_counts = None
+
+    """Get all books with at least {self.min_ratings_threshold} user ratings, with their number of ratings, average rating
+        and median rating, from the books' rating statistics (each one is derived in constant time from the book's statistics)"""
+    def load_books_ratings_statistics(self):
+        all_statistics = BookRatingStatistics.objects.filter(ratings_count__gte=max(self.min_ratings_threshold, 1)).select_related('book').order_by('book_id')
+        self.filtered_books_list = [statistics.book.ISBN for statistics in all_statistics]
+        self.ratings_counts = np.array([statistics.ratings_count for statistics in all_statistics], dtype=np.int64)
+        self.books_average_ratings = np.array([statistics.get_average_rating() for statistics in all_statistics], dtype=np.float64)
+        self.books_median_ratings = np.array([statistics.get_median_rating() for statistics in all_statistics], dtype=np.float64)
+
+    """Compute the number of ratings, the average rating and the median rating of all books in filtered_books_list
+        (as arrays in the same order), in a single grouped pass over the ratings of the trainset"""
+    def compute_books_ratings_statistics(self):
+        number_of_books = self.trainset.n_items
+        ratings_per_book = [self.trainset.ir[inner_item_id] for inner_item_id in range(number_of_books)]
+        counts = np.array([len(book_ratings) for book_ratings in ratings_per_book], dtype=np.int64)
+        ratings = np.fromiter((rating for book_ratings in ratings_per_book for (inner_user_id, rating) in book_ratings), dtype=np.float64, count=int(counts.sum()))
+        inner_books_array = np.repeat(np.arange(number_of_books), counts)
+        # Sort the ratings of each book, keeping the ratings grouped by book
+        ratings = ratings[np.lexsort((ratings, inner_books_array))]
+        sums = np.bincount(inner_books_array, weights=ratings, minlength=number_of_books)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        filtered_inner_books = np.array([self.trainset.to_inner_iid(isbn) for isbn in self.filtered_books_list], dtype=np.int64)
+        self.ratings_counts = counts[filtered_inner_books]
+        self.books_average_ratings = sums[filtered_inner_books] / self.ratings_counts
+        starts = offsets[filtered_inner_books]
+        # Middle rating for an odd number of ratings, mean of the 2 middle ratings for an even number of ratings
+        self.books_median_ratings = (ratings[starts + (self.ratings_counts - 1) // 2] + ratings[starts + self.ratings_counts // 2]) / 2
+
+    """Sort the books of filtered_books_list according to their scores (in descending order, books with the same score
+        staying in the order of filtered_books_list), as a list of pairs (isbn, score)"""
+    def get_sorted_popularity_list(self, scores):
+        order = np.argsort(-scores, kind="stable")
+        return [(self.filtered_books_list[index], score) for index, score in zip(order.tolist(), scores[order].tolist())]
 
     """Calculate popularity lists for all books according to the different metrics"""
     def compute_all_popularity_lists(self):
@@ -97,14 +144,11 @@ class PopularBooksMethods:
     def compute_sorted_average_ratings(self):
         if self.print_status:
             print("Computing popularity list from average ratings...")
-        average_ratings = {}
-        # Get average rating for all books
-        for isbn in self.filtered_books_list:
-            average_rating = self.get_average_rating(isbn)
-            average_ratings[isbn] = average_rating
-        self.average_ratings = average_ratings
+        if self.ratings_counts is None:
+            self.compute_books_ratings_statistics()
+        self.average_ratings = dict(zip(self.filtered_books_list, self.books_average_ratings.tolist()))
         # Sort books according to the average rating
-        self.sorted_average_ratings = sorted(average_ratings.items(), key=lambda item: item[1], reverse=True)
+        self.sorted_average_ratings = self.get_sorted_popularity_list(self.books_average_ratings)
         if self.print_status:
             print("Done computing popularity list.")
 
@@ -123,14 +167,11 @@ class PopularBooksMethods:
     def compute_sorted_median_ratings(self):
         if self.print_status:
             print("Computing popularity list from median ratings...")
-        median_ratings = {}
-        # Get median rating for all books
-        for isbn in self.filtered_books_list:
-            median_rating = self.get_median_rating(isbn)
-            median_ratings[isbn] = median_rating
-        self.median_ratings = median_ratings
+        if self.ratings_counts is None:
+            self.compute_books_ratings_statistics()
+        self.median_ratings = dict(zip(self.filtered_books_list, self.books_median_ratings.tolist()))
         # Sort books according to the median rating
-        self.sorted_median_ratings = sorted(median_ratings.items(), key=lambda item: item[1], reverse=True)
+        self.sorted_median_ratings = self.get_sorted_popularity_list(self.books_median_ratings)
         if self.print_status:
             print("Done computing popularity list.")
 
@@ -138,18 +179,18 @@ class PopularBooksMethods:
     def compute_sorted_combination_scores(self):
         if self.print_status:
             print("Computing popularity list from average and median ratings...")
-        combination_scores = {}
+        if self.ratings_counts is None:
+            self.compute_books_ratings_statistics()
         # Get combinated score (from average and median) for all books
-        for isbn in self.filtered_books_list:
-            combination_score = math.sqrt(self.average_ratings[isbn] * self.median_ratings[isbn])
-            combination_scores[isbn] = combination_score
+        combination_scores = np.sqrt(self.books_average_ratings * self.books_median_ratings)
         # Sort books according to the combinated score
-        self.sorted_combination_scores = sorted(combination_scores.items(), key=lambda item: item[1], reverse=True)
+        self.sorted_combination_scores = self.get_sorted_popularity_list(combination_scores)
         if self.print_status:
             print("Done computing popularity list.")
 
     """Get most popular books (up to 10) from the given popularity list, that the user has not read yet"""
     def get_recommendations_from_popularity_list(self, popularity_list, read_books=[]):
+        read_books = set(read_books)
         final_recommendations = []
         for (isbn, score) in popularity_list:
             if (isbn not in read_books) and (score > 0):
@@ -0,0 +1,113 @@
+from collections import defaultdict
+from itertools import islice
+from surprise import Trainset
+from BookClub.models import Book, BookReview, User
+import pandas as pd
+import numpy as np
+
+"""This class holds the ratings as integer-coded arrays: for each rating, the index of its user (user_indices),
+    the index of its item (item_indices) and its value (ratings), along with the raw ids (usernames and ISBNs) of the users
+    and items, in order of their indices, and the dictionaries mapping raw ids to indices.
+    Users and items are indexed in order of their first appearance in the ratings (as surprise does for the inner ids of trainsets),
+    so that the trainset built from the arrays is the same as the one built from a surprise Dataset of the same ratings."""
+class RatingArrays:
+
+    user_indices = None
+    item_indices = None
+    ratings = None
+    raw_user_ids = []
+    raw_item_ids = []
+    user_inner_ids = {}
+    item_inner_ids = {}
+
+    def __init__(self, user_indices, item_indices, ratings, raw_user_ids, raw_item_ids):
+        self.user_indices = user_indices
+        self.item_indices = item_indices
+        self.ratings = ratings
+        self.raw_user_ids = raw_user_ids
+        self.raw_item_ids = raw_item_ids
+        self.user_inner_ids = {raw_user_id: index for index, raw_user_id in enumerate(raw_user_ids)}
+        self.item_inner_ids = {raw_item_id: index for index, raw_item_id in enumerate(raw_item_ids)}
+
+    """Load all ratings (BookReview objects) from the Django database, streaming (creator id, book id, rating) rows
+        {chunk_size} at a time into preallocated arrays; the usernames and ISBNs are then read once per user and book,
+        instead of once per rating"""
+    @classmethod
+    def from_django_database(cls, chunk_size=10000):
+        number_of_ratings = BookReview.objects.count()
+        user_indices = np.empty(number_of_ratings, dtype=np.int32)
+        item_indices = np.empty(number_of_ratings, dtype=np.int32)
+        ratings = np.empty(number_of_ratings, dtype=np.int8)
+        user_database_ids = {}
+        item_database_ids = {}
+        rows = BookReview.objects.values_list('creator_id', 'book_id', 'book_rating').iterator(chunk_size=chunk_size)
+        position = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if len(chunk) == 0:
+                break
+            end = position + len(chunk)
+            if end > len(ratings): # Reviews created since counting them
+                user_indices = np.resize(user_indices, end)
+                item_indices = np.resize(item_indices, end)
+                ratings = np.resize(ratings, end)
+            user_indices[position:end] = [user_database_ids.setdefault(user_id, len(user_database_ids)) for user_id, book_id, rating in chunk]
+            item_indices[position:end] = [item_database_ids.setdefault(book_id, len(item_database_ids)) for user_id, book_id, rating in chunk]
+            ratings[position:end] = [rating for user_id, book_id, rating in chunk]
+            position = end
+        raw_user_ids = cls.get_raw_ids(User.objects.values_list('id', 'username'), user_database_ids, chunk_size)
+        raw_item_ids = cls.get_raw_ids(Book.objects.values_list('id', 'ISBN'), item_database_ids, chunk_size)
+        return cls(user_indices[:position], item_indices[:position], ratings[:position], raw_user_ids, raw_item_ids)
+
+    """Get the raw ids (from the (database id, raw id) rows of the query) of the objects indexed in the {database_ids} dictionary,
+        in order of their indices"""
+    @staticmethod
+    def get_raw_ids(query, database_ids, chunk_size):
+        raw_ids = [None] * len(database_ids)
+        for database_id, raw_id in query.iterator(chunk_size=chunk_size):
+            index = database_ids.get(database_id)
+            if index is not None:
+                raw_ids[index] = raw_id
+        return raw_ids
+
+    """Get the number of ratings"""
+    def get_number_of_ratings(self):
+        return len(self.ratings)
+
+    """Get the number of ratings of each item, in order of the item indices"""
+    def get_item_ratings_counts(self):
+        return np.bincount(self.item_indices, minlength=len(self.raw_item_ids))
+
+    """Get the ratings of the items having at least {min_ratings_threshold} ratings (users and items are indexed again)"""
+    def filter_items(self, min_ratings_threshold):
+        kept_ratings = self.get_item_ratings_counts()[self.item_indices] >= min_ratings_threshold
+        user_indices, raw_user_ids = self.index_in_order_of_appearance(self.user_indices[kept_ratings], self.raw_user_ids)
+        item_indices, raw_item_ids = self.index_in_order_of_appearance(self.item_indices[kept_ratings], self.raw_item_ids)
+        return RatingArrays(user_indices, item_indices, self.ratings[kept_ratings], raw_user_ids, raw_item_ids)
+
+    """Index again the objects of the given indices in order of their first appearance, and get their raw ids in order of their new indices"""
+    @staticmethod
+    def index_in_order_of_appearance(indices, raw_ids):
+        unique_indices, first_positions = np.unique(indices, return_index=True)
+        kept_indices = unique_indices[np.argsort(first_positions, kind='stable')]
+        new_indices = np.full(len(raw_ids), -1, dtype=indices.dtype)
+        new_indices[kept_indices] = np.arange(len(kept_indices), dtype=indices.dtype)
+        return (new_indices[indices], [raw_ids[index] for index in kept_indices])
+
+    """Get the ratings as a pandas DataFrame with the columns of the ratings csv file ("User-ID", "ISBN" and "Book-Rating");
+        the users and items columns are categorical, so that they share the integer codes of the arrays"""
+    def to_dataframe(self):
+        return pd.DataFrame({
+            "User-ID": pd.Categorical.from_codes(self.user_indices, categories=self.raw_user_ids),
+            "ISBN": pd.Categorical.from_codes(self.item_indices, categories=self.raw_item_ids),
+            "Book-Rating": self.ratings
+        })
+
+    """Build the surprise trainset of the ratings directly from the arrays (the inner ids being the indices of the arrays)"""
+    def build_trainset(self, rating_scale=(0, 10)):
+        ur = defaultdict(list)
+        ir = defaultdict(list)
+        for user_index, item_index, rating in zip(self.user_indices.tolist(), self.item_indices.tolist(), self.ratings.astype(np.float64).tolist()):
+            ur[user_index].append((item_index, rating))
+            ir[item_index].append((user_index, rating))
+        return Trainset(ur, ir, len(ur), len(ir), self.get_number_of_ratings(), rating_scale, dict(self.user_inner_ids), dict(self.item_inner_ids))
@@ -0,0 +1,174 @@
+from RecommenderModule.recommenders.resources.item_id_mapping import ItemIdMapping, save_array
+import numpy as np
+
+"""This class gives access to the rows of a CSR matrix (indptr, indices, ratings) as lists of (index, rating) pairs,
+    as the 'ur' and 'ir' dictionaries of the surprise Trainset do"""
+class CSRRows:
+
+    def __init__(self, indptr, indices, ratings):
+        self.indptr = indptr
+        self.indices = indices
+        self.ratings = ratings
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, row):
+        if not 0 <= row < len(self):
+            raise KeyError(row)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return list(zip(self.indices[start:end].tolist(), self.ratings[start:end].tolist()))
+
+    def __contains__(self, row):
+        return isinstance(row, (int, np.integer)) and 0 <= row < len(self)
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def items(self):
+        return ((row, self[row]) for row in range(len(self)))
+
+"""Find the inner id of the given raw id in the sorted raw ids, raising a ValueError if it is unknown (as the surprise Trainset does)"""
+def find_inner_id(sorted_raw_ids, sorted_inner_ids, raw_id, kind):
+    if not isinstance(raw_id, str):
+        raise ValueError(f"{kind} {raw_id} is not part of the trainset.")
+    position = np.searchsorted(sorted_raw_ids, raw_id)
+    if position < len(sorted_raw_ids) and sorted_raw_ids[position] == raw_id:
+        return int(sorted_inner_ids[position])
+    raise ValueError(f"{kind} {raw_id} is not part of the trainset.")
+
+"""This class stores the ratings of a trainset as two CSR matrices of flat arrays: users x items (the ratings of each user)
+    and items x users (the ratings of each item), along with the raw ids of the users and items (in order of their inner ids)
+    and the sorted raw ids to map them back to inner ids.
+    The arrays are saved as .npy files and can be memory-mapped, so that loading the store does not unpickle any Python object.
+    It provides the methods and attributes of the surprise Trainset used to serve recommendations (to_inner_iid, to_raw_iid,
+    to_inner_uid, to_raw_uid, all_items, all_users, ur and ir), so that it can replace the trainset once the model has been trained."""
+class RatingStore:
+
+    array_names = ['user_indptr', 'user_item_indices', 'user_ratings', 'item_indptr', 'item_user_indices', 'item_ratings',
+                   'raw_user_ids', 'sorted_raw_user_ids', 'sorted_inner_user_ids', 'raw_item_ids', 'sorted_raw_item_ids', 'sorted_inner_item_ids']
+    item_id_array_names = ['raw_item_ids', 'sorted_raw_item_ids', 'sorted_inner_item_ids']
+    file_prefix = "rating_store_"
+
+    def __init__(self, user_indptr, user_item_indices, user_ratings, item_indptr, item_user_indices, item_ratings,
+                 raw_user_ids, sorted_raw_user_ids, sorted_inner_user_ids, raw_item_ids, sorted_raw_item_ids, sorted_inner_item_ids):
+        self.user_indptr = user_indptr
+        self.user_item_indices = user_item_indices
+        self.user_ratings = user_ratings
+        self.item_indptr = item_indptr
+        self.item_user_indices = item_user_indices
+        self.item_ratings = item_ratings
+        self.raw_user_ids = raw_user_ids
+        self.sorted_raw_user_ids = sorted_raw_user_ids
+        self.sorted_inner_user_ids = sorted_inner_user_ids
+        self.raw_item_ids = raw_item_ids
+        self.sorted_raw_item_ids = sorted_raw_item_ids
+        self.sorted_inner_item_ids = sorted_inner_item_ids
+        self.ur = CSRRows(user_indptr, user_item_indices, user_ratings)
+        self.ir = CSRRows(item_indptr, item_user_indices, item_ratings)
+
+    """Build the store from the CSR arrays (indptr, indices, ratings) of the ratings of each user and of each item,
+        and the raw ids of the users and items (in order of their inner ids)"""
+    @classmethod
+    def from_csr_arrays(cls, user_csr_arrays, item_csr_arrays, raw_user_ids, raw_item_ids):
+        raw_user_ids = np.array([str(raw_user_id) for raw_user_id in raw_user_ids], dtype=str)
+        raw_item_ids = np.array([str(raw_item_id) for raw_item_id in raw_item_ids], dtype=str)
+        sorted_inner_user_ids = np.argsort(raw_user_ids, kind="stable").astype(np.int32)
+        sorted_inner_item_ids = np.argsort(raw_item_ids, kind="stable").astype(np.int32)
+        return cls(*user_csr_arrays, *item_csr_arrays,
+                   raw_user_ids, raw_user_ids[sorted_inner_user_ids], sorted_inner_user_ids, raw_item_ids, raw_item_ids[sorted_inner_item_ids], sorted_inner_item_ids)
+
+    """Build the store from (user inner id, item inner id, rating) arrays and the raw ids of the users and items (in order of their inner ids);
+        the ratings of each user (and of each item) keep the order of the given arrays"""
+    @classmethod
+    def from_arrays(cls, user_indices, item_indices, ratings, raw_user_ids, raw_item_ids):
+        user_indices = np.asarray(user_indices, dtype=np.int32)
+        item_indices = np.asarray(item_indices, dtype=np.int32)
+        ratings = np.asarray(ratings, dtype=np.float32)
+        user_indptr, user_order = cls.get_csr_order(user_indices, len(raw_user_ids))
+        item_indptr, item_order = cls.get_csr_order(item_indices, len(raw_item_ids))
+        return cls.from_csr_arrays((user_indptr, item_indices[user_order], ratings[user_order]), (item_indptr, user_indices[item_order], ratings[item_order]),
+                                   raw_user_ids, raw_item_ids)
+
+    """Get the row pointers of the CSR matrix whose rows are the given row indices, and the order of the entries in the matrix"""
+    @staticmethod
+    def get_csr_order(row_indices, number_of_rows):
+        indptr = np.zeros(number_of_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_indices, minlength=number_of_rows), out=indptr[1:])
+        return (indptr, np.argsort(row_indices, kind="stable"))
+
+    """Get the CSR arrays (indptr, indices, ratings) of the given rows, each row being a list of (index, rating) pairs"""
+    @staticmethod
+    def get_csr_arrays(rows):
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.fromiter((index for row in rows for index, rating in row), dtype=np.int32, count=indptr[-1])
+        ratings = np.fromiter((rating for row in rows for index, rating in row), dtype=np.float32, count=indptr[-1])
+        return (indptr, indices, ratings)
+
+    """Build the store of the ratings of the given surprise trainset (users and items keep their inner ids, and ratings keep their order)"""
+    @classmethod
+    def from_trainset(cls, trainset):
+        user_csr_arrays = cls.get_csr_arrays([trainset.ur[inner_user_id] for inner_user_id in trainset.all_users()])
+        item_csr_arrays = cls.get_csr_arrays([trainset.ir[inner_item_id] for inner_item_id in trainset.all_items()])
+        raw_user_ids = [trainset.to_raw_uid(inner_user_id) for inner_user_id in trainset.all_users()]
+        raw_item_ids = [trainset.to_raw_iid(inner_item_id) for inner_item_id in trainset.all_items()]
+        return cls.from_csr_arrays(user_csr_arrays, item_csr_arrays, raw_user_ids, raw_item_ids)
+
+    """Build the store from the raw ids of the items (in order of their inner ids) and a dictionary containing, for each user,
+        a dictionary {inner_item_id: rating} of the user's ratings (as returned by ItemSimilarityStatistics.get_ratings())"""
+    @classmethod
+    def from_user_ratings(cls, raw_item_ids, user_ratings):
+        user_indices = [inner_user_id for inner_user_id, ratings in enumerate(user_ratings.values()) for inner_item_id in ratings.keys()]
+        item_indices = [inner_item_id for ratings in user_ratings.values() for inner_item_id in ratings.keys()]
+        ratings = [rating for ratings in user_ratings.values() for rating in ratings.values()]
+        return cls.from_arrays(user_indices, item_indices, ratings, list(user_ratings.keys()), raw_item_ids)
+
+    @property
+    def n_users(self):
+        return len(self.raw_user_ids)
+
+    @property
+    def n_items(self):
+        return len(self.raw_item_ids)
+
+    @property
+    def n_ratings(self):
+        return len(self.user_ratings)
+
+    def all_users(self):
+        return range(self.n_users)
+
+    def all_items(self):
+        return range(self.n_items)
+
+    def to_inner_uid(self, raw_user_id):
+        return find_inner_id(self.sorted_raw_user_ids, self.sorted_inner_user_ids, raw_user_id, "User")
+
+    def to_raw_uid(self, inner_user_id):
+        return str(self.raw_user_ids[inner_user_id])
+
+    def to_inner_iid(self, raw_item_id):
+        return find_inner_id(self.sorted_raw_item_ids, self.sorted_inner_item_ids, raw_item_id, "Item")
+
+    def to_raw_iid(self, inner_item_id):
+        return str(self.raw_item_ids[inner_item_id])
+
+    """Get the ratings of the item with the given inner id, as an array"""
+    def get_item_ratings(self, inner_item_id):
+        return self.item_ratings[self.item_indptr[inner_item_id]:self.item_indptr[inner_item_id + 1]]
+
+    """Save the arrays of the store as .npy files ('rating_store_{array name}.npy'), in the given directory;
+        the raw ids of the items are saved as the files of an ItemIdMapping, shared with the item-based model"""
+    def save(self, directory):
+        for array_name in self.array_names:
+            if array_name not in self.item_id_array_names:
+                save_array(f"{directory}/{self.file_prefix}{array_name}.npy", getattr(self, array_name))
+        ItemIdMapping(self.raw_item_ids, self.sorted_raw_item_ids, self.sorted_inner_item_ids).save(directory)
+
+    """Load the store saved with the save() method, memory-mapped (read-only) if mmap_mode='r'"""
+    @classmethod
+    def load(cls, directory, mmap_mode=None):
+        item_id_mapping = ItemIdMapping.load(directory, mmap_mode=mmap_mode)
+        return cls(*[getattr(item_id_mapping, array_name) if array_name in cls.item_id_array_names
+                     else np.load(f"{directory}/{cls.file_prefix}{array_name}.npy", mmap_mode=mmap_mode) for array_name in cls.array_names])